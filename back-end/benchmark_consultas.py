@@ -0,0 +1,59 @@
+import os
+import time
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'setup.settings')
+django.setup()
+
+from django.db import connection
+from escola.models import Aluno, Matricula, Avaliacao, AtividadeAvaliativa
+
+"""
+Mede as consultas pontuais usadas pela sincronização e pela API:
+- atividade por (matricula, tipo, titulo)
+- matrícula por (aluno, curso)
+- aluno por cpf
+- avaliação por matrícula
+Executa cada consulta N vezes sobre amostras do banco atual e mostra o tempo
+médio e o plano de execução.
+"""
+
+REPETICOES = 2000
+
+
+def medir(nome, consultas):
+	inicio = time.perf_counter()
+	for consulta in consultas:
+		list(consulta)
+	duracao = time.perf_counter() - inicio
+	sql, params = consultas[0].query.sql_with_params()
+	with connection.cursor() as cursor:
+		cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+		plano = '; '.join(linha[-1] for linha in cursor.fetchall())
+	print(f"{nome:<40} {duracao / len(consultas) * 1e6:>10.1f} µs/consulta   [{plano}]")
+
+
+def main():
+	atividades = list(AtividadeAvaliativa.objects.order_by('?').values_list('matricula_id', 'tipo', 'titulo')[:REPETICOES])
+	matriculas = list(Matricula.objects.order_by('?').values_list('pk', 'aluno_id', 'curso_id')[:REPETICOES])
+	cpfs = list(Aluno.objects.order_by('?').values_list('cpf', flat=True)[:REPETICOES])
+	if not (atividades and matriculas and cpfs):
+		print('Banco sem dados suficientes; gere dados antes de medir.')
+		return
+
+	print(f"Alunos: {Aluno.objects.count()} | Matrículas: {Matricula.objects.count()} | "
+	      f"Atividades: {AtividadeAvaliativa.objects.count()} | Avaliações: {Avaliacao.objects.count()}")
+	medir('atividade (matricula, tipo, titulo)', [
+		AtividadeAvaliativa.objects.filter(matricula_id=m, tipo=t, titulo=ti).values_list('pk') for m, t, ti in atividades
+	])
+	medir('matricula (aluno, curso)', [
+		Matricula.objects.filter(aluno_id=a, curso_id=c).values_list('pk') for _, a, c in matriculas
+	])
+	medir('aluno (cpf)', [Aluno.objects.filter(cpf=cpf).values_list('pk') for cpf in cpfs])
+	medir('avaliacao (matricula)', [
+		Avaliacao.objects.filter(matricula_id=m).values_list('pk') for m, _, _ in matriculas
+	])
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,401 @@
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+from collections import namedtuple
+from contextlib import nullcontext
+from datetime import date
+from io import BytesIO
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'setup.settings')
+django.setup()
+
+import numpy as np
+from PIL import Image
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLResolver, get_resolver, resolve
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from escola import dados_sinteticos, metricas, tarefas
+from escola.models import Aluno, Curso, Matricula, Avaliacao, AtividadeAvaliativa, Tarefa
+
+"""
+Benchmark de todas as rotas de setup/urls.py, executadas no próprio processo
+pelo cliente de testes do Django (APIClient), sobre bases de vários tamanhos.
+
+Cada tamanho é a quantidade de matrículas de uma base SQLite própria em
+DIRETORIO_DADOS, gerada uma vez pelo comando gerar_dados com a SEMENTE e a
+DATA_BASE fixas (a mesma base em todas as execuções) e reaproveitada depois.
+Para cada caso (método + URL) são feitas até --repeticoes requisições, limitadas
+a --tempo-maximo segundos por caso, e registrados:
+- latência p50/p95/p99 em ms (inclui o consumo das respostas em streaming)
+- consultas SQL e o tempo delas por requisição
+- linhas varridas: linhas percorridas em varreduras completas de tabela
+  (SQLITE_STMTSTATUS_FULLSCAN_STEP, lido da tabela virtual sqlite_stmt); as
+  buscas por índice não entram, então um valor alto indica um índice faltando
+- tamanho da resposta em bytes
+Gravações (POST, PUT, PATCH, DELETE) são desfeitas ao fim de cada requisição,
+então a base não muda entre as execuções; antes disso, o que elas agendam com
+transaction.on_commit (recálculo de notas, versões do cache, marcador das
+réplicas) é executado e entra na medição. O cache usado é um LocMemCache
+próprio, limpo antes de cada requisição (o caminho sem cache); com
+--cache-quente ele é mantido e a primeira requisição de cada caso não conta.
+
+Uso:
+  python benchmark_endpoints.py executar [--tamanhos 1000 100000 1000000] [--saida benchmark.json]
+  python benchmark_endpoints.py comparar base.json novo.json [--tolerancia 0.2]
+O comparar lista as regressões (latência p95 ou linhas varridas acima da
+tolerância, mais consultas, respostas maiores) e termina com status 1 se houver alguma.
+"""
+
+TAMANHOS = [1000, 100000, 1000000]
+REPETICOES = 30
+TEMPO_MAXIMO = 10
+TOLERANCIA = 0.2
+# Diferença mínima de latência para uma regressão: abaixo disso é ruído
+FOLGA_MS = 1.0
+SEMENTE = 20260110
+DATA_BASE = date(2026, 1, 10)
+DIRETORIO_DADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_dados')
+
+# Matrículas por aluno geradas em média por escola/dados_sinteticos.py
+MATRICULAS_POR_ALUNO = 1.7
+
+Caso = namedtuple('Caso', ['metodo', 'url', 'dados', 'formato', 'status'], defaults=[None, 'json', 200])
+
+
+def usar_banco(caminho):
+	connection.close()
+	connection.settings_dict['NAME'] = caminho
+
+
+def preparar_conjunto(matriculas, diretorio):
+	"""Usa (e gera, se preciso) a base com `matriculas` matrículas."""
+	os.makedirs(diretorio, exist_ok=True)
+	usar_banco(os.path.join(diretorio, f'escola_{matriculas}.sqlite3'))
+	call_command('migrate', verbosity=0)
+	if not Matricula.objects.exists():
+		print(f"Gerando a base de {matriculas} matrículas...")
+		dados_sinteticos.gerar_dados(
+			math.ceil(matriculas / MATRICULAS_POR_ALUNO), semente=SEMENTE, data_base=DATA_BASE, processos=os.cpu_count() or 1,
+		)
+
+
+def preparar_amostra():
+	"""Usuário administrador e os pks usados nas URLs dos casos."""
+	usuario, _ = User.objects.get_or_create(username='benchmark', defaults={'is_staff': True, 'is_superuser': True})
+	usuario.set_password('benchmark')
+	usuario.save()
+	tarefa = Tarefa.objects.filter(tipo='sincronizar_notas', situacao='pendente').first()
+	if tarefa is None:
+		with transaction.atomic():
+			tarefa = tarefas.enfileirar('sincronizar_notas')
+
+	# Amostras do meio das tabelas, não as primeiras linhas
+	def do_meio(modelo):
+		pks = modelo.objects.order_by('pk').values_list('pk', flat=True)
+		return pks[pks.count() // 2]
+
+	aluno = Aluno.objects.get(pk=do_meio(Aluno))
+	matricula = Matricula.objects.get(pk=do_meio(Matricula))
+	livre = Curso.objects.exclude(matricula__aluno=aluno).order_by('pk').first()
+	return {
+		'usuario': usuario,
+		'refresh': str(RefreshToken.for_user(usuario)),
+		'aluno': aluno,
+		'curso': matricula.curso,
+		'curso_livre': livre,
+		'matricula': matricula,
+		'avaliacao': Avaliacao.objects.get(pk=do_meio(Avaliacao)),
+		'atividade': AtividadeAvaliativa.objects.get(pk=do_meio(AtividadeAvaliativa)),
+		'tarefa': tarefa,
+		'foto': foto_de_exemplo(),
+	}
+
+
+def foto_de_exemplo():
+	"""Arquivo servido pelo caso de /media/ (os alunos da base gerada não têm foto)."""
+	nome = 'benchmark/foto.png'
+	if not default_storage.exists(nome):
+		conteudo = BytesIO()
+		Image.new('RGB', (800, 600), (200, 30, 30)).save(conteudo, format='PNG')
+		default_storage.save(nome, ContentFile(conteudo.getvalue()))
+	return nome
+
+
+def casos(amostra):
+	aluno, curso, matricula = amostra['aluno'], amostra['curso'], amostra['matricula']
+	avaliacao, atividade, tarefa = amostra['avaliacao'], amostra['atividade'], amostra['tarefa']
+	novo_aluno = {'nome': 'Aluno benchmark', 'rg': '123456789', 'cpf': '52998224725', 'data_nascimento': '2000-01-01'}
+	atividade_nova = {'matricula': matricula.pk, 'tipo': 'T', 'titulo': 'Trabalho benchmark', 'nota': '8.50', 'entregue': True}
+	csv = 'nome,rg,cpf,data_nascimento,celular\n' + ''.join(
+		f'Importado {indice},123456789,{dados_sinteticos.gerar_cpf(999000000 + indice)},2000-01-01,\n' for indice in range(100)
+	)
+	return [
+		Caso('get', '/'),
+		Caso('get', '/alunos/'),
+		Caso('get', f'/alunos/?search={aluno.nome.split()[0]}'),
+		Caso('get', f'/alunos/{aluno.pk}/'),
+		Caso('get', f'/alunos/{aluno.pk}/matriculas/'),
+		Caso('get', '/cursos/'),
+		Caso('get', f'/cursos/{curso.pk}/'),
+		Caso('get', f'/cursos/{curso.pk}/matriculas/'),
+		Caso('get', '/cursos/relatorio/'),
+		Caso('get', f'/cursos/{curso.pk}/relatorio/'),
+		Caso('get', '/cursos/simulacao/?peso_nota1=2&peso_nota2=2&peso_nota3=1'),
+		Caso('get', f'/cursos/{curso.pk}/simulacao/?nota_aprovacao=6'),
+		Caso('get', '/matriculas/'),
+		Caso('get', '/matriculas/?page_size=1000'),
+		Caso('get', f'/matriculas/{matricula.pk}/?expand=aluno,curso'),
+		Caso('get', '/avaliacoes/'),
+		Caso('get', '/avaliacoes/?situacao=Reprovado&ordering=media'),
+		Caso('get', f'/avaliacoes/{avaliacao.pk}/'),
+		Caso('get', '/atividades/'),
+		Caso('get', f'/atividades/{atividade.pk}/'),
+		Caso('get', '/jobs/'),
+		Caso('get', f'/jobs/{tarefa.pk}/'),
+		Caso('get', '/dashboard/'),
+		Caso('get', '/cache/estatisticas/'),
+		Caso('get', '/exportar/alunos/'),
+		Caso('get', '/exportar/matriculas/?formato=ndjson'),
+		Caso('get', '/controle-geral/'),
+		# Sem METRICAS_DIRETORIO, /metrics responde 404
+		Caso('get', '/metrics', status=200 if metricas.ativas() else 404),
+		Caso('post', '/alunos/', novo_aluno, status=201),
+		Caso('put', f'/alunos/{aluno.pk}/', dict(novo_aluno, cpf=aluno.cpf)),
+		Caso('patch', f'/alunos/{aluno.pk}/', {'nome': 'Aluno alterado'}),
+		Caso('delete', f'/alunos/{aluno.pk}/', status=204),
+		Caso('post', '/cursos/', {'codigo_curso': 'BENCH', 'descricao': 'Curso benchmark', 'nivel': 'B'}, status=201),
+		# Mudar a regra do curso recalcula as avaliações de todas as matrículas dele
+		Caso('patch', f'/cursos/{curso.pk}/', {'nota_aprovacao': '6.5'}),
+		Caso('post', '/matriculas/', {'aluno': aluno.pk, 'curso': amostra['curso_livre'].pk, 'periodo': 'N'}, status=201),
+		Caso('patch', f'/matriculas/{matricula.pk}/', {'periodo': 'N'}),
+		Caso('post', '/matriculas/lote/', [{'aluno': aluno.pk, 'curso': amostra['curso_livre'].pk, 'periodo': 'M'}], status=201),
+		Caso('patch', f'/avaliacoes/{avaliacao.pk}/', {'nota1': '9.0'}),
+		Caso('post', '/atividades/', atividade_nova, status=201),
+		Caso('patch', f'/atividades/{atividade.pk}/', {'nota': '9.50', 'entregue': True}),
+		Caso('post', '/atividades/lote/', [atividade_nova] * 50, status=201),
+		Caso('post', '/importar/alunos/', {'arquivo': csv}, formato='multipart'),
+		Caso('post', '/jobs/', {'tipo': 'sincronizar_notas'}, status=202),
+		Caso('post', f'/jobs/{tarefa.pk}/cancelar/'),
+		Caso('post', '/api/token/', {'username': 'benchmark', 'password': 'benchmark'}),
+		Caso('post', '/api/token/refresh/', {'refresh': amostra['refresh']}),
+		Caso('get', f"/media/{amostra['foto']}"),
+	]
+
+
+def rotas(padroes=None, prefixo=''):
+	"""Rotas de setup/urls.py, sem as variações com sufixo de formato (alunos.json)
+	e com o admin como uma rota só."""
+	for padrao in get_resolver().url_patterns if padroes is None else padroes:
+		rota = prefixo + str(padrao.pattern)
+		if isinstance(padrao, URLResolver) and padrao.namespace != 'admin':
+			yield from rotas(padrao.url_patterns, rota)
+		elif '(?P<format>' not in rota:
+			yield rota
+
+
+def rotas_sem_caso(lista):
+	cobertas = {resolve(caso.url.split('?')[0]).route for caso in lista}
+	return [rota for rota in rotas() if rota not in cobertas]
+
+
+def varreduras():
+	"""Passos de varredura completa acumulados por instrução preparada na conexão."""
+	if connection.vendor != 'sqlite':
+		return None
+	with connection.cursor() as cursor:
+		cursor.execute("SELECT sql, nscan FROM sqlite_stmt WHERE sql NOT LIKE '%sqlite_stmt%'")
+		totais = {}
+		for sql, passos in cursor.fetchall():
+			totais[sql] = totais.get(sql, 0) + passos
+	return totais
+
+
+def linhas_varridas(antes, depois):
+	if antes is None:
+		return None
+	# Uma instrução preparada de novo durante a requisição recomeça do zero
+	return sum(passos - antes.get(sql, 0) if passos >= antes.get(sql, 0) else passos for sql, passos in depois.items())
+
+
+def requisitar(cliente, caso):
+	dados = caso.dados
+	if caso.formato == 'multipart':
+		dados = {'arquivo': SimpleUploadedFile('alunos.csv', dados['arquivo'].encode())}
+	response = getattr(cliente, caso.metodo)(caso.url, dados, format=caso.formato)
+	conteudo = b''.join(response.streaming_content) if response.streaming else response.content
+	return response.status_code, len(conteudo)
+
+
+def medir(cliente, caso, repeticoes=REPETICOES, tempo_maximo=TEMPO_MAXIMO, cache_quente=False):
+	latencias, consultas, tempos_sql, varridas, tamanhos, erros = [], [], [], [], [], []
+	if cache_quente:
+		requisitar(cliente, caso)
+	fim = time.monotonic() + tempo_maximo
+	while len(latencias) < repeticoes and (not latencias or time.monotonic() < fim):
+		if not cache_quente:
+			cache.clear()
+		antes = varreduras()
+		gravacao = caso.metodo != 'get'
+		with transaction.atomic():
+			with CaptureQueriesContext(connection) as capturadas:
+				inicio = time.perf_counter()
+				# O commit nunca acontece: os callbacks rodam aqui, como rodariam depois dele
+				with TestCase.captureOnCommitCallbacks(execute=True) if gravacao else nullcontext():
+					status, tamanho = requisitar(cliente, caso)
+				latencias.append(time.perf_counter() - inicio)
+			depois = varreduras()
+			if gravacao:
+				transaction.set_rollback(True)
+		if status != caso.status:
+			erros.append(status)
+		consultas.append(len(capturadas.captured_queries))
+		tempos_sql.append(sum(float(consulta['time']) for consulta in capturadas.captured_queries))
+		varridas.append(linhas_varridas(antes, depois))
+		tamanhos.append(tamanho)
+
+	p50, p95, p99 = np.percentile(np.array(latencias) * 1000, [50, 95, 99])
+	return {
+		'requisicoes': len(latencias),
+		'p50_ms': round(float(p50), 3),
+		'p95_ms': round(float(p95), 3),
+		'p99_ms': round(float(p99), 3),
+		'consultas': max(consultas),
+		'tempo_sql_ms': round(float(np.median(tempos_sql)) * 1000, 3),
+		'linhas_varridas': None if varridas[0] is None else max(varridas),
+		'bytes': max(tamanhos),
+		'erros': sorted(set(erros)),
+	}
+
+
+def medir_conjunto(repeticoes=REPETICOES, tempo_maximo=TEMPO_MAXIMO, cache_quente=False, saida=sys.stdout):
+	"""Mede todos os casos na base atual."""
+	amostra = preparar_amostra()
+	lista = casos(amostra)
+	cliente = APIClient()
+	cliente.force_authenticate(amostra['usuario'])
+	# O admin usa a sessão
+	cliente.force_login(amostra['usuario'])
+	resultado = {
+		'alunos': Aluno.objects.count(),
+		'matriculas': Matricula.objects.count(),
+		'atividades': AtividadeAvaliativa.objects.count(),
+		'rotas_sem_caso': rotas_sem_caso(lista),
+		'endpoints': {},
+	}
+	cache_benchmark = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark'}}
+	# Fora do executor de testes, o host do cliente de testes também precisa ser aceito
+	hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+	# /media/ fica com o servidor web em produção; é medida como no desenvolvimento.
+	# Em um processo só, o cache local faz o papel do compartilhado (Redis)
+	with override_settings(
+		CACHES=cache_benchmark, CACHE_COMPARTILHADO=True, DEBUG=False, ALLOWED_HOSTS=hosts, SERVIR_MIDIA=True,
+	):
+		for caso in lista:
+			nome = f'{caso.metodo.upper()} {caso.url}'
+			medicao = medir(cliente, caso, repeticoes, tempo_maximo, cache_quente)
+			resultado['endpoints'][nome] = medicao
+			erro = f"  status {medicao['erros']}" if medicao['erros'] else ''
+			saida.write(
+				f"  {nome[:60]:<60} p50 {medicao['p50_ms']:>9.2f}  p95 {medicao['p95_ms']:>9.2f}  p99 {medicao['p99_ms']:>9.2f} ms"
+				f"  {medicao['consultas']:>3} sql  {medicao['linhas_varridas'] or 0:>9} varridas  {medicao['bytes']:>9} B{erro}\n"
+			)
+	return resultado
+
+
+def executar(argumentos):
+	resultados = {
+		'gerado_em': time.strftime('%Y-%m-%dT%H:%M:%S'),
+		'python': platform.python_version(),
+		'django': django.get_version(),
+		'banco': connection.vendor,
+		'repeticoes': argumentos.repeticoes,
+		'cache': 'quente' if argumentos.cache_quente else 'frio',
+		'semente': SEMENTE,
+		'conjuntos': {},
+	}
+	for tamanho in argumentos.tamanhos:
+		preparar_conjunto(tamanho, argumentos.dados)
+		print(f"Base de {tamanho} matrículas")
+		with override_settings(MEDIA_ROOT=os.path.join(argumentos.dados, 'media')):
+			resultado = medir_conjunto(argumentos.repeticoes, argumentos.tempo_maximo, argumentos.cache_quente)
+		if resultado['rotas_sem_caso']:
+			print(f"  Rotas sem caso: {', '.join(resultado['rotas_sem_caso'])}")
+		resultados['conjuntos'][str(tamanho)] = resultado
+	with open(argumentos.saida, 'w', encoding='utf-8') as arquivo:
+		json.dump(resultados, arquivo, indent=2, ensure_ascii=False)
+	print(f"Resultados em {argumentos.saida}")
+
+
+def comparar(base, novo, tolerancia=TOLERANCIA):
+	"""Regressões de `novo` em relação a `base`: (tamanho, endpoint, métrica, antes, depois)."""
+	regressoes = []
+	for tamanho, conjunto in novo['conjuntos'].items():
+		anteriores = base['conjuntos'].get(tamanho, {}).get('endpoints', {})
+		for nome, medicao in conjunto['endpoints'].items():
+			anterior = anteriores.get(nome)
+			if anterior is None:
+				continue
+			if medicao['p95_ms'] > anterior['p95_ms'] * (1 + tolerancia) and medicao['p95_ms'] - anterior['p95_ms'] > FOLGA_MS:
+				regressoes.append((tamanho, nome, 'p95_ms', anterior['p95_ms'], medicao['p95_ms']))
+			if medicao['consultas'] > anterior['consultas']:
+				regressoes.append((tamanho, nome, 'consultas', anterior['consultas'], medicao['consultas']))
+			if (medicao['linhas_varridas'] or 0) > (anterior['linhas_varridas'] or 0) * (1 + tolerancia):
+				regressoes.append((tamanho, nome, 'linhas_varridas', anterior['linhas_varridas'], medicao['linhas_varridas']))
+			if medicao['bytes'] > anterior['bytes'] * (1 + tolerancia):
+				regressoes.append((tamanho, nome, 'bytes', anterior['bytes'], medicao['bytes']))
+			if medicao['erros'] and not anterior['erros']:
+				regressoes.append((tamanho, nome, 'erros', anterior['erros'], medicao['erros']))
+	return regressoes
+
+
+def executar_comparacao(argumentos):
+	with open(argumentos.base, encoding='utf-8') as arquivo:
+		base = json.load(arquivo)
+	with open(argumentos.novo, encoding='utf-8') as arquivo:
+		novo = json.load(arquivo)
+	regressoes = comparar(base, novo, argumentos.tolerancia)
+	for tamanho, nome, metrica, antes, depois in regressoes:
+		print(f"REGRESSÃO [{tamanho}] {nome}: {metrica} {antes} -> {depois}")
+	print(f"{len(regressoes)} regressão(ões) com tolerância de {argumentos.tolerancia:.0%}")
+	return 1 if regressoes else 0
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Benchmark dos endpoints da API.')
+	comandos = parser.add_subparsers(dest='comando', required=True)
+	execucao = comandos.add_parser('executar', help='Mede todas as rotas em cada tamanho de base.')
+	execucao.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS, help='Matrículas de cada base.')
+	execucao.add_argument('--repeticoes', type=int, default=REPETICOES, help='Requisições por caso.')
+	execucao.add_argument('--tempo-maximo', type=float, default=TEMPO_MAXIMO, help='Segundos por caso (ao menos uma requisição).')
+	execucao.add_argument('--cache-quente', action='store_true', help='Mantém o cache entre as requisições.')
+	execucao.add_argument('--dados', default=DIRETORIO_DADOS, help='Diretório das bases geradas.')
+	execucao.add_argument('--saida', default='benchmark.json', help='Arquivo JSON com os resultados.')
+	comparacao = comandos.add_parser('comparar', help='Compara dois resultados e aponta as regressões.')
+	comparacao.add_argument('base')
+	comparacao.add_argument('novo')
+	comparacao.add_argument('--tolerancia', type=float, default=TOLERANCIA, help='Aumento relativo tolerado (padrão: 0.2).')
+	argumentos = parser.parse_args()
+	if argumentos.comando == 'executar':
+		executar(argumentos)
+	else:
+		sys.exit(executar_comparacao(argumentos))
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,55 @@
+import os
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'setup.settings')
+django.setup()
+
+from rest_framework.renderers import JSONRenderer
+from escola.models import Avaliacao, AtividadeAvaliativa
+from escola.renderers import JSONRapidoRenderer, MessagePackRenderer
+from escola.serializer import AvaliacaoSerializer, AtividadeAvaliativaSerializer
+
+"""
+Compara os renderers da API sobre listas de 10 mil linhas serializadas de
+/atividades/ e /avaliacoes/:
+- JSONRenderer do DRF (referência)
+- JSONRapidoRenderer (orjson); confere que os bytes são idênticos
+- MessagePackRenderer
+Mostra o tempo médio de renderização, linhas por segundo e o tamanho.
+"""
+
+LINHAS = 10000
+REPETICOES = 10
+
+
+def medir(nome, renderer, data, referencia=None):
+	renderer.render(data)
+	inicio = time.perf_counter()
+	for _ in range(REPETICOES):
+		conteudo = renderer.render(data)
+	duracao = (time.perf_counter() - inicio) / REPETICOES
+	igual = '' if referencia is None else ('  bytes idênticos' if conteudo == referencia else '  BYTES DIFERENTES')
+	print(f"  {nome:<22} {duracao * 1000:>8.1f} ms {len(data) / duracao:>12,.0f} linhas/s {len(conteudo) / 1024:>9.0f} KB{igual}")
+	return conteudo
+
+
+def main():
+	cargas = [
+		('/atividades/', AtividadeAvaliativaSerializer(AtividadeAvaliativa.objects.order_by('-id')[:LINHAS], many=True).data),
+		('/avaliacoes/', AvaliacaoSerializer(Avaliacao.objects.order_by('-id')[:LINHAS], many=True).data),
+	]
+	if not all(len(data) == LINHAS for _, data in cargas):
+		print('Banco sem dados suficientes; gere dados antes de medir.')
+		return
+
+	for nome, data in cargas:
+		print(f"{nome} ({len(data)} linhas)")
+		referencia = medir('JSONRenderer (DRF)', JSONRenderer(), data)
+		medir('JSONRapidoRenderer', JSONRapidoRenderer(), data, referencia)
+		medir('MessagePackRenderer', MessagePackRenderer(), data)
+
+
+if __name__ == '__main__':
+	main()
@@ -1,12 +1,17 @@
 from django.contrib import admin
-from escola.models import Aluno, Curso, Matricula
+from escola import busca
+from escola.models import Aluno, Curso, Matricula, Avaliacao, AtividadeAvaliativa, Tarefa
 
 class Alunos(admin.ModelAdmin):
     list_display = ('id','nome', 'rg', 'cpf', 'data_nascimento')
     list_display_links = ('id', 'nome')
-    search_fields = ('nome',)
+    search_fields = ('nome', 'cpf', 'celular')
     list_per_page = 20
 
+    def get_search_results(self, request, queryset, search_term):
+        # Índice de busca (escola/busca.py) no lugar do LIKE '%termo%' de search_fields
+        return busca.filtrar(queryset, search_term), False
+
 admin.site.register(Aluno, Alunos)
 
 class Cursos(admin.ModelAdmin):
@@ -19,5 +24,37 @@ admin.site.register(Curso, Cursos)
 class Matriculas(admin.ModelAdmin):
     list_display = ('id', 'aluno', 'curso', 'periodo')
     list_display_links = ('id', )
+    list_select_related = ('aluno', 'curso')
+
+admin.site.register(Matricula, Matriculas)
+
+class AtividadesAvaliativas(admin.ModelAdmin):
+    list_display = ('id', '__str__', 'tipo', 'nota', 'entregue')
+    list_display_links = ('id', '__str__')
+    list_filter = ('tipo', 'entregue')
+    list_select_related = ('matricula__aluno',)
+    raw_id_fields = ('matricula',)
+    search_fields = ('titulo',)
+    list_per_page = 20
+
+admin.site.register(AtividadeAvaliativa, AtividadesAvaliativas)
+
+class Avaliacoes(admin.ModelAdmin):
+    list_display = ('id', '__str__', 'nota1', 'nota2', 'nota3', 'media', 'situacao')
+    list_display_links = ('id', '__str__')
+    list_filter = ('situacao',)
+    list_select_related = ('matricula__aluno', 'matricula__curso')
+    raw_id_fields = ('matricula',)
+    list_per_page = 20
+
+admin.site.register(Avaliacao, Avaliacoes)
+
+class Tarefas(admin.ModelAdmin):
+    list_display = ('id', 'tipo', 'situacao', 'processados', 'total', 'criada_em', 'concluida_em')
+    list_display_links = ('id', 'tipo')
+    list_filter = ('situacao', 'tipo')
+    readonly_fields = ('situacao', 'total', 'processados', 'posicao', 'duracao', 'resultado', 'erro', 'trabalhador',
+                       'iniciada_em', 'concluida_em')
+    list_per_page = 20
 
-admin.site.register(Matricula, Matriculas)
\ No newline at end of file
+admin.site.register(Tarefa, Tarefas)
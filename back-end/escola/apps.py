@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class EscolaConfig(AppConfig):
     name = 'escola'
+
+    def ready(self):
+        from escola import receivers  # noqa: F401
+        from escola import manutencao  # noqa: F401
@@ -0,0 +1,91 @@
+"""
+Leituras assíncronas para o deploy ASGI (setup/asgi.py).
+
+Com LEITURAS_ASSINCRONAS ativo, as listagens de alunos, cursos e matrículas
+são atendidas por corrotinas: a página é lida pelo ORM assíncrono e o cache é
+acessado com os métodos assíncronos, de modo que um cliente lento ou uma
+consulta demorada não prende uma thread do servidor enquanto espera.
+Autenticação, throttling e versionamento continuam sendo os do DRF, executados
+com sync_to_async. Os demais métodos (POST, PUT...) vão para a view síncrona.
+"""
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+
+
+class LeituraAssincronaMixin:
+    """Adiciona a uma view de listagem com RespostaEmCacheMixin a versão
+    assíncrona do GET, obtida com as_view_assincrona()."""
+
+    @classmethod
+    def as_view_assincrona(cls, actions=None, **initkwargs):
+        """Como as_view(), para as rotas do ASGI. `actions` segue o formato do
+        as_view() dos viewsets ({'get': 'list', 'post': 'create'})."""
+        if actions is not None:
+            sincrona = cls.as_view(actions, **initkwargs)
+        else:
+            sincrona = cls.as_view(**initkwargs)
+
+        async def view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return await sync_to_async(sincrona)(request, *args, **kwargs)
+            self = cls(**initkwargs)
+            if actions is not None:
+                self.action_map = dict(actions, head=actions['get'])
+            return await self.adispatch(request, *args, **kwargs)
+
+        view.cls = cls
+        view.initkwargs = initkwargs
+        view.actions = actions
+        # Como o csrf_exempt do as_view(), sem envolver a corrotina em uma função síncrona
+        view.csrf_exempt = True
+        return view
+
+    async def adispatch(self, request, *args, **kwargs):
+        """dispatch() do APIView para o GET, com a consulta e o cache assíncronos."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # Autenticação (consulta o usuário), permissões e throttling
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await self.aresposta_em_cache(request, self.alist, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self._renderizada(self.response)
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        paginator = self.paginator
+        if paginator is not None and hasattr(paginator, 'apaginate_queryset'):
+            page = await paginator.apaginate_queryset(queryset, request, view=self)
+        elif paginator is not None:
+            page = await sync_to_async(paginator.paginate_queryset)(queryset, request, view=self)
+        else:
+            page = None
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer([obj async for obj in queryset], many=True)
+        return Response(serializer.data)
+
+    def _renderizada(self, response):
+        # O handler do ASGI renderiza respostas do DRF em uma thread; o JSON é
+        # renderizado aqui mesmo. A API navegável consulta o banco para montar
+        # os formulários e continua sendo renderizada pelo handler.
+        if not isinstance(response, Response) or isinstance(response.accepted_renderer, BrowsableAPIRenderer):
+            return response
+        response.render()
+        renderizada = HttpResponse(response.content, status=response.status_code)
+        for cabecalho, valor in response.items():
+            renderizada[cabecalho] = valor
+        return renderizada
@@ -0,0 +1,126 @@
+"""
+Busca de alunos pelo índice de texto completo do SQLite (FTS5).
+
+A tabela virtual escola_aluno_busca tem uma linha por aluno (rowid = id do
+aluno). Ela guarda o nome sem acentos, via text-unidecode, e apenas os dígitos
+de cpf e celular. Cada palavra buscada vira uma consulta de prefixo respondida
+pelo índice, sem percorrer a tabela de alunos com LIKE '%x%'. Assim "joao"
+encontra "João" e "123" encontra os cpfs e celulares que começam com 123.
+
+Os receptores em escola/receivers.py mantêm o índice na mesma transação das
+gravações, inclusive as em lote. O comando reindexar_busca reconstrói o índice
+do zero. Em outros bancos a busca usa icontains/startswith.
+"""
+
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+from text_unidecode import unidecode
+
+TABELA = 'escola_aluno_busca'
+CAMPOS = ('nome', 'cpf', 'celular')
+
+
+def disponivel(using=DEFAULT_DB_ALIAS):
+    return connections[using].vendor == 'sqlite'
+
+
+def normalizar(texto):
+    return unidecode(texto or '').lower()
+
+
+def digitos(texto):
+    return re.sub(r'\D', '', texto or '')
+
+
+def _linhas(alunos):
+    # Sem pk (bulk_create com ignore_conflicts) não há como saber a linha do índice
+    return [
+        (aluno.pk, normalizar(aluno.nome), digitos(aluno.cpf), digitos(aluno.celular))
+        for aluno in alunos if aluno.pk is not None
+    ]
+
+
+def indexar(alunos, using=DEFAULT_DB_ALIAS):
+    """Insere ou substitui os alunos informados no índice."""
+    linhas = _linhas(alunos)
+    if not linhas or not disponivel(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(f'INSERT OR REPLACE INTO {TABELA} (rowid, nome, cpf, celular) VALUES (%s, %s, %s, %s)', linhas)
+
+
+def remover(pks, using=DEFAULT_DB_ALIAS):
+    pks = [(pk,) for pk in pks]
+    if not pks or not disponivel(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {TABELA} WHERE rowid = %s', pks)
+
+
+def reindexar(pks, using=DEFAULT_DB_ALIAS):
+    """Relê do banco os alunos informados (os que não existem mais saem do índice)."""
+    from escola.models import Aluno
+
+    pks = set(pks)
+    alunos = list(Aluno.objects.using(using).filter(pk__in=pks).only(*CAMPOS))
+    remover(pks - {aluno.pk for aluno in alunos}, using=using)
+    indexar(alunos, using=using)
+
+
+def reconstruir(using=DEFAULT_DB_ALIAS, batch_size=5000):
+    """Apaga e preenche o índice com todos os alunos. Retorna a quantidade indexada."""
+    from escola.models import Aluno
+
+    if not disponivel(using):
+        return 0
+    total = 0
+    with transaction.atomic(using=using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABELA}')
+        lote = []
+        for aluno in Aluno.objects.using(using).only(*CAMPOS).iterator(chunk_size=batch_size):
+            lote.append(aluno)
+            if len(lote) == batch_size:
+                indexar(lote, using=using)
+                total, lote = total + len(lote), []
+        indexar(lote, using=using)
+        total += len(lote)
+        with connections[using].cursor() as cursor:
+            # Junta os segmentos criados pelas inserções em um só
+            cursor.execute(f"INSERT INTO {TABELA} ({TABELA}) VALUES ('optimize')")
+    return total
+
+
+def termos(busca):
+    """Palavras da busca, sem acentos. Uma busca sem letras (cpf ou telefone
+    com pontuação) vira um único número."""
+    texto = normalizar(busca)
+    if not re.search(r'[a-z]', texto):
+        return [digitos(texto)] if digitos(texto) else []
+    return re.findall(r'[a-z0-9]+', texto)
+
+
+def filtrar(queryset, busca):
+    """Restringe um queryset de Aluno aos que contêm todas as palavras de
+    `busca` como prefixo de uma palavra do nome, do cpf ou do celular."""
+    palavras = termos(busca)
+    if not palavras:
+        return queryset
+    if not disponivel(queryset.db):
+        for palavra in palavras:
+            queryset = queryset.filter(Q(nome__icontains=palavra) | Q(cpf__startswith=palavra) | Q(celular__startswith=palavra))
+        return queryset
+    consulta = ' '.join(f'"{palavra}"*' for palavra in palavras)
+    return queryset.filter(pk__in=RawSQL(f'SELECT rowid FROM {TABELA} WHERE {TABELA} MATCH %s', [consulta]))
+
+
+class BuscaAlunos(BaseFilterBackend):
+    """Filtra os alunos por ?search= usando o índice de busca"""
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        return filtrar(queryset, request.query_params.get(self.search_param, ''))
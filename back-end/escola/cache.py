@@ -0,0 +1,233 @@
+"""
+Cache compartilhado das respostas de leitura da API.
+
+As chaves incluem a versão de cada modelo do qual a resposta depende. Qualquer
+gravação em um modelo incrementa a sua versão, o que invalida apenas as
+respostas que dependem dele, sem precisar apagar chaves uma a uma.
+
+As mesmas versões formam o ETag das respostas: um GET com If-None-Match igual
+ao ETag atual recebe 304 sem executar a consulta nem o serializer.
+
+Com o cache compartilhado entre os workers (Redis, CACHE_COMPARTILHADO), as
+versões ficam no próprio cache. Sem ele, cada processo tem o seu cache e não vê
+as versões incrementadas pelos outros: elas ficam então no banco (VersaoModelo),
+incrementadas na mesma transação da gravação, ao custo de uma consulta por
+leitura. As respostas continuam no cache local, por CACHE_API_TIMEOUT_LOCAL
+segundos.
+"""
+
+import hashlib
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from rest_framework.response import Response
+
+from escola import metricas, replicas
+from escola.models import VersaoModelo
+
+PREFIXO = 'escola'
+CHAVE_ACERTOS = f'{PREFIXO}:cache:acertos'
+CHAVE_FALHAS = f'{PREFIXO}:cache:falhas'
+
+
+def _chave_versao(modelo):
+    return f'{PREFIXO}:versao:{modelo._meta.label_lower}'
+
+
+def _versao_inicial():
+    # Baseada no relógio para não reaproveitar uma versão antiga caso a chave seja descartada
+    return int(time.time() * 1000)
+
+
+def _rotulos(modelos):
+    return [modelo._meta.label_lower for modelo in modelos]
+
+
+def versoes(modelos):
+    """Retorna a versão atual de cada modelo, na ordem recebida."""
+    if not compartilhado():
+        rotulos = _rotulos(modelos)
+        atuais = dict(VersaoModelo.objects.filter(modelo__in=rotulos).values_list('modelo', 'versao'))
+        return [atuais.get(rotulo, 0) for rotulo in rotulos]
+    chaves = [_chave_versao(modelo) for modelo in modelos]
+    atuais = cache.get_many(chaves)
+    for chave in chaves:
+        if chave not in atuais:
+            cache.add(chave, _versao_inicial(), timeout=None)
+            atuais[chave] = cache.get(chave)
+    return [atuais[chave] for chave in chaves]
+
+
+async def aversoes(modelos):
+    """Versão assíncrona de versoes, para as views assíncronas."""
+    if not compartilhado():
+        rotulos = _rotulos(modelos)
+        consulta = VersaoModelo.objects.filter(modelo__in=rotulos).values_list('modelo', 'versao')
+        atuais = {rotulo: versao async for rotulo, versao in consulta}
+        return [atuais.get(rotulo, 0) for rotulo in rotulos]
+    chaves = [_chave_versao(modelo) for modelo in modelos]
+    atuais = await cache.aget_many(chaves)
+    for chave in chaves:
+        if chave not in atuais:
+            await cache.aadd(chave, _versao_inicial(), timeout=None)
+            atuais[chave] = await cache.aget(chave)
+    return [atuais[chave] for chave in chaves]
+
+
+def compartilhado():
+    return getattr(settings, 'CACHE_COMPARTILHADO', False)
+
+
+def validade():
+    """Segundos em que uma resposta fica no cache."""
+    if compartilhado():
+        return getattr(settings, 'CACHE_API_TIMEOUT', 300)
+    return getattr(settings, 'CACHE_API_TIMEOUT_LOCAL', 20)
+
+
+def _incrementar(chave, inicial, timeout=None):
+    try:
+        return cache.incr(chave)
+    except ValueError:
+        cache.set(chave, inicial, timeout=timeout)
+        return inicial
+
+
+async def _aincrementar(chave, inicial, timeout=None):
+    try:
+        return await cache.aincr(chave)
+    except ValueError:
+        await cache.aset(chave, inicial, timeout=timeout)
+        return inicial
+
+
+def invalidar(modelo, using=DEFAULT_DB_ALIAS):
+    """Invalida as respostas que dependem do modelo.
+
+    No cache compartilhado, a versão é incrementada na hora e novamente após o
+    commit, para que uma leitura feita antes do commit não fique gravada com a
+    versão nova. No banco, ela muda junto com os dados, na mesma transação."""
+    if compartilhado():
+        incrementar = partial(_incrementar, _chave_versao(modelo), _versao_inicial())
+        incrementar()
+        transaction.on_commit(incrementar, using=using)
+    else:
+        versoes_do_modelo = VersaoModelo.objects.using(using).filter(modelo=modelo._meta.label_lower)
+        if not versoes_do_modelo.update(versao=F('versao') + 1):
+            VersaoModelo.objects.using(using).get_or_create(modelo=modelo._meta.label_lower, defaults={'versao': _versao_inicial()})
+    # A janela em que as réplicas podem não ter a gravação começa no commit
+    transaction.on_commit(partial(replicas.registrar_gravacao, modelo), using=using)
+
+
+def registrar_acesso(acerto):
+    _incrementar(CHAVE_ACERTOS if acerto else CHAVE_FALHAS, 1)
+    metricas.contar('escola_cache_acessos_total', resultado='acerto' if acerto else 'falha')
+
+
+async def aregistrar_acesso(acerto):
+    await _aincrementar(CHAVE_ACERTOS if acerto else CHAVE_FALHAS, 1)
+    metricas.contar('escola_cache_acessos_total', resultado='acerto' if acerto else 'falha')
+
+
+def estatisticas():
+    valores = cache.get_many([CHAVE_ACERTOS, CHAVE_FALHAS])
+    acertos = valores.get(CHAVE_ACERTOS, 0)
+    falhas = valores.get(CHAVE_FALHAS, 0)
+    total = acertos + falhas
+    return {
+        'acertos': acertos,
+        'falhas': falhas,
+        'taxa_acerto': round(acertos / total, 4) if total else 0.0,
+    }
+
+
+class RespostaEmCacheMixin:
+    """Guarda em cache as respostas de list/retrieve das views da API.
+
+    `modelos_cache` lista os modelos cujos dados aparecem na resposta; uma
+    gravação em qualquer um deles invalida a entrada."""
+    modelos_cache = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.resposta_em_cache(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.resposta_em_cache(request, super().retrieve, *args, **kwargs)
+
+    def get_modelos_cache(self):
+        return self.modelos_cache
+
+    def partes_cache(self, request):
+        partes = [request.get_host(), request.path, sorted(request.query_params.lists())]
+        return partes + versoes(self.get_modelos_cache())
+
+    async def apartes_cache(self, request):
+        partes = [request.get_host(), request.path, sorted(request.query_params.lists())]
+        return partes + await aversoes(self.get_modelos_cache())
+
+    def chave_cache(self, request, partes=None):
+        partes = self.partes_cache(request) if partes is None else partes
+        return f'{PREFIXO}:resposta:' + hashlib.sha1(repr(partes).encode()).hexdigest()
+
+    def etag(self, request, partes=None):
+        """Validador da resposta: as mesmas partes da chave (inclusive as versões
+        dos modelos) mais o formato pedido, sem executar a consulta."""
+        partes = self.partes_cache(request) if partes is None else partes
+        return '"{}"'.format(hashlib.sha1(repr(partes + [request.META.get('HTTP_ACCEPT', '')]).encode()).hexdigest())
+
+    def resposta_em_cache(self, request, view, *args, **kwargs):
+        partes = self.partes_cache(request)
+        etag = self.etag(request, partes)
+        # If-None-Match com a versão atual: 304 sem consultar o banco nem serializar
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            if not replicas.pode_guardar_em_cache(self.get_modelos_cache()):
+                # Lida de uma réplica talvez sem a última gravação: sem cache e sem ETag
+                return view(request, *args, **kwargs)
+            response = self._resposta(request, partes, view, *args, **kwargs)
+        return self._com_validador(response, etag)
+
+    async def aresposta_em_cache(self, request, view, *args, **kwargs):
+        """Como resposta_em_cache, com o cache acessado de forma assíncrona e
+        `view` sendo uma corrotina."""
+        partes = await self.apartes_cache(request)
+        etag = self.etag(request, partes)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            if not await replicas.apode_guardar_em_cache(self.get_modelos_cache()):
+                return await view(request, *args, **kwargs)
+            chave = self.chave_cache(request, partes)
+            dados = await cache.aget(chave)
+            await aregistrar_acesso(dados is not None)
+            if dados is not None:
+                response = Response(dados)
+            else:
+                response = await view(request, *args, **kwargs)
+                if response.status_code == 200:
+                    await cache.aset(chave, response.data, timeout=validade())
+        return self._com_validador(response, etag)
+
+    def _com_validador(self, response, etag):
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            # O navegador guarda a resposta, mas revalida a cada uso
+            patch_cache_control(response, no_cache=True)
+            patch_vary_headers(response, ['Accept'])
+        return response
+
+    def _resposta(self, request, partes, view, *args, **kwargs):
+        chave = self.chave_cache(request, partes)
+        dados = cache.get(chave)
+        registrar_acesso(dados is not None)
+        if dados is not None:
+            return Response(dados)
+
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(chave, response.data, timeout=validade())
+        return response
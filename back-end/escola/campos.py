@@ -0,0 +1,133 @@
+"""
+Campos sob demanda nas leituras da API.
+
+- ?fields=id,nome devolve apenas os campos pedidos. O queryset carrega só as
+  colunas correspondentes, com .only().
+- ?expand=aluno,curso troca as chaves estrangeiras listadas em `expansoes` do
+  serializer pelo objeto relacionado. O queryset o carrega com select_related,
+  no mesmo SELECT (JOIN), sem uma consulta por linha.
+- Os dois se combinam com caminhos separados por ponto: ?expand=matricula.aluno
+  e ?fields=id,matricula.aluno.nome.
+
+Só as leituras (GET/HEAD) são afetadas; gravações usam o serializer completo.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+PARAMETRO_CAMPOS = 'fields'
+PARAMETRO_EXPANDIR = 'expand'
+
+
+def arvore(texto):
+    """'id,aluno.nome,aluno.cpf' -> {'id': {}, 'aluno': {'nome': {}, 'cpf': {}}}"""
+    resultado = {}
+    for caminho in texto.split(','):
+        no = resultado
+        for parte in caminho.strip().split('.'):
+            if parte:
+                no = no.setdefault(parte, {})
+    return resultado
+
+
+class CamposDinamicosMixin:
+    """Serializer que aceita ?fields= e ?expand= (ver o módulo).
+
+    `expansoes` mapeia o nome de uma chave estrangeira para o serializer do
+    objeto relacionado. `campos_necessarios` lista as colunas lidas por campos
+    que não correspondem a uma coluna (SerializerMethodField, get_x_display)."""
+    expansoes = {}
+
+    def __init__(self, *args, campos=None, expandir=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if campos is None and expandir is None and request is not None and request.method in ('GET', 'HEAD'):
+            campos = arvore(request.query_params.get(PARAMETRO_CAMPOS, ''))
+            expandir = arvore(request.query_params.get(PARAMETRO_EXPANDIR, ''))
+        self._expandir(expandir or {}, campos or {})
+        self._restringir(campos or {})
+
+    def _expandir(self, expandir, campos):
+        invalidos = sorted(set(expandir) - set(self.expansoes))
+        if invalidos:
+            raise serializers.ValidationError({PARAMETRO_EXPANDIR: [f"Não é possível expandir: {', '.join(invalidos)}."]})
+        for nome, filhos in expandir.items():
+            self.fields[nome] = self.expansoes[nome](read_only=True, campos=campos.get(nome) or {}, expandir=filhos)
+
+    def _restringir(self, campos):
+        if not campos:
+            return
+        invalidos = sorted(set(campos) - set(self.fields))
+        if invalidos:
+            raise serializers.ValidationError({PARAMETRO_CAMPOS: [f"Campos inexistentes: {', '.join(invalidos)}."]})
+        for nome in set(self.fields) - set(campos):
+            self.fields.pop(nome)
+
+
+def colunas(serializer, prefixo=''):
+    """Retorna (colunas para .only(), relações para select_related) lidas pelo
+    serializer. As colunas são None se algum campo não puder ser ligado a uma
+    coluna; nesse caso o queryset carrega todas."""
+    modelo = serializer.Meta.model
+    somente, relacoes = [prefixo + modelo._meta.pk.name], []
+    for nome, campo in serializer.fields.items():
+        if isinstance(campo, CamposDinamicosMixin):
+            relacionadas, outras_relacoes = colunas(campo, f'{prefixo}{campo.source}__')
+            relacoes += [prefixo + campo.source] + outras_relacoes
+            if somente is not None and relacionadas is not None:
+                somente += [prefixo + campo.source] + relacionadas
+            else:
+                somente = None
+        elif somente is None:
+            continue
+        elif nome in getattr(serializer, 'campos_necessarios', {}):
+            somente += [prefixo + coluna for coluna in serializer.campos_necessarios[nome]]
+        else:
+            somente = _coluna(modelo, campo, somente, prefixo)
+    return somente, relacoes
+
+
+def _coluna(modelo, campo, somente, prefixo):
+    if not campo.source_attrs:
+        return None
+    try:
+        campo_modelo = modelo._meta.get_field(campo.source_attrs[0])
+    except FieldDoesNotExist:
+        return None
+    return somente + [prefixo + campo_modelo.name] if campo_modelo.concrete else None
+
+
+def modelos_expandidos(classe, expandir):
+    """Modelos dos objetos incluídos por `expandir` (nomes inválidos são ignorados)."""
+    modelos = []
+    for nome, filhos in expandir.items():
+        relacionado = getattr(classe, 'expansoes', {}).get(nome)
+        if relacionado is not None:
+            modelos += [relacionado.Meta.model] + modelos_expandidos(relacionado, filhos)
+    return modelos
+
+
+class CamposDinamicosViewMixin:
+    """Ajusta o queryset das leituras às colunas e relações que o serializer
+    vai usar (.only() e select_related). Deve vir antes de RespostaEmCacheMixin:
+    os modelos expandidos passam a fazer parte das versões da resposta."""
+
+    def get_modelos_cache(self):
+        modelos = list(super().get_modelos_cache())
+        expandir = arvore(self.request.query_params.get(PARAMETRO_EXPANDIR, ''))
+        for modelo in modelos_expandidos(self.get_serializer_class(), expandir):
+            if modelo not in modelos:
+                modelos.append(modelo)
+        return modelos
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method not in ('GET', 'HEAD'):
+            return queryset
+        params = self.request.query_params
+        if not params.get(PARAMETRO_CAMPOS) and not params.get(PARAMETRO_EXPANDIR):
+            return queryset
+        somente, relacoes = colunas(self.get_serializer())
+        if relacoes:
+            queryset = queryset.select_related(*relacoes)
+        return queryset if somente is None else queryset.only(*somente)
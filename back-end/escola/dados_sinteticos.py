@@ -0,0 +1,245 @@
+"""
+Geração de uma base sintética de tamanho configurável (comando gerar_dados),
+que os scripts gerar_100_alunos.py, seed.py e criar_dados_teste.py chamam.
+
+- Cursos: `areas` áreas × 3 níveis; os níveis básicos são os mais procurados.
+- Alunos com nome (Faker pt_BR), CPF válido e único, RG, celular e idade
+  concentrada entre 16 e 30 anos.
+- 1 a 3 matrículas por aluno (média de 1,7), em cursos diferentes.
+- Por matrícula, as provas e atividades padrão de escola/notas.py, com as
+  notas em distribuição normal de NOTAS_POR_TIPO (escola/manutencao.py); parte
+  das atividades não foi entregue. A avaliação é gravada já calculada, com as
+  mesmas notas que sincronizar_notas calcularia a partir das atividades.
+
+Os alunos são gerados em blocos de ALUNOS_POR_BLOCO, cada um com o seu
+gerador aleatório (semente e número do primeiro aluno do bloco): a base depende
+só da semente, dos tamanhos, da data base e dos alunos já cadastrados, não da
+quantidade de processos. A numeração continua do maior pk de Aluno: o aluno de
+número n recebe um pk maior que n, então os números (e os CPFs) não se repetem
+mesmo depois de alunos excluídos. Os blocos são gerados em paralelo e gravados pelo processo
+principal, na ordem, cada um em uma transação: alunos e matrículas com
+bulk_create, que devolve os pks; atividades e avaliações, que são a maior
+parte das linhas, com inserir_linhas (escola/models.py).
+"""
+
+import multiprocessing
+from datetime import timedelta
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from escola import busca, cache, painel
+from escola.manutencao import CURSOS_BASE, NIVEIS, NOTAS_POR_TIPO, PERIODOS, gerador, limitar
+from escola.models import Aluno, AtividadeAvaliativa, Avaliacao, Curso, Matricula
+from escola.notas import ATIVIDADES_PADRAO, suspender_recalculo
+
+ALUNOS_POR_BLOCO = 1000
+
+# Áreas além das de CURSOS_BASE; depois destas, as áreas se repetem numeradas
+AREAS_EXTRAS = [
+    {'nome': 'TypeScript', 'codigo': 'TS'},
+    {'nome': 'SQL', 'codigo': 'SQ'},
+    {'nome': 'Go', 'codigo': 'GO'},
+    {'nome': 'Rust', 'codigo': 'RS'},
+    {'nome': 'Kotlin', 'codigo': 'KT'},
+    {'nome': 'Data Science', 'codigo': 'DS'},
+    {'nome': 'DevOps', 'codigo': 'DO'},
+    {'nome': 'Segurança', 'codigo': 'SG'},
+]
+
+# Peso de cada nível na escolha do curso
+PESO_NIVEL = {'B': 3, 'I': 2, 'A': 1}
+
+MATRICULAS_POR_ALUNO = ([1, 2, 3], [50, 30, 20])
+PESO_PERIODO = [40, 25, 35]
+PROBABILIDADE_ENTREGA = 0.85
+DDDS = ['11', '21', '31', '41', '51', '61', '71', '81', '85', '91']
+
+# Multiplicador (primo com 10**9) que espalha os números base dos CPFs
+_ESPALHAR_CPF = 387420489 * 2 + 1
+
+_faker = None
+
+
+def definir_cursos(areas):
+    """(codigo_curso, descricao, nivel) dos cursos de `areas` áreas."""
+    todas = CURSOS_BASE + AREAS_EXTRAS
+    cursos = []
+    for indice in range(areas):
+        area = todas[indice % len(todas)]
+        rodada = indice // len(todas)
+        codigo = area['codigo'] + (str(rodada + 1) if rodada else '')
+        nome = area['nome'] + (f' {rodada + 1}' if rodada else '')
+        for nivel in NIVEIS:
+            cursos.append((f"{codigo}{nivel['nivel']}", f"{nome} - {nivel['descricao']}", nivel['nivel']))
+    return cursos
+
+
+def pesos_dos_cursos(cursos):
+    # Áreas do começo da lista e níveis básicos recebem mais matrículas
+    return [PESO_NIVEL[nivel] / (1 + indice // len(NIVEIS)) ** 0.5 for indice, (_, _, nivel) in enumerate(cursos)]
+
+
+def gerar_cpf(numero):
+    """CPF válido a partir dos 9 dígitos de `numero`."""
+    digitos = [int(digito) for digito in f'{numero:09d}']
+    for tamanho in (9, 10):
+        soma = sum(digito * peso for digito, peso in zip(digitos, range(tamanho + 1, 1, -1)))
+        resto = soma * 10 % 11
+        digitos.append(0 if resto == 10 else resto)
+    return ''.join(map(str, digitos))
+
+
+def _iniciar_faker():
+    global _faker
+    if _faker is None:
+        from faker import Faker
+        _faker = Faker('pt_BR')
+    return _faker
+
+
+def gerar_bloco(semente, inicio, fim, pesos, data_base):
+    """Gera os alunos inicio..fim-1 com as matrículas, atividades e notas.
+
+    Retorna tuplas simples (e não instâncias dos modelos), que são enviadas ao
+    processo principal: (nome, rg, cpf, data_nascimento, celular, matriculas),
+    com matriculas = [(indice_curso, periodo, atividades, notas)]."""
+    faker = _iniciar_faker()
+    faker.seed_instance(f'{semente}:nomes:{inicio}')
+    aleatorio = gerador(semente, f'bloco:{inicio}')
+    cursos = range(len(pesos))
+    deslocamento = semente % 10 ** 9
+
+    alunos = []
+    for numero in range(inicio, fim):
+        idade = 16 + min(int(abs(aleatorio.gauss(0, 8))), 50)
+        data_nascimento = data_base - timedelta(days=idade * 365 + aleatorio.randrange(365))
+        celular = f"{aleatorio.choice(DDDS)}9{aleatorio.randrange(10 ** 8):08d}"
+        cpf = gerar_cpf((numero * _ESPALHAR_CPF + deslocamento) % 10 ** 9)
+
+        quantidade = min(aleatorio.choices(*MATRICULAS_POR_ALUNO)[0], len(pesos))
+        escolhidos = []
+        while len(escolhidos) < quantidade:
+            curso = aleatorio.choices(cursos, pesos)[0]
+            if curso not in escolhidos:
+                escolhidos.append(curso)
+
+        matriculas = []
+        for curso in escolhidos:
+            periodo = aleatorio.choices(PERIODOS, PESO_PERIODO)[0]
+            atividades, provas, entregues = [], {}, []
+            for tipo, titulo, _ in ATIVIDADES_PADRAO:
+                media, desvio, casas = NOTAS_POR_TIPO[tipo]
+                entregue = tipo == 'P' or aleatorio.random() < PROBABILIDADE_ENTREGA
+                nota = round(limitar(aleatorio.gauss(mu=media, sigma=desvio)), casas) if entregue else None
+                entrega = data_base - timedelta(days=aleatorio.randint(1, 120)) if entregue else None
+                atividades.append((nota, entrega, entregue))
+                if tipo == 'P':
+                    provas[titulo] = nota
+                elif entregue:
+                    entregues.append(nota)
+            # Mesmo cálculo de escola.notas.calcular_notas
+            notas = (
+                provas['Prova 1'], provas['Prova 2'],
+                round(sum(entregues) / len(entregues), 2) if entregues else 0.0,
+            )
+            matriculas.append((curso, periodo, atividades, notas))
+
+        alunos.append((
+            faker.name()[:30], f'{aleatorio.randrange(10 ** 9):09d}', cpf, data_nascimento, celular, matriculas,
+        ))
+    return alunos
+
+
+def _gerar_bloco(argumentos):
+    return gerar_bloco(*argumentos)
+
+
+def gravar_bloco(alunos, cursos, batch_size=None):
+    """Grava um bloco gerado por gerar_bloco; `cursos` são as instâncias na
+    ordem dos índices. Retorna a quantidade de matrículas."""
+    novos = Aluno.objects.bulk_create([
+        Aluno(nome=nome, rg=rg, cpf=cpf, data_nascimento=data_nascimento, celular=celular)
+        for nome, rg, cpf, data_nascimento, celular, _ in alunos
+    ], batch_size=batch_size)
+
+    matriculas, dados = [], []
+    for aluno, (*_, matriculas_do_aluno) in zip(novos, alunos):
+        for curso, periodo, atividades, notas in matriculas_do_aluno:
+            matriculas.append(Matricula(aluno=aluno, curso=cursos[curso], periodo=periodo))
+            dados.append((atividades, notas))
+    Matricula.objects.bulk_create(matriculas, batch_size=batch_size)
+
+    # As avaliações são gravadas já calculadas: o recálculo disparado pelas
+    # atividades seria redundante
+    with suspender_recalculo():
+        AtividadeAvaliativa.objects.inserir_linhas([
+            AtividadeAvaliativa(
+                matricula_id=matricula.pk, tipo=tipo, titulo=titulo, descricao=descricao,
+                nota=nota, data_entrega=entrega, entregue=entregue,
+            )
+            for matricula, (atividades, _) in zip(matriculas, dados)
+            for (tipo, titulo, descricao), (nota, entrega, entregue) in zip(ATIVIDADES_PADRAO, atividades)
+        ])
+    Avaliacao.objects.inserir_linhas(
+        Avaliacao(matricula_id=matricula.pk, nota1=nota1, nota2=nota2, nota3=nota3)
+        for matricula, (_, (nota1, nota2, nota3)) in zip(matriculas, dados)
+    )
+    return len(matriculas)
+
+
+def limpar(using=DEFAULT_DB_ALIAS):
+    """Apaga alunos, cursos, matrículas, atividades e avaliações sem carregar
+    as linhas (o delete() do ORM busca cada objeto por causa dos receptores);
+    índice de busca, painel e cache são refeitos em seguida."""
+    conexao = connections[using]
+    with transaction.atomic(using=using):
+        with conexao.cursor() as cursor:
+            for modelo in (Avaliacao, AtividadeAvaliativa, Matricula, Aluno, Curso):
+                cursor.execute(f'DELETE FROM {conexao.ops.quote_name(modelo._meta.db_table)}')
+        busca.reconstruir(using=using)
+        painel.reconciliar(using=using)
+    for modelo in (Avaliacao, AtividadeAvaliativa, Matricula, Aluno, Curso):
+        cache.invalidar(modelo, using=using)
+
+
+def gerar_dados(alunos, areas=5, semente=20260110, data_base=None, processos=1, batch_size=None, progresso=None):
+    """Cria os cursos que faltarem (pelo código) e `alunos` alunos com as
+    matrículas, atividades e avaliações. `progresso`, se informado, é chamado
+    com (alunos gravados, matrículas gravadas) após cada bloco.
+    Retorna um resumo com as quantidades criadas."""
+    data_base = data_base or timezone.localdate()
+    definidos = definir_cursos(areas)
+    existentes = {curso.codigo_curso: curso for curso in Curso.objects.filter(codigo_curso__in=[c[0] for c in definidos])}
+    Curso.objects.bulk_create([
+        Curso(codigo_curso=codigo, descricao=descricao, nivel=nivel)
+        for codigo, descricao, nivel in definidos if codigo not in existentes
+    ])
+    por_codigo = {curso.codigo_curso: curso for curso in Curso.objects.filter(codigo_curso__in=[c[0] for c in definidos])}
+    cursos = [por_codigo[codigo] for codigo, _, _ in definidos]
+    pesos = pesos_dos_cursos(definidos)
+
+    primeiro = Aluno.objects.aggregate(maior=Max('pk'))['maior'] or 0
+    blocos = [
+        (semente, inicio, min(inicio + ALUNOS_POR_BLOCO, primeiro + alunos), pesos, data_base)
+        for inicio in range(primeiro, primeiro + alunos, ALUNOS_POR_BLOCO)
+    ]
+    resumo = {'cursos': len(definidos) - len(existentes), 'alunos': 0, 'matriculas': 0}
+
+    def gravar(gerados):
+        for bloco in gerados:
+            with transaction.atomic():
+                resumo['matriculas'] += gravar_bloco(bloco, cursos, batch_size=batch_size)
+            resumo['alunos'] += len(bloco)
+            if progresso is not None:
+                progresso(resumo['alunos'], resumo['matriculas'])
+
+    if processos <= 1 or len(blocos) <= 1:
+        gravar(map(_gerar_bloco, blocos))
+    else:
+        # Os processos filhos só geram os dados; o banco é usado apenas por este
+        with multiprocessing.Pool(processos, initializer=_iniciar_faker) as pool:
+            gravar(pool.imap(_gerar_bloco, blocos))
+    resumo['atividades'] = resumo['matriculas'] * len(ATIVIDADES_PADRAO)
+    return resumo
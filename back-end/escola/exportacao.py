@@ -0,0 +1,108 @@
+"""
+Exportação completa das tabelas da escola em CSV ou NDJSON.
+
+As linhas são lidas com QuerySet.iterator(chunk_size=...) já com os nomes
+relacionados resolvidos por JOIN, e enviadas aos poucos em uma
+StreamingHttpResponse: o uso de memória não depende do tamanho da tabela.
+"""
+
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+from escola.models import Aluno, Matricula, Avaliacao, AtividadeAvaliativa
+
+TAMANHO_BLOCO = 2000
+
+
+def _alunos():
+    queryset = Aluno.objects.order_by('pk').values_list('pk', 'nome', 'rg', 'cpf', 'data_nascimento', 'celular')
+    return queryset, ['id', 'nome', 'rg', 'cpf', 'data_nascimento', 'celular']
+
+
+def _matriculas():
+    queryset = Matricula.objects.order_by('pk').annotate(
+        aluno_nome=F('aluno__nome'),
+        curso_descricao=F('curso__descricao'),
+    ).values_list('pk', 'aluno_id', 'aluno_nome', 'curso_id', 'curso_descricao', 'periodo')
+    return queryset, ['id', 'aluno', 'aluno_nome', 'curso', 'curso_descricao', 'periodo']
+
+
+def _avaliacoes():
+    queryset = Avaliacao.objects.order_by('pk').annotate(
+        aluno_nome=F('matricula__aluno__nome'),
+        curso_descricao=F('matricula__curso__descricao'),
+        media_exportada=Cast('media', FloatField()),
+    ).values_list(
+        'pk', 'matricula_id', 'aluno_nome', 'curso_descricao',
+        'nota1', 'nota2', 'nota3', 'media_exportada', 'situacao', 'data_criacao',
+    )
+    return queryset, [
+        'id', 'matricula', 'aluno_nome', 'curso_descricao',
+        'nota1', 'nota2', 'nota3', 'media', 'situacao', 'data_criacao',
+    ]
+
+
+def _atividades():
+    queryset = AtividadeAvaliativa.objects.order_by('pk').annotate(
+        aluno_nome=F('matricula__aluno__nome'),
+        curso_descricao=F('matricula__curso__descricao'),
+    ).values_list(
+        'pk', 'matricula_id', 'aluno_nome', 'curso_descricao', 'tipo', 'titulo',
+        'nota', 'data_entrega', 'entregue', 'data_criacao',
+    )
+    return queryset, [
+        'id', 'matricula', 'aluno_nome', 'curso_descricao', 'tipo', 'titulo',
+        'nota', 'data_entrega', 'entregue', 'data_criacao',
+    ]
+
+
+EXPORTACOES = {
+    'alunos': _alunos,
+    'matriculas': _matriculas,
+    'avaliacoes': _avaliacoes,
+    'atividades': _atividades,
+}
+
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+
+class _Eco:
+    """Pseudo-arquivo para o csv.writer: devolve a linha em vez de guardá-la"""
+    def write(self, valor):
+        return valor
+
+
+def _linhas_csv(queryset, colunas):
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(colunas)
+    for linha in queryset.iterator(chunk_size=TAMANHO_BLOCO):
+        yield escritor.writerow(linha)
+
+
+def _linhas_ndjson(queryset, colunas):
+    codificador = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for linha in queryset.iterator(chunk_size=TAMANHO_BLOCO):
+        yield codificador.encode(dict(zip(colunas, linha))) + '\n'
+
+
+def exportar(recurso, formato):
+    """Gera o conteúdo da exportação em blocos de texto prontos para envio."""
+    queryset, colunas = EXPORTACOES[recurso]()
+    linhas = _linhas_csv(queryset, colunas) if formato == 'csv' else _linhas_ndjson(queryset, colunas)
+
+    # A primeira linha sai sozinha, para o cliente receber os primeiros bytes
+    # imediatamente; as demais são agrupadas em blocos
+    bloco, primeira = [], True
+    for linha in linhas:
+        bloco.append(linha)
+        if primeira or len(bloco) >= 500:
+            yield ''.join(bloco)
+            bloco, primeira = [], False
+    if bloco:
+        yield ''.join(bloco)
@@ -0,0 +1,129 @@
+"""
+Importação de alunos em massa a partir de CSV ou NDJSON.
+
+Os registros são lidos e processados em lotes. Em cada lote o CPF é validado
+com o validate-docbr, duplicados são detectados com uma única consulta
+(cpf__in) contra os alunos já cadastrados mais um conjunto com os CPFs já vistos
+no próprio arquivo, e os alunos aceitos são inseridos com bulk_create.
+"""
+
+import csv
+import io
+import json
+import re
+from datetime import date
+from itertools import islice
+
+from django.db import transaction
+from validate_docbr import CPF
+
+from escola.models import Aluno
+
+TAMANHO_LOTE = 5000
+MAX_ERROS_RELATORIO = 1000
+NAO_DIGITOS = re.compile(r'\D')
+TAMANHOS = {campo: Aluno._meta.get_field(campo).max_length for campo in ('nome', 'rg', 'celular')}
+
+
+def ler_csv(arquivo):
+    """Lê registros de um arquivo CSV com cabeçalho (texto ou binário UTF-8)."""
+    if not isinstance(arquivo, io.TextIOBase):
+        arquivo = io.TextIOWrapper(arquivo, encoding='utf-8-sig', newline='')
+    for registro in csv.DictReader(arquivo):
+        yield registro
+
+
+def ler_ndjson(arquivo):
+    """Lê um objeto JSON por linha; linhas inválidas viram registros vazios e são rejeitadas."""
+    for linha in arquivo:
+        if isinstance(linha, bytes):
+            linha = linha.decode('utf-8-sig')
+        if not linha.strip():
+            continue
+        try:
+            registro = json.loads(linha)
+        except ValueError:
+            registro = None
+        yield registro if isinstance(registro, dict) else {}
+
+
+LEITORES = {
+    'csv': ler_csv,
+    'ndjson': ler_ndjson,
+}
+
+
+def _texto(registro, campo):
+    valor = registro.get(campo)
+    return '' if valor is None else str(valor).strip()
+
+
+def validar_registro(registro, validador_cpf):
+    """Retorna (aluno, None) para um registro válido ou (None, motivo)."""
+    nome = _texto(registro, 'nome')
+    rg = _texto(registro, 'rg')
+    cpf = NAO_DIGITOS.sub('', _texto(registro, 'cpf'))
+    celular = NAO_DIGITOS.sub('', _texto(registro, 'celular'))
+
+    if not nome or len(nome) > TAMANHOS['nome']:
+        return None, f"nome ausente ou maior que {TAMANHOS['nome']} caracteres"
+    if not rg or len(rg) > TAMANHOS['rg']:
+        return None, f"rg ausente ou maior que {TAMANHOS['rg']} caracteres"
+    if len(cpf) != 11 or not validador_cpf.validate(cpf):
+        return None, 'cpf inválido'
+    if len(celular) > TAMANHOS['celular']:
+        return None, f"celular maior que {TAMANHOS['celular']} dígitos"
+    try:
+        data_nascimento = date.fromisoformat(_texto(registro, 'data_nascimento'))
+    except ValueError:
+        return None, 'data_nascimento inválida (use AAAA-MM-DD)'
+
+    return Aluno(nome=nome, rg=rg, cpf=cpf, data_nascimento=data_nascimento, celular=celular), None
+
+
+def importar_alunos(registros, tamanho_lote=TAMANHO_LOTE):
+    """Importa os registros e retorna um relatório com aceitos, rejeitados e os motivos.
+
+    Nos erros, 'linha' é a posição do registro no arquivo (1 = primeiro registro)."""
+    validador_cpf = CPF()
+    cpfs_vistos = set()
+    relatorio = {'aceitos': 0, 'rejeitados': 0, 'erros': []}
+
+    def rejeitar(linha, registro, motivo):
+        relatorio['rejeitados'] += 1
+        if len(relatorio['erros']) < MAX_ERROS_RELATORIO:
+            relatorio['erros'].append({'linha': linha, 'cpf': _texto(registro, 'cpf'), 'motivo': motivo})
+
+    registros = enumerate(registros, start=1)
+    while True:
+        lote = list(islice(registros, tamanho_lote))
+        if not lote:
+            break
+
+        validos = []
+        for linha, registro in lote:
+            aluno, motivo = validar_registro(registro, validador_cpf)
+            if motivo:
+                rejeitar(linha, registro, motivo)
+            elif aluno.cpf in cpfs_vistos:
+                rejeitar(linha, registro, 'cpf repetido no arquivo')
+            else:
+                cpfs_vistos.add(aluno.cpf)
+                validos.append((linha, registro, aluno))
+
+        cadastrados = set(
+            Aluno.objects.filter(cpf__in=[aluno.cpf for _, _, aluno in validos]).values_list('cpf', flat=True)
+        )
+        novos = []
+        for linha, registro, aluno in validos:
+            if aluno.cpf in cadastrados:
+                rejeitar(linha, registro, 'cpf já cadastrado')
+            else:
+                novos.append(aluno)
+
+        with transaction.atomic():
+            Aluno.objects.bulk_create(novos)
+        relatorio['aceitos'] += len(novos)
+
+    relatorio['erros'].sort(key=lambda erro: erro['linha'])
+    return relatorio
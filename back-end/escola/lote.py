@@ -0,0 +1,182 @@
+"""
+Criação e atualização em lote pela API.
+
+Todo o payload é validado em uma passada, com as chaves estrangeiras carregadas
+em uma consulta por campo, as restrições de unicidade conferidas para o lote
+inteiro em uma consulta por restrição, e gravado com bulk_create/bulk_update em uma única
+transação. Se algum item for inválido nada é gravado e a resposta traz os erros
+de cada item pelo seu índice na lista.
+"""
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueTogetherValidator
+
+
+class RelacionadoPreCarregado(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField que usa os objetos carregados previamente pela
+    gravação em lote (context['precarregados']) em vez de uma consulta por item."""
+
+    def to_internal_value(self, data):
+        precarregados = self.context.get('precarregados', {}).get(self.field_name)
+        if precarregados is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = self.get_queryset().model._meta.pk.to_python(data)
+        except (TypeError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in precarregados:
+            self.fail('does_not_exist', pk_value=data)
+        return precarregados[pk]
+
+
+class GravacaoEmLoteMixin:
+    """Adiciona POST/PATCH em <rota>/lote/ recebendo uma lista de objetos.
+
+    POST cria todos os itens; PATCH atualiza parcialmente os itens identificados por 'id'."""
+
+    @action(detail=False, methods=['post', 'patch'], url_path='lote')
+    def lote(self, request, *args, **kwargs):
+        itens = request.data
+        if not isinstance(itens, list):
+            return Response({'detail': 'Envie uma lista de objetos.'}, status=status.HTTP_400_BAD_REQUEST)
+        maximo = getattr(settings, 'LOTE_MAX_ITENS', 5000)
+        if len(itens) > maximo:
+            return Response(
+                {'detail': f'O lote pode ter no máximo {maximo} itens.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if request.method == 'POST':
+            return self.criar_em_lote(itens)
+        return self.atualizar_em_lote(itens)
+
+    def get_serializer_lote(self, itens, partial=False):
+        contexto = self.get_serializer_context()
+        serializer = self.get_serializer_class()(context=contexto, partial=partial)
+        contexto['precarregados'] = self.precarregar(serializer, itens)
+        # A unicidade entre campos é conferida para o lote todo em validar_unicidade
+        self.validadores_unicidade = [
+            validador for validador in serializer.validators if isinstance(validador, UniqueTogetherValidator)
+        ]
+        serializer.validators = [
+            validador for validador in serializer.validators if validador not in self.validadores_unicidade
+        ]
+        return serializer
+
+    def precarregar(self, serializer, itens):
+        precarregados = {}
+        for nome, campo in serializer.fields.items():
+            if not isinstance(campo, RelacionadoPreCarregado) or campo.read_only:
+                continue
+            pks = set()
+            for item in itens:
+                if not isinstance(item, dict) or item.get(nome) is None:
+                    continue
+                try:
+                    pks.add(campo.get_queryset().model._meta.pk.to_python(item[nome]))
+                except (TypeError, DjangoValidationError):
+                    continue
+            precarregados[nome] = campo.get_queryset().in_bulk(pks)
+        return precarregados
+
+    def validar_itens(self, serializer, itens):
+        validados, erros = [], []
+        for indice, item in enumerate(itens):
+            try:
+                if not isinstance(item, dict):
+                    raise serializers.ValidationError({'non_field_errors': ['Item inválido; envie um objeto.']})
+                validados.append(serializer.run_validation(item))
+            except serializers.ValidationError as exc:
+                erros.append({'indice': indice, 'erros': exc.detail})
+        return validados, erros
+
+    def validar_unicidade(self, registros):
+        """Confere os UniqueTogetherValidator do serializer contra o banco e dentro
+        do próprio lote. `registros` são pares (dados validados, instância ou None).
+
+        Uma chave já gravada só é aceita para a própria linha que a possui: como a
+        restrição é verificada linha a linha, trocas de valores entre linhas do
+        mesmo lote também são recusadas."""
+        erros = {}
+        for validador in self.validadores_unicidade:
+            campos = list(validador.fields)
+            chaves = []
+            for dados, instancia in registros:
+                valores = (dados[campo] if campo in dados else instancia.serializable_value(campo) for campo in campos)
+                chaves.append(tuple(getattr(valor, 'pk', valor) for valor in valores))
+            filtros = {f'{campo}__in': {chave[posicao] for chave in chaves} for posicao, campo in enumerate(campos)}
+            existentes = {
+                tuple(linha[1:]): linha[0]
+                for linha in validador.queryset.filter(**filtros).values_list('pk', *campos)
+            }
+            mensagem = validador.message.format(field_names=', '.join(campos))
+            vistas = set()
+            for indice, ((_, instancia), chave) in enumerate(zip(registros, chaves)):
+                dono = existentes.get(chave)
+                if chave in vistas or (dono is not None and (instancia is None or dono != instancia.pk)):
+                    erros.setdefault(indice, {api_settings.NON_FIELD_ERRORS_KEY: []})[api_settings.NON_FIELD_ERRORS_KEY].append(mensagem)
+                vistas.add(chave)
+        return [{'indice': indice, 'erros': erros[indice]} for indice in sorted(erros)]
+
+    def resposta_erros(self, erros):
+        return Response({'erros': erros}, status=status.HTTP_400_BAD_REQUEST)
+
+    def criar_em_lote(self, itens):
+        serializer = self.get_serializer_lote(itens)
+        validados, erros = self.validar_itens(serializer, itens)
+        if not erros:
+            erros = self.validar_unicidade([(dados, None) for dados in validados])
+        if erros:
+            return self.resposta_erros(erros)
+
+        modelo = self.get_queryset().model
+        with transaction.atomic():
+            instancias = modelo.objects.bulk_create([modelo(**dados) for dados in validados])
+        saida = self.get_serializer_class()(instancias, many=True, context=self.get_serializer_context())
+        return Response(saida.data, status=status.HTTP_201_CREATED)
+
+    def atualizar_em_lote(self, itens):
+        modelo = self.get_queryset().model
+        ids, erros = [], []
+        for indice, item in enumerate(itens):
+            pk = item.get('id') if isinstance(item, dict) else None
+            try:
+                ids.append(modelo._meta.pk.to_python(pk) if pk is not None else None)
+            except (TypeError, DjangoValidationError):
+                ids.append(None)
+            if ids[-1] is None:
+                erros.append({'indice': indice, 'erros': {'id': ['Informe o id do objeto a ser atualizado.']}})
+
+        instancias = self.get_queryset().in_bulk([pk for pk in ids if pk is not None])
+        for indice, pk in enumerate(ids):
+            if pk is not None and pk not in instancias:
+                erros.append({'indice': indice, 'erros': {'id': [f'Objeto com id={pk} não encontrado.']}})
+
+        serializer = self.get_serializer_lote(itens, partial=True)
+        validados, erros_validacao = self.validar_itens(serializer, itens)
+        erros = sorted(erros + erros_validacao, key=lambda erro: erro['indice'])
+        if not erros:
+            erros = self.validar_unicidade([(dados, instancias[pk]) for pk, dados in zip(ids, validados)])
+        if erros:
+            return self.resposta_erros(erros)
+
+        alteradas, campos = {}, set()
+        for pk, dados in zip(ids, validados):
+            instancia = instancias[pk]
+            for campo, valor in dados.items():
+                setattr(instancia, campo, valor)
+            campos.update(dados)
+            alteradas[pk] = instancia
+
+        if campos:
+            with transaction.atomic():
+                modelo.objects.bulk_update(list(alteradas.values()), sorted(campos))
+        saida = self.get_serializer_class()(list(alteradas.values()), many=True, context=self.get_serializer_context())
+        return Response(saida.data, status=status.HTTP_200_OK)
@@ -0,0 +1,50 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework import serializers
+
+from escola import tarefas
+
+
+class Command(BaseCommand):
+    help = (
+        'Enfileira uma tarefa de manutenção (ver escola/manutencao.py) e a executa '
+        'neste processo, mostrando o progresso; com --fila apenas enfileira.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('tipo', help=f"Tipo da tarefa: {', '.join(sorted(tarefas.TIPOS))}.")
+        parser.add_argument('--parametro', action='append', default=[], metavar='NOME=VALOR', help='Parâmetro da tarefa (pode repetir).')
+        parser.add_argument('--fila', action='store_true', help='Apenas enfileira, para o comando trabalhador_tarefas.')
+
+    def handle(self, *args, **options):
+        parametros = {}
+        for parametro in options['parametro']:
+            nome, separador, valor = parametro.partition('=')
+            if not separador:
+                raise CommandError(f"Parâmetro inválido: {parametro!r} (use NOME=VALOR).")
+            parametros[nome] = valor
+        try:
+            tarefa = tarefas.enfileirar(options['tipo'], parametros)
+        except serializers.ValidationError as erro:
+            raise CommandError(json.dumps(erro.detail, ensure_ascii=False))
+        self.stdout.write(f"Tarefa #{tarefa.pk} ({tarefa.tipo}) enfileirada com {tarefa.parametros}")
+        if options['fila']:
+            return
+
+        trabalhador = tarefas.identificador()
+        tarefa = tarefas.reservar(trabalhador, tarefa.pk)
+        if tarefa is None:
+            raise CommandError('A tarefa foi reservada por outro trabalhador.')
+        tarefa = tarefas.executar(tarefa, trabalhador, progresso=self.progresso)
+        self.stdout.write(
+            f"Tarefa #{tarefa.pk}: {tarefa.get_situacao_display()}. {tarefa.processados} itens em "
+            f"{tarefa.duracao:.2f}s ({tarefa.itens_por_segundo or 0:.0f} itens/s)"
+        )
+        if tarefa.resultado:
+            self.stdout.write(f"Resultado: {tarefa.resultado}")
+        if tarefa.situacao == 'falhou':
+            raise CommandError(tarefa.erro)
+
+    def progresso(self, tarefa):
+        self.stdout.write(f"  {tarefa.processados}/{tarefa.total} ({tarefa.percentual}%)")
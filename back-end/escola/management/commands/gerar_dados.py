@@ -0,0 +1,49 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from escola import dados_sinteticos
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera uma base sintética: cursos (áreas × 3 níveis), alunos, matrículas, '
+        'provas, atividades e avaliações (ver escola/dados_sinteticos.py).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--alunos', type=int, default=100, help='Alunos a criar (padrão: 100; cerca de 1,7 matrícula por aluno).')
+        parser.add_argument('--areas', type=int, default=5, help='Áreas de cursos, cada uma com 3 níveis (padrão: 5).')
+        parser.add_argument('--semente', type=int, default=20260110, help='Semente dos dados aleatórios (padrão: 20260110).')
+        parser.add_argument('--data-base', type=date.fromisoformat, help='Data de referência das idades e entregas, AAAA-MM-DD (padrão: hoje).')
+        parser.add_argument('--processos', type=int, default=1, help='Processos que geram os dados em paralelo (padrão: 1).')
+        parser.add_argument('--tamanho-lote', type=int, help='batch_size do bulk_create (padrão: o máximo do banco).')
+        parser.add_argument('--limpar', action='store_true', help='Apaga alunos, cursos, matrículas, atividades e avaliações antes.')
+
+    def handle(self, *args, **options):
+        if options['alunos'] < 0 or options['areas'] < 1:
+            raise CommandError('Use --alunos >= 0 e --areas >= 1.')
+        inicio = time.perf_counter()
+        if options['limpar']:
+            dados_sinteticos.limpar()
+            self.stdout.write(f"Base limpa em {time.perf_counter() - inicio:.2f}s")
+
+        resumo = dados_sinteticos.gerar_dados(
+            options['alunos'],
+            areas=options['areas'],
+            semente=options['semente'],
+            data_base=options['data_base'],
+            processos=max(options['processos'], 1),
+            batch_size=options['tamanho_lote'],
+            progresso=self.progresso,
+        )
+        duracao = time.perf_counter() - inicio
+        taxa = resumo['matriculas'] / duracao if duracao > 0 else 0
+        self.stdout.write(
+            f"{resumo['cursos']} cursos, {resumo['alunos']} alunos, {resumo['matriculas']} matrículas e "
+            f"{resumo['atividades']} atividades em {duracao:.2f}s ({taxa:.0f} matrículas/s)"
+        )
+
+    def progresso(self, alunos, matriculas):
+        self.stdout.write(f"  {alunos} alunos, {matriculas} matrículas")
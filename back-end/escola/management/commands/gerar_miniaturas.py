@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from escola import miniaturas
+from escola.models import Aluno
+
+
+class Command(BaseCommand):
+    help = 'Gera as miniaturas das fotos dos alunos que ainda não as têm.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todas', action='store_true', help='Gera novamente também as miniaturas existentes.')
+
+    def handle(self, *args, **options):
+        geradas = falhas = 0
+        for nome in Aluno.objects.exclude(foto='').values_list('foto', flat=True).distinct().iterator():
+            if not options['todas'] and all(
+                Aluno.foto.field.storage.exists(miniaturas.caminho(nome, variante, formato))
+                for variante in miniaturas.VARIANTES for formato in miniaturas.FORMATOS
+            ):
+                continue
+            try:
+                miniaturas.gerar(nome, storage=Aluno.foto.field.storage, substituir=options['todas'])
+                geradas += 1
+            except Exception as exc:
+                falhas += 1
+                self.stderr.write(f'[x] {nome}: {exc}')
+        self.stdout.write(f'[✓] Miniaturas geradas para {geradas} fotos ({falhas} falhas)')
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from escola.importacao import LEITORES, TAMANHO_LOTE, importar_alunos
+
+
+class Command(BaseCommand):
+    help = 'Importa alunos em massa de um arquivo CSV (com cabeçalho) ou NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Caminho do arquivo com os alunos.')
+        parser.add_argument('--formato', choices=sorted(LEITORES), help='Padrão: extensão do arquivo.')
+        parser.add_argument('--tamanho-lote', type=int, default=TAMANHO_LOTE, help=f'Registros por lote (padrão: {TAMANHO_LOTE}).')
+
+    def handle(self, *args, **options):
+        formato = options['formato'] or options['arquivo'].rsplit('.', 1)[-1].lower()
+        if formato not in LEITORES:
+            raise CommandError('Formato inválido; use --formato csv ou --formato ndjson.')
+
+        inicio = time.perf_counter()
+        try:
+            with open(options['arquivo'], encoding='utf-8-sig', newline='') as arquivo:
+                relatorio = importar_alunos(LEITORES[formato](arquivo), tamanho_lote=max(options['tamanho_lote'], 1))
+        except OSError as exc:
+            raise CommandError(f'Não foi possível ler o arquivo: {exc}')
+        duracao = time.perf_counter() - inicio
+
+        for erro in relatorio['erros']:
+            self.stderr.write(f"[x] Linha {erro['linha']} (cpf {erro['cpf'] or '-'}): {erro['motivo']}")
+        if relatorio['rejeitados'] > len(relatorio['erros']):
+            self.stderr.write(f"... e mais {relatorio['rejeitados'] - len(relatorio['erros'])} rejeições")
+
+        total = relatorio['aceitos'] + relatorio['rejeitados']
+        taxa = total / duracao if duracao > 0 else 0
+        self.stdout.write(f"Aceitos: {relatorio['aceitos']} | Rejeitados: {relatorio['rejeitados']}")
+        self.stdout.write(f"{total} registros em {duracao:.2f}s ({taxa:.0f} registros/s)")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from escola.painel import reconciliar, valores
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói os contadores do painel contando as tabelas novamente.'
+
+    def handle(self, *args, **options):
+        anteriores = valores()
+        for chave, valor in reconciliar().items():
+            diferenca = valor - anteriores[chave]
+            marca = '✓' if diferenca == 0 else '!'
+            self.stdout.write(f"[{marca}] {chave}: {valor} (antes {anteriores[chave]}, diferença {diferenca:+d})")
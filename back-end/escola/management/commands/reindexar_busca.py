@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from escola.busca import disponivel, reconstruir
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca de alunos (FTS5) a partir da tabela de alunos.'
+
+    def handle(self, *args, **options):
+        if not disponivel():
+            self.stdout.write('[!] O índice de busca só existe no SQLite; nada a fazer.')
+            return
+        inicio = time.perf_counter()
+        total = reconstruir()
+        self.stdout.write(f'[✓] {total} alunos indexados em {time.perf_counter() - inicio:.2f}s')
@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from escola import motor_notas
+from escola.models import Curso, Matricula
+from escola.notas import sincronizar_matriculas
+
+
+class Command(BaseCommand):
+    help = (
+        'Garante as provas e atividades padrão de cada matrícula e recalcula as '
+        'avaliações (nota1, nota2, nota3) em lotes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--curso', type=int, help='Processa apenas as matrículas do curso com este id.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Matrículas processadas por lote (padrão: 1000).')
+        parser.add_argument('--dry-run', action='store_true', help='Calcula e exibe o resultado sem gravar no banco.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+        if batch_size < 1:
+            batch_size = 1
+
+        matriculas = Matricula.objects.order_by('curso_id', 'pk')
+        if options['curso'] is not None:
+            matriculas = matriculas.filter(curso_id=options['curso'])
+
+        inicio = time.perf_counter()
+        total_matriculas = 0
+        lote = []
+        for matricula_id in matriculas.values_list('pk', flat=True).iterator(chunk_size=batch_size):
+            lote.append(matricula_id)
+            if len(lote) == batch_size:
+                self.processar_lote(lote, batch_size, dry_run)
+                total_matriculas += len(lote)
+                lote = []
+        if lote:
+            self.processar_lote(lote, batch_size, dry_run)
+            total_matriculas += len(lote)
+        duracao = time.perf_counter() - inicio
+
+        self.stdout.write(f"Concluído. Matrículas processadas: {total_matriculas}")
+        taxa = total_matriculas / duracao if duracao > 0 else 0
+        self.stdout.write(f"{total_matriculas} matrículas em {duracao:.2f}s ({taxa:.0f} matrículas/s)")
+        if dry_run:
+            self.stdout.write("Dry-run: nenhuma alteração foi gravada.")
+
+    def processar_lote(self, matricula_ids, batch_size, dry_run):
+        faltantes, notas = sincronizar_matriculas(matricula_ids, batch_size=batch_size, dry_run=dry_run)
+
+        criadas = {}
+        for matricula_id, _, titulo, _ in faltantes:
+            criadas.setdefault(matricula_id, []).append(titulo)
+
+        regras = Curso.regras_por_matricula(notas.keys())
+        ordem = [matricula_id for matricula_id in matricula_ids if matricula_id in notas]
+        medias, situacoes = motor_notas.calcular_regras(
+            [notas[matricula_id] for matricula_id in ordem],
+            [regras.get(matricula_id, motor_notas.REGRA_PADRAO) for matricula_id in ordem],
+        )
+        for matricula_id, media, situacao in zip(ordem, medias.tolist(), situacoes):
+            for titulo in criadas.get(matricula_id, []):
+                self.stdout.write(f"[+] Criada {titulo} para matrícula {matricula_id}")
+            nota1, nota2, nota3 = notas[matricula_id]
+            self.stdout.write(
+                f"[✓] Matrícula {matricula_id}: n1={nota1} n2={nota2} n3={nota3} "
+                f"média={media} situação={motor_notas.SITUACOES[situacao]}"
+            )
@@ -0,0 +1,43 @@
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from escola import tarefas
+
+
+class Command(BaseCommand):
+    help = 'Executa as tarefas em segundo plano enfileiradas em /jobs/ (ver escola/tarefas.py).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processos', type=int, default=1, help='Processos trabalhadores (padrão: 1).')
+        parser.add_argument('--intervalo', type=float, help='Segundos entre as consultas à fila (padrão: TAREFAS_INTERVALO).')
+        parser.add_argument('--uma-vez', action='store_true', help='Termina quando não houver mais tarefas pendentes.')
+
+    def handle(self, *args, **options):
+        processos = max(options['processos'], 1)
+        self.stdout.write(f"{processos} trabalhador(es) aguardando tarefas: {', '.join(sorted(tarefas.TIPOS))}")
+        if processos == 1:
+            tarefas.trabalhar(intervalo=options['intervalo'], uma_vez=options['uma_vez'], progresso=self.progresso)
+            return
+
+        # Cada processo abre as suas conexões; as do processo pai não são herdadas
+        connections.close_all()
+        filhos = [
+            multiprocessing.Process(target=tarefas.trabalhar, kwargs={'intervalo': options['intervalo'], 'uma_vez': options['uma_vez']})
+            for _ in range(processos)
+        ]
+        for filho in filhos:
+            filho.start()
+        try:
+            for filho in filhos:
+                filho.join()
+        except KeyboardInterrupt:
+            for filho in filhos:
+                filho.terminate()
+
+    def progresso(self, tarefa):
+        self.stdout.write(
+            f"[{tarefa.tipo} #{tarefa.pk}] {tarefa.processados}/{tarefa.total} ({tarefa.percentual}%) "
+            f"{tarefa.itens_por_segundo or 0:.0f} itens/s"
+        )
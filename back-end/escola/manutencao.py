@@ -0,0 +1,227 @@
+"""
+Tarefas de manutenção executadas pelo subsistema de escola/tarefas.py, no
+lugar dos scripts que rodavam de uma vez e imprimiam o progresso:
+- sincronizar_notas: sincronizar_atividades_e_avaliacoes.py (sync_grades)
+- gerar_atividades: gerar_atividades.py
+- atribuir_notas: atribuir_notas.py
+- recriar_cursos: recriar_cursos.py
+
+Os valores aleatórios vêm de um gerador por item, com a semente da tarefa e o
+pk do item: repetir um lote na retomada gera exatamente os mesmos dados.
+"""
+
+import random
+from datetime import date, timedelta
+
+from django.db.models import Count
+from django.utils import timezone
+from rest_framework import serializers
+
+from escola.models import Aluno, AtividadeAvaliativa, Curso, Matricula
+from escola.notas import sincronizar_matriculas
+from escola.tarefas import DefinicaoTarefa, registrar
+
+
+def sortear_semente():
+    return random.randrange(2 ** 31)
+
+
+class ParametrosAleatorios(serializers.Serializer):
+    # Sem semente, sorteia uma e a guarda na tarefa para a retomada
+    semente = serializers.IntegerField(default=sortear_semente)
+
+
+def gerador(semente, pk):
+    return random.Random(f'{semente}:{pk}')
+
+
+@registrar
+class SincronizarNotas(DefinicaoTarefa):
+    tipo = 'sincronizar_notas'
+    descricao = 'Garante as provas e atividades padrão de cada matrícula e recalcula as avaliações.'
+
+    class Parametros(serializers.Serializer):
+        curso = serializers.IntegerField(required=False)
+
+    def consulta(self):
+        matriculas = Matricula.objects.all()
+        if self.parametros.get('curso') is not None:
+            matriculas = matriculas.filter(curso_id=self.parametros['curso'])
+        return matriculas
+
+    def processar(self, pks):
+        sincronizar_matriculas(pks, batch_size=self.tamanho_lote)
+
+
+TITULOS_ATIVIDADES = [
+    "Lista de Exercícios 1",
+    "Lista de Exercícios 2",
+    "Trabalho Prático",
+    "Projeto Final",
+    "Estudo de Caso"
+]
+
+TITULOS_PROVAS = [
+    "Prova 1 - Conceitos Básicos",
+    "Prova 2 - Conceitos Intermediários",
+    "Prova Final"
+]
+
+TITULOS_TRABALHOS = [
+    "Trabalho em Grupo",
+    "Pesquisa Bibliográfica",
+    "Desenvolvimento de Projeto"
+]
+
+
+@registrar
+class GerarAtividades(DefinicaoTarefa):
+    tipo = 'gerar_atividades'
+    descricao = 'Substitui as atividades de cada matrícula por atividades, provas e trabalhos aleatórios.'
+    tamanho_lote = 500
+
+    class Parametros(ParametrosAleatorios):
+        # Data de referência das entregas; fixada na tarefa para a retomada
+        data_base = serializers.DateField(default=timezone.localdate)
+
+    def consulta(self):
+        return Matricula.objects.all()
+
+    def processar(self, pks):
+        data_base = date.fromisoformat(self.parametros['data_base'])
+        AtividadeAvaliativa.objects.filter(matricula_id__in=pks).delete()
+        atividades = []
+        for matricula in Matricula.objects.filter(pk__in=pks).select_related('aluno', 'curso').order_by('pk'):
+            atividades += self.atividades(matricula, gerador(self.parametros['semente'], matricula.pk), data_base)
+        AtividadeAvaliativa.objects.bulk_create(atividades)
+
+    @staticmethod
+    def atividades(matricula, aleatorio, data_base):
+        # 2-3 atividades, 66% de chance de cada uma ter sido entregue
+        for _ in range(aleatorio.randint(2, 3)):
+            entregue = aleatorio.choice([True, True, False])
+            yield AtividadeAvaliativa(
+                matricula=matricula,
+                tipo='A',
+                titulo=aleatorio.choice(TITULOS_ATIVIDADES),
+                descricao=f"Descrição da atividade para {matricula.aluno.nome}",
+                nota=round(aleatorio.uniform(6.0, 10.0), 2) if entregue else None,
+                data_entrega=data_base - timedelta(days=aleatorio.randint(1, 30)),
+                entregue=entregue,
+            )
+        # 1-2 provas
+        for _ in range(aleatorio.randint(1, 2)):
+            yield AtividadeAvaliativa(
+                matricula=matricula,
+                tipo='P',
+                titulo=aleatorio.choice(TITULOS_PROVAS),
+                descricao=f"Prova aplicada no curso {matricula.curso.descricao}",
+                nota=round(aleatorio.uniform(5.0, 10.0), 2),
+                data_entrega=data_base - timedelta(days=aleatorio.randint(5, 40)),
+                entregue=True,
+            )
+        # 0-1 trabalho
+        if aleatorio.choice([True, False]):
+            entregue = aleatorio.choice([True, False])
+            yield AtividadeAvaliativa(
+                matricula=matricula,
+                tipo='T',
+                titulo=aleatorio.choice(TITULOS_TRABALHOS),
+                descricao=f"Trabalho para {matricula.aluno.nome}",
+                nota=round(aleatorio.uniform(7.0, 10.0), 2) if entregue else None,
+                data_entrega=data_base - timedelta(days=aleatorio.randint(10, 60)),
+                entregue=entregue,
+            )
+
+
+def limitar(n, minimo=0.0, maximo=10.0):
+    return max(min(n, maximo), minimo)
+
+
+# tipo: (média, desvio, casas decimais); trabalhos (tipo 'T') não são alterados
+NOTAS_POR_TIPO = {
+    'P': (7.0, 1.8, 1),
+    'A': (7.5, 1.5, 2),
+}
+
+
+@registrar
+class AtribuirNotas(DefinicaoTarefa):
+    tipo = 'atribuir_notas'
+    descricao = 'Atribui notas com distribuição normal a todas as provas e atividades.'
+
+    class Parametros(serializers.Serializer):
+        # Mesma semente fixa do script original
+        semente = serializers.IntegerField(default=20260110)
+
+    def consulta(self):
+        return AtividadeAvaliativa.objects.filter(tipo__in=NOTAS_POR_TIPO)
+
+    def processar(self, pks):
+        atividades = list(AtividadeAvaliativa.objects.filter(pk__in=pks).order_by('pk'))
+        for atividade in atividades:
+            media, desvio, casas = NOTAS_POR_TIPO[atividade.tipo]
+            valor = gerador(self.parametros['semente'], atividade.pk).gauss(mu=media, sigma=desvio)
+            atividade.nota = round(limitar(valor), casas)
+            atividade.entregue = True
+        AtividadeAvaliativa.objects.atualizar_linhas(atividades, ['nota', 'entregue'])
+
+
+CURSOS_BASE = [
+    {'nome': 'Python', 'codigo': 'PY'},
+    {'nome': 'JavaScript', 'codigo': 'JS'},
+    {'nome': 'Java', 'codigo': 'JV'},
+    {'nome': 'React', 'codigo': 'RC'},
+    {'nome': 'Django', 'codigo': 'DJ'},
+]
+
+NIVEIS = [
+    {'nivel': 'B', 'descricao': 'Básico'},
+    {'nivel': 'I', 'descricao': 'Intermediário'},
+    {'nivel': 'A', 'descricao': 'Avançado'},
+]
+
+PERIODOS = ['M', 'V', 'N']
+
+
+@registrar
+class RecriarCursos(DefinicaoTarefa):
+    tipo = 'recriar_cursos'
+    descricao = 'Remove cursos e matrículas, cria 15 cursos (5 áreas × 3 níveis) e rematricula todos os alunos.'
+
+    Parametros = ParametrosAleatorios
+
+    def preparar(self):
+        Matricula.objects.all().delete()
+        Curso.objects.all().delete()
+        Curso.objects.bulk_create([
+            Curso(
+                codigo_curso=f"{curso_base['codigo']}{nivel['nivel']}",
+                descricao=f"{curso_base['nome']} - {nivel['descricao']}",
+                nivel=nivel['nivel'],
+            )
+            for curso_base in CURSOS_BASE
+            for nivel in NIVEIS
+        ])
+
+    def consulta(self):
+        return Aluno.objects.all()
+
+    def processar(self, pks):
+        cursos = list(Curso.objects.order_by('pk').values_list('pk', flat=True))
+        Matricula.objects.filter(aluno_id__in=pks).delete()
+        matriculas = []
+        for aluno_id in pks:
+            aleatorio = gerador(self.parametros['semente'], aluno_id)
+            # Cada aluno recebe entre 1 e 3 matrículas, em cursos diferentes
+            for curso_id in aleatorio.sample(cursos, min(aleatorio.randint(1, 3), len(cursos))):
+                matriculas.append(Matricula(aluno_id=aluno_id, curso_id=curso_id, periodo=aleatorio.choice(PERIODOS)))
+        Matricula.objects.bulk_create(matriculas)
+
+    def resumo(self):
+        return {
+            'cursos': Curso.objects.count(),
+            'alunos': Aluno.objects.count(),
+            'matriculas': Matricula.objects.count(),
+            'matriculas_por_periodo': dict(Matricula.objects.values_list('periodo').annotate(total=Count('pk')).order_by()),
+        }
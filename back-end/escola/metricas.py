@@ -0,0 +1,304 @@
+"""
+Métricas da API no formato texto do Prometheus, em /metrics.
+
+Com METRICAS_DIRETORIO definido, MetricasMiddleware registra a cada requisição:
+- escola_requisicoes_total{rota,metodo,status}
+- escola_requisicao_duracao_segundos{rota,metodo,status}: histograma, com as
+  faixas de METRICAS_FAIXAS
+- escola_consultas_sql_total e escola_sql_duracao_segundos_total{rota,metodo}
+- escola_throttle_rejeicoes_total{rota}: requisições recusadas (429) pelo
+  throttling do DRF
+A rota é a de setup/urls.py (alunos/<pk>/, api/token/...), não o caminho,
+para que os pks não criem uma série por registro. Também são contados os
+acessos ao cache das respostas, escola_cache_acessos_total{resultado}
+(escola/cache.py), e as conexões abertas com o banco,
+escola_conexoes_banco_total{banco}: com CONN_MAX_AGE=0 é uma por requisição.
+/metrics acrescenta escola_cache_taxa_acerto, calculada dos acessos, e
+escola_metricas_processos, a quantidade de processos somados.
+
+Armazenamento entre processos: cada processo (worker do gunicorn ou do
+uvicorn) acumula os seus valores em memória e os grava, no máximo a cada
+METRICAS_INTERVALO segundos e ao terminar, em um arquivo só dele no
+diretório, substituído de uma vez (os.replace). Como nenhum arquivo é escrito
+por dois processos, não há trava entre eles; /metrics soma os arquivos de
+todos. Os arquivos de processos encerrados continuam sendo somados, para que
+os contadores não diminuam: o diretório deve ser esvaziado a cada deploy.
+"""
+
+import atexit
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from glob import glob
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_safe
+
+from escola import perfil
+
+FAIXAS_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICAS = {
+    'escola_requisicoes_total': ('counter', 'Requisições atendidas, por rota, método e status'),
+    'escola_requisicao_duracao_segundos': ('histogram', 'Duração das requisições, por rota, método e status'),
+    'escola_consultas_sql_total': ('counter', 'Consultas SQL executadas pelas requisições, por rota e método'),
+    'escola_sql_duracao_segundos_total': ('counter', 'Tempo das consultas SQL das requisições, por rota e método'),
+    'escola_throttle_rejeicoes_total': ('counter', 'Requisições recusadas pelo throttling (429), por rota'),
+    'escola_cache_acessos_total': ('counter', 'Leituras do cache de respostas, por resultado (acerto ou falha)'),
+    'escola_cache_taxa_acerto': ('gauge', 'Fração das leituras do cache de respostas que foram acertos'),
+    'escola_conexoes_banco_total': ('counter', 'Conexões abertas com o banco, por alias'),
+    'escola_metricas_processos': ('gauge', 'Processos cujas métricas foram somadas'),
+}
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def ativas():
+    return bool(getattr(settings, 'METRICAS_DIRETORIO', None))
+
+
+def faixas():
+    return tuple(getattr(settings, 'METRICAS_FAIXAS', FAIXAS_PADRAO))
+
+
+class Registro:
+    """Valores acumulados por este processo, gravados no seu arquivo."""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        # O uuid evita reaproveitar o arquivo de um processo antigo com o mesmo pid
+        self.nome = f'metricas_{self.pid}_{uuid.uuid4().hex[:8]}.json'
+        self.contadores = {}
+        self.histogramas = {}
+        self.faixas = faixas()
+        self.trava = threading.Lock()
+        self.gravando = threading.Lock()
+        self.gravado_em = 0.0
+        self.pendente = False
+        self.agendada = False
+
+    def contar(self, nome, rotulos, valor):
+        with self.trava:
+            chave = (nome, rotulos)
+            self.contadores[chave] = self.contadores.get(chave, 0) + valor
+            self.pendente = True
+        self.gravar()
+
+    def observar(self, nome, rotulos, valor):
+        with self.trava:
+            chave = (nome, rotulos)
+            if chave not in self.histogramas:
+                # Contagem de cada faixa (não acumulada), a de +Inf e a soma
+                self.histogramas[chave] = [0] * (len(self.faixas) + 1) + [0.0]
+            histograma = self.histogramas[chave]
+            indice = next((indice for indice, limite in enumerate(self.faixas) if valor <= limite), len(self.faixas))
+            histograma[indice] += 1
+            histograma[-1] += valor
+            self.pendente = True
+        self.gravar()
+
+    def gravar(self, forcar=False):
+        """Grava o arquivo deste processo se houver mudanças e já tiver passado
+        METRICAS_INTERVALO desde a última gravação (ou com `forcar`). Antes
+        disso, agenda a gravação para o fim do intervalo: um worker que não
+        recebe mais requisições não fica com valores só na memória."""
+        diretorio = getattr(settings, 'METRICAS_DIRETORIO', None)
+        if not diretorio or not self.pendente:
+            return
+        restante = getattr(settings, 'METRICAS_INTERVALO', 1) - (time.monotonic() - self.gravado_em)
+        if not forcar and restante > 0:
+            self.agendar(restante)
+            return
+        # Outra thread já está gravando; as mudanças vão na próxima gravação
+        if not self.gravando.acquire(blocking=forcar):
+            return
+        try:
+            with self.trava:
+                conteudo = {
+                    'faixas': self.faixas,
+                    'contadores': [[nome, rotulos, valor] for (nome, rotulos), valor in self.contadores.items()],
+                    'histogramas': [[nome, rotulos, valores] for (nome, rotulos), valores in self.histogramas.items()],
+                }
+                self.pendente = False
+                self.gravado_em = time.monotonic()
+            os.makedirs(diretorio, exist_ok=True)
+            caminho = os.path.join(diretorio, self.nome)
+            with open(caminho + '.tmp', 'w', encoding='utf-8') as arquivo:
+                json.dump(conteudo, arquivo, ensure_ascii=False)
+            os.replace(caminho + '.tmp', caminho)
+        finally:
+            self.gravando.release()
+
+    def agendar(self, atraso):
+        with self.trava:
+            if self.agendada:
+                return
+            self.agendada = True
+        temporizador = threading.Timer(atraso, self._gravar_agendada)
+        temporizador.daemon = True
+        temporizador.start()
+
+    def _gravar_agendada(self):
+        self.agendada = False
+        self.gravar(forcar=True)
+
+
+_registro = None
+_trava_registro = threading.Lock()
+
+
+def registro():
+    """Registro deste processo; um processo criado por fork começa do zero
+    (os valores do pai estão no arquivo do pai)."""
+    global _registro
+    if _registro is None or _registro.pid != os.getpid():
+        with _trava_registro:
+            if _registro is None or _registro.pid != os.getpid():
+                _registro = Registro()
+                atexit.register(_registro.gravar, forcar=True)
+    return _registro
+
+
+def _rotulos(rotulos):
+    return tuple(sorted((chave, str(valor)) for chave, valor in rotulos.items()))
+
+
+def contar(nome, valor=1, **rotulos):
+    if ativas():
+        registro().contar(nome, _rotulos(rotulos), valor)
+
+
+def observar(nome, valor, **rotulos):
+    if ativas():
+        registro().observar(nome, _rotulos(rotulos), valor)
+
+
+def ler():
+    """Soma os arquivos de todos os processos: (contadores, histogramas, processos).
+    Os histogramas ficam como {nome, rótulos: {limite: contagem}} mais a soma."""
+    registro().gravar(forcar=True)
+    contadores, histogramas, processos = {}, {}, 0
+    for caminho in glob(os.path.join(settings.METRICAS_DIRETORIO, 'metricas_*.json')):
+        try:
+            with open(caminho, encoding='utf-8') as arquivo:
+                conteudo = json.load(arquivo)
+        except (OSError, ValueError):
+            continue
+        processos += 1
+        for nome, rotulos, valor in conteudo['contadores']:
+            chave = (nome, tuple(map(tuple, rotulos)))
+            contadores[chave] = contadores.get(chave, 0) + valor
+        limites = [repr(float(limite)) for limite in conteudo['faixas']] + ['+Inf']
+        for nome, rotulos, valores in conteudo['histogramas']:
+            faixas_somadas, soma = histogramas.setdefault((nome, tuple(map(tuple, rotulos))), ({}, [0.0]))
+            for limite, quantidade in zip(limites, valores):
+                faixas_somadas[limite] = faixas_somadas.get(limite, 0) + quantidade
+            soma[0] += valores[-1]
+    return contadores, histogramas, processos
+
+
+def _formatar_rotulos(rotulos):
+    if not rotulos:
+        return ''
+    escapados = (
+        (chave, valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for chave, valor in rotulos
+    )
+    return '{' + ','.join(f'{chave}="{valor}"' for chave, valor in escapados) + '}'
+
+
+def exportar():
+    """Texto no formato de exposição do Prometheus (versão 0.0.4)."""
+    contadores, histogramas, processos = ler()
+    acessos = {dict(rotulos).get('resultado'): valor for (nome, rotulos), valor in contadores.items() if nome == 'escola_cache_acessos_total'}
+    total_acessos = sum(acessos.values())
+    gauges = {
+        ('escola_cache_taxa_acerto', ()): acessos.get('acerto', 0) / total_acessos if total_acessos else 0.0,
+        ('escola_metricas_processos', ()): processos,
+    }
+
+    series = {}
+    for (nome, rotulos), valor in {**contadores, **gauges}.items():
+        series.setdefault(nome, []).append(f'{nome}{_formatar_rotulos(rotulos)} {valor}')
+    for (nome, rotulos), (faixas_somadas, soma) in histogramas.items():
+        linhas = series.setdefault(nome, [])
+        acumulado = 0
+        for limite in sorted(faixas_somadas, key=lambda limite: float('inf') if limite == '+Inf' else float(limite)):
+            acumulado += faixas_somadas[limite]
+            linhas.append(f'{nome}_bucket{_formatar_rotulos(rotulos + (("le", limite),))} {acumulado}')
+        linhas.append(f'{nome}_sum{_formatar_rotulos(rotulos)} {soma[0]}')
+        linhas.append(f'{nome}_count{_formatar_rotulos(rotulos)} {acumulado}')
+
+    saida = []
+    for nome in sorted(series):
+        tipo, descricao = METRICAS.get(nome, ('untyped', nome))
+        saida += [f'# HELP {nome} {descricao}', f'# TYPE {nome} {tipo}']
+        # As linhas de um histograma ficam na ordem das faixas
+        saida += series[nome] if tipo == 'histogram' else sorted(series[nome])
+    return '\n'.join(saida) + '\n'
+
+
+@require_safe
+def exibir(request):
+    if not ativas():
+        raise Http404
+    return HttpResponse(exportar(), content_type=CONTENT_TYPE)
+
+
+def rota(request):
+    """Rota de setup/urls.py que atendeu a requisição, com os grupos da
+    expressão regular do router (?P<pk>...) escritos como <pk>."""
+    if request.resolver_match is None:
+        return 'nao_encontrada'
+    return re.sub(r'\(\?P<(\w+)>[^)]*\)', r'<\1>', request.resolver_match.route).lstrip('^').rstrip('$')
+
+
+def _contar_conexao(connection, **kwargs):
+    contar('escola_conexoes_banco_total', banco=connection.alias)
+
+
+class MetricasMiddleware:
+    """Deve estar no começo de MIDDLEWARE, para que a duração inclua os demais."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not ativas():
+            raise MiddlewareNotUsed
+        perfil.instrumentar_sql()
+        connection_created.connect(_contar_conexao, dispatch_uid='escola.metricas')
+        self.get_response = get_response
+        self.assincrono = iscoroutinefunction(get_response)
+        if self.assincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.assincrono:
+            return self.__acall__(request)
+        inicio = time.perf_counter()
+        with perfil.perfilar() as dados:
+            response = self.get_response(request)
+        self.registrar(request, response, dados, time.perf_counter() - inicio)
+        return response
+
+    async def __acall__(self, request):
+        inicio = time.perf_counter()
+        with perfil.perfilar() as dados:
+            response = await self.get_response(request)
+        self.registrar(request, response, dados, time.perf_counter() - inicio)
+        return response
+
+    def registrar(self, request, response, dados, duracao):
+        rotulos = {'rota': rota(request), 'metodo': request.method}
+        contar('escola_requisicoes_total', **rotulos, status=response.status_code)
+        observar('escola_requisicao_duracao_segundos', duracao, **rotulos, status=response.status_code)
+        contar('escola_consultas_sql_total', dados.consultas, **rotulos)
+        contar('escola_sql_duracao_segundos_total', dados.tempo_sql, **rotulos)
+        if response.status_code == 429:
+            contar('escola_throttle_rejeicoes_total', rota=rotulos['rota'])
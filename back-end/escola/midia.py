@@ -0,0 +1,78 @@
+"""
+Entrega dos arquivos de MEDIA_ROOT com cabeçalhos de cache, no
+desenvolvimento (SERVIR_MIDIA, por padrão igual a DEBUG). Em produção os
+arquivos são entregues pelo servidor web, sem passar por um worker Python, e a
+rota responde 404.
+
+Toda resposta leva um ETag forte (sha1 do conteúdo, calculado uma vez por
+arquivo enquanto tamanho e data de modificação não mudam) e Last-Modified; um
+If-None-Match ou If-Modified-Since que confere devolve 304 sem corpo.
+Miniaturas têm nome único por conteúdo e são marcadas como imutáveis por um
+ano; os demais arquivos usam MEDIA_CACHE_MAX_AGE (um dia, por padrão).
+
+Uma miniatura que ainda não foi gerada redireciona, sem cache, para a foto
+original. Ela só é gerada no upload (escola/receivers.py) e pelo comando
+gerar_miniaturas, nunca por uma requisição de leitura.
+"""
+
+import hashlib
+import os
+import posixpath
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponseRedirect
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from escola import miniaturas
+
+UM_ANO = 365 * 24 * 60 * 60
+
+
+@lru_cache(maxsize=4096)
+def _etag(caminho, tamanho, modificado):
+    sha1 = hashlib.sha1()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(64 * 1024), b''):
+            sha1.update(bloco)
+    return f'"{sha1.hexdigest()}"'
+
+
+def _redirecionar_para_original(caminho):
+    dados = miniaturas.origem(caminho)
+    if dados is None or not default_storage.exists(dados[0]):
+        raise Http404('Arquivo não encontrado.')
+    response = HttpResponseRedirect(default_storage.url(dados[0]))
+    patch_cache_control(response, no_store=True)
+    return response
+
+
+@require_safe
+def servir(request, path):
+    if not getattr(settings, 'SERVIR_MIDIA', settings.DEBUG):
+        raise Http404('Arquivo não encontrado.')
+    caminho = posixpath.normpath(path).lstrip('/')
+    try:
+        completo = safe_join(settings.MEDIA_ROOT, caminho)
+    except SuspiciousFileOperation:
+        raise Http404('Arquivo não encontrado.')
+    if not os.path.isfile(completo):
+        return _redirecionar_para_original(caminho)
+
+    estado = os.stat(completo)
+    etag = _etag(completo, estado.st_size, estado.st_mtime_ns)
+    response = get_conditional_response(request, etag=etag, last_modified=int(estado.st_mtime))
+    if response is None:
+        response = FileResponse(open(completo, 'rb'))
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(estado.st_mtime)
+    if miniaturas.origem(caminho) is not None:
+        patch_cache_control(response, public=True, max_age=UM_ANO, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=getattr(settings, 'MEDIA_CACHE_MAX_AGE', 24 * 60 * 60))
+    return response
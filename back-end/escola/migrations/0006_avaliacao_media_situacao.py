@@ -0,0 +1,51 @@
+# Generated by Django 4.2.8 on 2026-10-18 11:04
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def preencher_media_situacao(apps, schema_editor):
+    # Mesma regra de Avaliacao.calcular_media/calcular_situacao no momento desta migração
+    Avaliacao = apps.get_model('escola', 'Avaliacao')
+    ultimo_id = 0
+    while True:
+        lote = list(Avaliacao.objects.filter(pk__gt=ultimo_id).order_by('pk')[:2000])
+        if not lote:
+            break
+        for avaliacao in lote:
+            media = round((float(avaliacao.nota1) * 4 + float(avaliacao.nota2) * 4 + float(avaliacao.nota3) * 2) / 10, 2)
+            avaliacao.media = Decimal(str(media))
+            if media >= 7:
+                avaliacao.situacao = 'Aprovado'
+            elif media > 4:
+                avaliacao.situacao = 'Prova Final'
+            else:
+                avaliacao.situacao = 'Reprovado'
+        Avaliacao.objects.bulk_update(lote, ['media', 'situacao'])
+        ultimo_id = lote[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('escola', '0005_atividadeavaliativa'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='avaliacao',
+            name='media',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=4),
+        ),
+        migrations.AddField(
+            model_name='avaliacao',
+            name='situacao',
+            field=models.CharField(choices=[('Aprovado', 'Aprovado'), ('Prova Final', 'Prova Final'), ('Reprovado', 'Reprovado')], default='Reprovado', editable=False, max_length=11),
+        ),
+        migrations.RunPython(preencher_media_situacao, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='avaliacao',
+            index=models.Index(fields=['situacao', 'media'], name='avaliacao_situacao_media_idx'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.8 on 2026-10-18 11:18
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def atividades_repetidas(linhas):
+    """pks das cópias entre as linhas (pk, tipo, titulo, nota, entregue) de uma
+    matrícula: de cada atividade (tipo e título) fica a que tem nota, depois a
+    entregue e, entre elas, a de menor id."""
+    vistas = set()
+    repetidas = []
+    for pk, tipo, titulo, nota, entregue in sorted(linhas, key=lambda linha: (linha[3] is None, not linha[4], linha[0])):
+        if (tipo, titulo) in vistas:
+            repetidas.append(pk)
+        else:
+            vistas.add((tipo, titulo))
+    return repetidas
+
+
+def remover_duplicadas(apps, schema_editor):
+    # Matrículas repetidas (mesmo aluno e curso) são fundidas na de menor id:
+    # atividades e avaliações passam para ela antes de as demais serem apagadas,
+    # e das atividades que ficaram repetidas ("Prova 1" de cada matrícula) fica
+    # uma só, senão o cálculo das notas escolheria uma delas ao acaso. Depois
+    # fica uma avaliação por matrícula, também a de menor id, que é a que o
+    # recálculo de notas já atualizava. Rode sync_grades após migrar.
+    Matricula = apps.get_model('escola', 'Matricula')
+    Avaliacao = apps.get_model('escola', 'Avaliacao')
+    AtividadeAvaliativa = apps.get_model('escola', 'AtividadeAvaliativa')
+
+    grupos = list(
+        Matricula.objects.values('aluno_id', 'curso_id')
+        .annotate(manter=Min('pk'), total=Count('pk'))
+        .filter(total__gt=1)
+    )
+    for grupo in grupos:
+        sobras = list(
+            Matricula.objects.filter(aluno_id=grupo['aluno_id'], curso_id=grupo['curso_id'])
+            .exclude(pk=grupo['manter']).values_list('pk', flat=True)
+        )
+        AtividadeAvaliativa.objects.filter(matricula_id__in=sobras).update(matricula_id=grupo['manter'])
+        linhas = AtividadeAvaliativa.objects.filter(matricula_id=grupo['manter']).values_list('pk', 'tipo', 'titulo', 'nota', 'entregue')
+        AtividadeAvaliativa.objects.filter(pk__in=atividades_repetidas(linhas)).delete()
+        Avaliacao.objects.filter(matricula_id__in=sobras).update(matricula_id=grupo['manter'])
+        Matricula.objects.filter(pk__in=sobras).delete()
+
+    grupos = list(
+        Avaliacao.objects.values('matricula_id')
+        .annotate(manter=Min('pk'), total=Count('pk'))
+        .filter(total__gt=1)
+    )
+    for grupo in grupos:
+        Avaliacao.objects.filter(matricula_id=grupo['matricula_id']).exclude(pk=grupo['manter']).delete()
+
+
+class Migration(migrations.Migration):
+    # Separada de 0008_indices_e_restricoes, em outra transação: no PostgreSQL
+    # as chaves estrangeiras são verificadas no commit, e os ALTER TABLE na
+    # mesma transação destas alterações falhariam ("pending trigger events")
+
+    dependencies = [
+        ('escola', '0006_avaliacao_media_situacao'),
+    ]
+
+    operations = [
+        migrations.RunPython(remover_duplicadas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.8 on 2026-10-18 11:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('escola', '0007_remover_duplicadas'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aluno',
+            index=models.Index(fields=['cpf'], name='aluno_cpf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='atividadeavaliativa',
+            index=models.Index(fields=['matricula', 'tipo', 'titulo'], name='atividade_mat_tipo_titulo_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='avaliacao',
+            constraint=models.UniqueConstraint(fields=('matricula',), name='avaliacao_matricula_unica'),
+        ),
+        migrations.AddConstraint(
+            model_name='matricula',
+            constraint=models.UniqueConstraint(fields=('aluno', 'curso'), name='matricula_aluno_curso_unica'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.8 on 2026-10-18 12:02
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def preencher_contadores(apps, schema_editor):
+    # Mesmos critérios de escola.painel.CONTADORES no momento desta migração
+    totais = {
+        'alunos': apps.get_model('escola', 'Aluno').objects.count(),
+        'cursos': apps.get_model('escola', 'Curso').objects.count(),
+        'matriculas': apps.get_model('escola', 'Matricula').objects.count(),
+        'atividades_pendentes': apps.get_model('escola', 'AtividadeAvaliativa').objects.filter(entregue=False).count(),
+        'matriculas_em_risco': apps.get_model('escola', 'Avaliacao').objects.filter(~Q(situacao='Aprovado')).count(),
+    }
+    ContadorPainel = apps.get_model('escola', 'ContadorPainel')
+    ContadorPainel.objects.bulk_create([ContadorPainel(chave=chave, valor=valor) for chave, valor in totais.items()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('escola', '0008_indices_e_restricoes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorPainel',
+            fields=[
+                ('chave', models.CharField(max_length=30, primary_key=True, serialize=False)),
+                ('valor', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(preencher_contadores, migrations.RunPython.noop),
+    ]
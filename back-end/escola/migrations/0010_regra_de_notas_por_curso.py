@@ -0,0 +1,39 @@
+# Generated by Django 4.2.8 on 2026-10-18 12:40
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('escola', '0009_contadorpainel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='curso',
+            name='nota_aprovacao',
+            field=models.DecimalField(decimal_places=1, default=Decimal('7.0'), max_digits=3),
+        ),
+        migrations.AddField(
+            model_name='curso',
+            name='nota_prova_final',
+            field=models.DecimalField(decimal_places=1, default=Decimal('4.0'), max_digits=3),
+        ),
+        migrations.AddField(
+            model_name='curso',
+            name='peso_nota1',
+            field=models.PositiveSmallIntegerField(default=4),
+        ),
+        migrations.AddField(
+            model_name='curso',
+            name='peso_nota2',
+            field=models.PositiveSmallIntegerField(default=4),
+        ),
+        migrations.AddField(
+            model_name='curso',
+            name='peso_nota3',
+            field=models.PositiveSmallIntegerField(default=2),
+        ),
+    ]
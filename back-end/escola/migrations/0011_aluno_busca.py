@@ -0,0 +1,44 @@
+# Generated by Django 4.2.8 on 2026-10-18 13:10
+
+import re
+
+from django.db import migrations
+from text_unidecode import unidecode
+
+# Índice de busca de alunos (ver escola/busca.py); só existe no SQLite
+CRIAR = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS escola_aluno_busca "
+    "USING fts5(nome, cpf, celular, prefix='2 3')"
+)
+
+
+def criar_indice(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CRIAR)
+    Aluno = apps.get_model('escola', 'Aluno')
+    alunos = Aluno.objects.values_list('pk', 'nome', 'cpf', 'celular').iterator(chunk_size=5000)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO escola_aluno_busca (rowid, nome, cpf, celular) VALUES (%s, %s, %s, %s)',
+            (
+                (pk, unidecode(nome or '').lower(), re.sub(r'\D', '', cpf or ''), re.sub(r'\D', '', celular or ''))
+                for pk, nome, cpf, celular in alunos
+            ),
+        )
+
+
+def remover_indice(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS escola_aluno_busca')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('escola', '0010_regra_de_notas_por_curso'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice, remover_indice),
+    ]
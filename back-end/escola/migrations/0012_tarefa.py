@@ -0,0 +1,36 @@
+# Generated by Django 4.2.8 on 2026-10-18 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('escola', '0011_aluno_busca'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tarefa',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=50)),
+                ('parametros', models.JSONField(blank=True, default=dict)),
+                ('situacao', models.CharField(choices=[('pendente', 'Pendente'), ('executando', 'Em execução'), ('concluida', 'Concluída'), ('falhou', 'Falhou'), ('cancelada', 'Cancelada')], default='pendente', max_length=10)),
+                ('total', models.PositiveIntegerField(blank=True, null=True)),
+                ('processados', models.PositiveIntegerField(default=0)),
+                ('posicao', models.BigIntegerField(blank=True, null=True)),
+                ('duracao', models.FloatField(default=0)),
+                ('resultado', models.JSONField(blank=True, null=True)),
+                ('erro', models.TextField(blank=True)),
+                ('trabalhador', models.CharField(blank=True, max_length=100)),
+                ('criada_em', models.DateTimeField(auto_now_add=True)),
+                ('iniciada_em', models.DateTimeField(blank=True, null=True)),
+                ('atualizada_em', models.DateTimeField(auto_now=True)),
+                ('concluida_em', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['situacao', 'criada_em'], name='tarefa_situacao_criada_idx')],
+            },
+        ),
+    ]
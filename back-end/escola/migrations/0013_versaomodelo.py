@@ -0,0 +1,20 @@
+# Generated by Django 4.2.8 on 2026-10-18 13:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('escola', '0012_tarefa'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersaoModelo',
+            fields=[
+                ('modelo', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('versao', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
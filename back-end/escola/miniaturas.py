@@ -0,0 +1,118 @@
+"""
+Miniaturas das fotos dos alunos.
+
+Cada foto enviada gera versões de tamanho fixo (VARIANTES), em WebP e JPEG,
+gravadas no mesmo storage como miniaturas/<nome da foto>.<variante>.<formato>.
+A geração é agendada com transaction.on_commit e roda em uma thread de fundo
+(MINIATURAS_EM_SEGUNDO_PLANO = False executa no próprio processo, como nos
+testes), fora do ciclo da requisição que fez o upload.
+
+O nome da foto muda a cada upload (o storage não sobrescreve arquivos), então o
+nome de uma miniatura identifica o seu conteúdo e ela pode ser guardada em
+cache indefinidamente (ver escola/midia.py).
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+PASTA = 'miniaturas'
+# nome: (largura, altura)
+VARIANTES = {
+    'pequena': (64, 64),
+    'media': (256, 256),
+}
+# formato: (extensão, opções do Image.save)
+FORMATOS = {
+    'webp': ('webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('jpg', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+_executor = None
+
+
+def caminho(nome_foto, variante, formato):
+    return f'{PASTA}/{nome_foto}.{variante}.{FORMATOS[formato][0]}'
+
+
+def origem(caminho_miniatura):
+    """Retorna (nome da foto, variante, formato) de um caminho gerado por
+    `caminho`, ou None se ele não for de uma miniatura."""
+    pasta, _, nome = caminho_miniatura.partition('/')
+    partes = nome.rsplit('.', 2)
+    if pasta != PASTA or len(partes) != 3 or partes[1] not in VARIANTES:
+        return None
+    formatos = {extensao: formato for formato, (extensao, _) in FORMATOS.items()}
+    if partes[2] not in formatos:
+        return None
+    return partes[0], partes[1], formatos[partes[2]]
+
+
+def urls(foto, request=None):
+    """{variante: {formato: url}} das miniaturas de uma foto (None sem foto)."""
+    if not foto:
+        return None
+    resultado = {}
+    for variante in VARIANTES:
+        resultado[variante] = {}
+        for formato in FORMATOS:
+            url = foto.storage.url(caminho(foto.name, variante, formato))
+            resultado[variante][formato] = request.build_absolute_uri(url) if request is not None else url
+    return resultado
+
+
+def gerar(nome_foto, storage=default_storage, substituir=False):
+    """Gera as variantes de uma foto que ainda não existem (todas, com
+    `substituir`). Retorna os caminhos gravados."""
+    with storage.open(nome_foto, 'rb') as arquivo:
+        imagem = Image.open(arquivo)
+        imagem = ImageOps.exif_transpose(imagem).convert('RGB')
+
+    gravados = []
+    for variante, tamanho in VARIANTES.items():
+        reduzida = ImageOps.fit(imagem, tamanho, Image.Resampling.LANCZOS)
+        for formato, (_, opcoes) in FORMATOS.items():
+            destino = caminho(nome_foto, variante, formato)
+            if storage.exists(destino):
+                # Miniaturas são servidas como imutáveis: só o comando as substitui
+                if not substituir:
+                    continue
+                storage.delete(destino)
+            conteudo = BytesIO()
+            reduzida.save(conteudo, format=formato.upper(), **opcoes)
+            gravados.append(storage.save(destino, ContentFile(conteudo.getvalue())))
+    return gravados
+
+
+def _gerar_registrando(nome_foto, storage):
+    try:
+        return gerar(nome_foto, storage)
+    except Exception:
+        logger.exception('Falha ao gerar as miniaturas de %s', nome_foto)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'MINIATURAS_THREADS', 2), thread_name_prefix='miniaturas',
+        )
+    return _executor
+
+
+def agendar(nome_foto, storage=default_storage, using=None):
+    """Gera as miniaturas depois do commit da transação atual."""
+    def executar():
+        if getattr(settings, 'MINIATURAS_EM_SEGUNDO_PLANO', True):
+            _get_executor().submit(_gerar_registrando, nome_foto, storage)
+        else:
+            _gerar_registrando(nome_foto, storage)
+    transaction.on_commit(executar, using=using)
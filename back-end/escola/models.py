@@ -1,6 +1,150 @@
-from django.db import models
+import threading
+from decimal import Decimal
 
-class Aluno(models.Model):
+from django.db import connections, models, router, transaction
+
+from escola import motor_notas
+from escola.motor_notas import REGRA_PADRAO, Regra
+from escola.signals import lote_gravado
+
+# bulk_update grava através de QuerySet.update; durante ele o sinal sai só uma vez
+_bulk_update = threading.local()
+
+class EscolaQuerySet(models.QuerySet):
+    """Notifica as gravações em lote através do sinal lote_gravado, dentro da
+    mesma transação da gravação"""
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic(using=self.db, savepoint=False):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            lote_gravado.send(sender=self.model, objs=objs, pks={obj.pk for obj in objs}, campos=None, using=self.db)
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            _bulk_update.ativo = True
+            try:
+                linhas = super().bulk_update(objs, fields, *args, **kwargs)
+            finally:
+                _bulk_update.ativo = False
+            lote_gravado.send(sender=self.model, objs=objs, pks={obj.pk for obj in objs}, campos=list(fields), using=self.db)
+        return linhas
+
+    def atualizar_linhas(self, objs, fields):
+        """Como bulk_update, mas com um único UPDATE preparado executado para
+        todas as linhas (executemany). O bulk_update monta um CASE WHEN por
+        linha e campo, o que domina o tempo quando os valores são quase todos
+        distintos, como as médias recalculadas."""
+        objs = list(objs)
+        if not objs:
+            return 0
+        conexao = connections[self.db]
+        campos = [self.model._meta.get_field(nome) for nome in fields]
+        pk = self.model._meta.pk
+        sql = 'UPDATE {} SET {} WHERE {} = %s'.format(
+            conexao.ops.quote_name(self.model._meta.db_table),
+            ', '.join(f'{conexao.ops.quote_name(campo.column)} = %s' for campo in campos),
+            conexao.ops.quote_name(pk.column),
+        )
+        parametros = [
+            [campo.get_db_prep_save(getattr(obj, campo.attname), conexao) for campo in campos]
+            + [pk.get_db_prep_value(obj.pk, conexao)]
+            for obj in objs
+        ]
+        with transaction.atomic(using=self.db, savepoint=False):
+            with conexao.cursor() as cursor:
+                cursor.executemany(sql, parametros)
+            lote_gravado.send(sender=self.model, objs=objs, pks={obj.pk for obj in objs}, campos=list(fields), using=self.db)
+        return len(objs)
+
+    def inserir_linhas(self, objs):
+        """Como bulk_create, mas com um único INSERT preparado executado para
+        todas as linhas (executemany) e sem obter os pks criados. O bulk_create
+        compila um INSERT com um VALUES por linha e campo, o que domina o tempo
+        nas cargas de centenas de milhares de linhas."""
+        objs = list(objs)
+        if not objs:
+            return objs
+        conexao = connections[self.db]
+        campos = [campo for campo in self.model._meta.concrete_fields if not campo.primary_key]
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            conexao.ops.quote_name(self.model._meta.db_table),
+            ', '.join(conexao.ops.quote_name(campo.column) for campo in campos),
+            ', '.join(['%s'] * len(campos)),
+        )
+        # Valores repetidos (títulos, datas, notas, chaves estrangeiras) são
+        # preparados para o banco uma única vez
+        preparados = [{} for _ in campos]
+
+        def preparar(campo, valor, cache):
+            try:
+                chave = (type(valor), valor)
+                return cache[chave]
+            except KeyError:
+                cache[chave] = campo.get_db_prep_save(valor, conexao)
+                return cache[chave]
+            except TypeError:
+                return campo.get_db_prep_save(valor, conexao)
+
+        # auto_now/auto_now_add: um mesmo instante para todas as linhas do INSERT
+        instantes = {
+            campo.attname: campo.pre_save(objs[0], True) for campo in campos
+            if getattr(campo, 'auto_now', False) or getattr(campo, 'auto_now_add', False)
+        }
+
+        parametros = []
+        for obj in objs:
+            obj._prepare_related_fields_for_save(operation_name='inserir_linhas')
+            obj.__dict__.update(instantes)
+            linha = []
+            for campo, cache in zip(campos, preparados):
+                valor = instantes[campo.attname] if campo.attname in instantes else campo.pre_save(obj, True)
+                linha.append(preparar(campo, valor, cache))
+            parametros.append(linha)
+            obj._state.adding = False
+            obj._state.db = self.db
+        with transaction.atomic(using=self.db, savepoint=False):
+            with conexao.cursor() as cursor:
+                cursor.executemany(sql, parametros)
+            lote_gravado.send(sender=self.model, objs=objs, pks=set(), campos=None, using=self.db)
+        return objs
+
+    def update(self, **kwargs):
+        if getattr(_bulk_update, 'ativo', False) or not lote_gravado.has_listeners(self.model):
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            pks = set(self.values_list('pk', flat=True))
+            linhas = super().update(**kwargs)
+            lote_gravado.send(sender=self.model, objs=None, pks=pks, campos=list(kwargs), using=self.db)
+        return linhas
+
+class EscolaModel(models.Model):
+    """Executa o save e o post_save na mesma transação, para que o que os
+    receptores gravam (como os contadores do painel) seja confirmado junto"""
+    # Campos cujo valor lido do banco fica em _valores_do_banco, para que os
+    # receptores conheçam o valor anterior a uma alteração
+    campos_rastreados = ()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        if cls.campos_rastreados:
+            lidos = dict(zip(field_names, values))
+            instancia._valores_do_banco = {
+                campo: lidos[campo] for campo in cls.campos_rastreados
+                if campo in lidos and lidos[campo] is not models.DEFERRED
+            }
+        return instancia
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
+class Aluno(EscolaModel):
     nome = models.CharField(max_length=30)
     rg = models.CharField(max_length=9)
     cpf = models.CharField(max_length=11)
@@ -8,10 +152,18 @@ class Aluno(models.Model):
     celular = models.CharField(max_length=11, default="")
     foto = models.ImageField(blank=True)
 
+    campos_rastreados = ('foto',)
+    objects = EscolaQuerySet.as_manager()
+
     def __str__(self):
         return self.nome
 
-class Curso(models.Model):
+    class Meta:
+        indexes = [
+            models.Index(fields=['cpf'], name='aluno_cpf_idx'),
+        ]
+
+class Curso(EscolaModel):
     NIVEL = (
         ('B', 'Básico'),
         ('I', 'Intermediário'),
@@ -20,11 +172,42 @@ class Curso(models.Model):
     codigo_curso = models.CharField(max_length=10)
     descricao = models.CharField(max_length=100)
     nivel = models.CharField(max_length=1, choices=NIVEL, blank=False, null=False,default='B')
+    # Regra de média e situação das avaliações do curso (ver escola/motor_notas.py)
+    peso_nota1 = models.PositiveSmallIntegerField(default=REGRA_PADRAO.pesos[0])
+    peso_nota2 = models.PositiveSmallIntegerField(default=REGRA_PADRAO.pesos[1])
+    peso_nota3 = models.PositiveSmallIntegerField(default=REGRA_PADRAO.pesos[2])
+    nota_aprovacao = models.DecimalField(max_digits=3, decimal_places=1, default=Decimal(str(REGRA_PADRAO.aprovacao)))
+    nota_prova_final = models.DecimalField(max_digits=3, decimal_places=1, default=Decimal(str(REGRA_PADRAO.final)))
+
+    CAMPOS_REGRA = ('peso_nota1', 'peso_nota2', 'peso_nota3', 'nota_aprovacao', 'nota_prova_final')
+
+    objects = EscolaQuerySet.as_manager()
+    campos_rastreados = CAMPOS_REGRA
 
     def __str__(self):
         return self.descricao
 
-class Matricula(models.Model):
+    @staticmethod
+    def montar_regra(peso_nota1, peso_nota2, peso_nota3, nota_aprovacao, nota_prova_final):
+        return Regra((peso_nota1, peso_nota2, peso_nota3), float(nota_aprovacao), float(nota_prova_final))
+
+    @property
+    def regra(self):
+        return self.montar_regra(*(getattr(self, campo) for campo in self.CAMPOS_REGRA))
+
+    @classmethod
+    def regras_por_id(cls, curso_ids, using=None):
+        linhas = cls.objects.db_manager(using).filter(pk__in=curso_ids).values_list('pk', *cls.CAMPOS_REGRA)
+        return {linha[0]: cls.montar_regra(*linha[1:]) for linha in linhas}
+
+    @classmethod
+    def regras_por_matricula(cls, matricula_ids, using=None):
+        """Regra do curso de cada matrícula (uma consulta para as matrículas e uma para os cursos)."""
+        cursos = dict(Matricula.objects.db_manager(using).filter(pk__in=matricula_ids).values_list('pk', 'curso_id'))
+        regras = cls.regras_por_id(set(cursos.values()), using=using)
+        return {matricula_id: regras[curso_id] for matricula_id, curso_id in cursos.items()}
+
+class Matricula(EscolaModel):
     PERIODO = (
         ('M', 'Matutino'),
         ('V', 'Vespertino'),
@@ -34,35 +217,100 @@ class Matricula(models.Model):
     curso = models.ForeignKey(Curso, on_delete=models.CASCADE)
     periodo = models.CharField(max_length=1, choices=PERIODO, blank=False, null=False,default='M')
 
-class Avaliacao(models.Model):
+    objects = EscolaQuerySet.as_manager()
+    # Trocar o curso troca a regra de cálculo da avaliação
+    campos_rastreados = ('curso_id',)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['aluno', 'curso'], name='matricula_aluno_curso_unica'),
+        ]
+
+class AvaliacaoQuerySet(EscolaQuerySet):
+    """Mantém media e situacao atualizadas também nas operações em lote"""
+    def atualizar_resultados(self, objs, regras=None):
+        """Calcula media e situacao de todas as avaliações de uma vez, com a
+        regra do curso de cada uma (`regras`, por matrícula, se já conhecidas)."""
+        if regras is None:
+            regras = Curso.regras_por_matricula({obj.matricula_id for obj in objs}, using=self.db)
+        medias, situacoes = motor_notas.calcular_regras(
+            [(obj.nota1, obj.nota2, obj.nota3) for obj in objs],
+            [regras.get(obj.matricula_id, REGRA_PADRAO) for obj in objs],
+        )
+        for obj, media, situacao in zip(objs, medias, situacoes):
+            obj.media = motor_notas.como_decimal(media)
+            obj.situacao = motor_notas.SITUACOES[situacao]
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        self.atualizar_resultados(objs)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def inserir_linhas(self, objs):
+        objs = list(objs)
+        self.atualizar_resultados(objs)
+        return super().inserir_linhas(objs)
+
+    def _com_resultados(self, objs, fields):
+        fields = list(fields)
+        if set(fields) & {'nota1', 'nota2', 'nota3'}:
+            self.atualizar_resultados(objs)
+            fields += [campo for campo in ('media', 'situacao') if campo not in fields]
+        return fields
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        return super().bulk_update(objs, self._com_resultados(objs, fields), *args, **kwargs)
+
+    def atualizar_linhas(self, objs, fields):
+        objs = list(objs)
+        return super().atualizar_linhas(objs, self._com_resultados(objs, fields))
+
+class Avaliacao(EscolaModel):
+    SITUACAO = (
+        ('Aprovado', 'Aprovado'),
+        ('Prova Final', 'Prova Final'),
+        ('Reprovado', 'Reprovado')
+    )
+
     matricula = models.ForeignKey(Matricula, on_delete=models.CASCADE)
     nota1 = models.DecimalField(max_digits=3, decimal_places=1, default=0)
     nota2 = models.DecimalField(max_digits=3, decimal_places=1, default=0)
     nota3 = models.DecimalField(max_digits=3, decimal_places=1, default=0)
+    media = models.DecimalField(max_digits=4, decimal_places=2, default=0, editable=False)
+    situacao = models.CharField(max_length=11, choices=SITUACAO, default='Reprovado', editable=False)
     data_criacao = models.DateTimeField(auto_now_add=True)
 
+    objects = AvaliacaoQuerySet.as_manager()
+    campos_rastreados = ('situacao',)
+
     def __str__(self):
         return f"Avaliação de {self.matricula.aluno.nome} - {self.matricula.curso.descricao}"
 
-    @property
-    def media(self):
-        # Média ponderada: provas (nota1 e nota2) peso 4 cada, atividades (nota3) peso 2
-        pesos = {'nota1': 4, 'nota2': 4, 'nota3': 2}
-        soma_pesos = sum(pesos.values())
-        total = float(self.nota1) * pesos['nota1'] + float(self.nota2) * pesos['nota2'] + float(self.nota3) * pesos['nota3']
-        return round(total / soma_pesos, 2)
+    class Meta:
+        indexes = [
+            models.Index(fields=['situacao', 'media'], name='avaliacao_situacao_media_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['matricula'], name='avaliacao_matricula_unica'),
+        ]
 
-    @property
-    def situacao(self):
-        media = self.media
-        if media >= 7:
-            return 'Aprovado'
-        elif media > 4:
-            return 'Prova Final'
-        else:
-            return 'Reprovado'
-
-class AtividadeAvaliativa(models.Model):
+    def atualizar_resultado(self):
+        # Com a matrícula já carregada, a regra vem do seu curso (sem consulta, se
+        # ele também estiver carregado)
+        regras = None
+        if Avaliacao.matricula.is_cached(self):
+            regras = {self.matricula_id: self.matricula.curso.regra}
+        Avaliacao.objects.db_manager(self._state.db).atualizar_resultados([self], regras=regras)
+
+    def save(self, *args, **kwargs):
+        self.atualizar_resultado()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & {'nota1', 'nota2', 'nota3'}:
+            kwargs['update_fields'] = set(update_fields) | {'media', 'situacao'}
+        super().save(*args, **kwargs)
+
+class AtividadeAvaliativa(EscolaModel):
     TIPO_CHOICES = (
         ('A', 'Atividade'),
         ('P', 'Prova'),
@@ -78,9 +326,89 @@ class AtividadeAvaliativa(models.Model):
     entregue = models.BooleanField(default=False)
     data_criacao = models.DateTimeField(auto_now_add=True)
 
+    objects = EscolaQuerySet.as_manager()
+    campos_rastreados = ('entregue',)
+
     def __str__(self):
         return f"{self.get_tipo_display()} - {self.titulo} ({self.matricula.aluno.nome})"
 
     class Meta:
         ordering = ['-data_criacao']
+        indexes = [
+            models.Index(fields=['matricula', 'tipo', 'titulo'], name='atividade_mat_tipo_titulo_idx'),
+        ]
+
+
+class ContadorPainel(models.Model):
+    """Totais exibidos no painel, mantidos a cada gravação (ver escola/painel.py)"""
+    chave = models.CharField(max_length=30, primary_key=True)
+    valor = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.chave}: {self.valor}"
+
 
+class VersaoModelo(models.Model):
+    """Versão dos dados de cada modelo, incrementada a cada gravação; sem cache
+    compartilhado, é ela que invalida as respostas e forma o ETag (ver escola/cache.py)"""
+    modelo = models.CharField(max_length=100, primary_key=True)
+    versao = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.modelo}: {self.versao}"
+
+
+class Tarefa(models.Model):
+    """Tarefa de manutenção executada em lotes pelos trabalhadores (ver escola/tarefas.py)"""
+    SITUACAO = (
+        ('pendente', 'Pendente'),
+        ('executando', 'Em execução'),
+        ('concluida', 'Concluída'),
+        ('falhou', 'Falhou'),
+        ('cancelada', 'Cancelada'),
+    )
+    FINALIZADAS = ('concluida', 'falhou', 'cancelada')
+
+    tipo = models.CharField(max_length=50)
+    parametros = models.JSONField(default=dict, blank=True)
+    situacao = models.CharField(max_length=10, choices=SITUACAO, default='pendente')
+    total = models.PositiveIntegerField(null=True, blank=True)
+    processados = models.PositiveIntegerField(default=0)
+    # pk do último item processado (ponto de retomada); None antes da preparação
+    posicao = models.BigIntegerField(null=True, blank=True)
+    # Segundos gastos nos lotes, somados entre as retomadas
+    duracao = models.FloatField(default=0)
+    resultado = models.JSONField(null=True, blank=True)
+    erro = models.TextField(blank=True)
+    trabalhador = models.CharField(max_length=100, blank=True)
+    criada_em = models.DateTimeField(auto_now_add=True)
+    iniciada_em = models.DateTimeField(null=True, blank=True)
+    atualizada_em = models.DateTimeField(auto_now=True)
+    concluida_em = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.tipo} #{self.pk} ({self.get_situacao_display()})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['situacao', 'criada_em'], name='tarefa_situacao_criada_idx'),
+        ]
+
+    @property
+    def percentual(self):
+        if self.situacao == 'concluida':
+            return 100.0
+        if not self.total:
+            return 0.0
+        return round(min(self.processados / self.total, 1) * 100, 2)
+
+    @property
+    def itens_por_segundo(self):
+        return round(self.processados / self.duracao, 1) if self.duracao > 0 else None
+
+    @property
+    def segundos_restantes(self):
+        taxa = self.itens_por_segundo
+        if self.situacao in self.FINALIZADAS or not taxa or self.total is None:
+            return None
+        return round(max(self.total - self.processados, 0) / taxa, 1)
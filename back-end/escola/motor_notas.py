@@ -0,0 +1,56 @@
+"""
+Cálculo vetorizado de média e situação com NumPy.
+
+As notas de todas as avaliações entram como uma matriz (n, 3) e os pesos como
+um vetor (3,), quando a regra é a mesma para todas, ou uma matriz (n, 3) com a
+regra do curso de cada linha. Média e situação saem de uma única passada,
+sem laço em Python por avaliação. Este módulo não acessa o banco: quem chama
+carrega as notas e as regras (ver Curso.regras_por_matricula).
+"""
+
+from collections import namedtuple
+from decimal import Decimal
+
+import numpy as np
+
+SITUACOES = ('Aprovado', 'Prova Final', 'Reprovado')
+
+# pesos: (nota1, nota2, nota3); média >= aprovacao: Aprovado; média > final: Prova Final
+Regra = namedtuple('Regra', ['pesos', 'aprovacao', 'final'])
+REGRA_PADRAO = Regra(pesos=(4, 4, 2), aprovacao=7.0, final=4.0)
+
+
+def calcular(notas, pesos, aprovacao, final):
+    """Retorna (médias arredondadas em 2 casas, índice em SITUACOES) de cada linha.
+
+    `aprovacao` e `final` podem ser escalares ou vetores (n,)."""
+    notas = np.asarray(notas, dtype=np.float64).reshape(-1, 3)
+    pesos = np.asarray(pesos, dtype=np.float64)
+    medias = np.round((notas * pesos).sum(axis=-1) / pesos.sum(axis=-1), 2)
+    situacoes = np.where(medias >= aprovacao, 0, np.where(medias > final, 1, 2))
+    return medias, situacoes
+
+
+def calcular_regras(notas, regras):
+    """Como calcular, com uma Regra por linha de `notas`.
+
+    As regras distintas (uma por curso, em geral) viram uma tabela pequena que
+    é expandida para as linhas por indexação."""
+    if not len(regras):
+        return np.empty(0), np.empty(0, dtype=np.int64)
+    tabela = {}
+    indices = np.fromiter((tabela.setdefault(regra, len(tabela)) for regra in regras), dtype=np.int64, count=len(regras))
+    pesos = np.array([regra.pesos for regra in tabela], dtype=np.float64)[indices]
+    aprovacao = np.array([regra.aprovacao for regra in tabela], dtype=np.float64)[indices]
+    final = np.array([regra.final for regra in tabela], dtype=np.float64)[indices]
+    return calcular(notas, pesos, aprovacao, final)
+
+
+def contar_situacoes(situacoes):
+    """Quantidade de linhas em cada situação."""
+    totais = np.bincount(np.asarray(situacoes, dtype=np.int64), minlength=len(SITUACOES))
+    return {situacao: int(total) for situacao, total in zip(SITUACOES, totais)}
+
+
+def como_decimal(media):
+    return Decimal(f'{media:.2f}')
@@ -0,0 +1,242 @@
+"""
+Cálculo de notas em lote:
+- Cada matrícula possui duas provas ('Prova 1' -> nota1, 'Prova 2' -> nota2)
+  e um conjunto padrão de atividades (Atividade 1..5) cuja média é a nota3.
+- As funções trabalham sobre conjuntos de matrículas, com um número constante
+  de consultas por lote, independente da quantidade de matrículas.
+- Alterações em AtividadeAvaliativa marcam a matrícula para recálculo; as
+  matrículas marcadas em uma transação são recalculadas juntas após o commit.
+- Média e situação seguem a regra do curso (escola/motor_notas.py); quando a
+  regra muda, recalcular_resultados atualiza as avaliações afetadas.
+"""
+
+import threading
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Exists, FloatField, OuterRef, Q
+from django.db.models.functions import Cast
+
+import numpy as np
+
+from escola import motor_notas
+from escola.models import AtividadeAvaliativa, Avaliacao, Curso, Matricula
+
+PROVAS = [
+    ('Prova 1', 'Primeira prova do curso'),
+    ('Prova 2', 'Segunda prova do curso'),
+]
+
+DEFAULT_ATIVIDADES = [
+    ('Atividade 1', 'Atividade padronizada do curso'),
+    ('Atividade 2', 'Atividade padronizada do curso'),
+    ('Atividade 3', 'Atividade padronizada do curso'),
+    ('Atividade 4', 'Atividade padronizada do curso'),
+    ('Atividade 5', 'Atividade padronizada do curso'),
+]
+
+# (tipo, titulo, descricao) na mesma ordem em que o script de sincronização os criava
+ATIVIDADES_PADRAO = [('P', titulo, descricao) for titulo, descricao in PROVAS] + \
+    [('A', titulo, descricao) for titulo, descricao in DEFAULT_ATIVIDADES]
+
+
+def atividades_faltantes(matricula_ids):
+    """Retorna, em uma única consulta (anti-join), as atividades padrão ausentes
+    de cada matrícula como uma lista de (matricula_id, tipo, titulo, descricao)."""
+    anotacoes = {
+        f'tem_{indice}': Exists(AtividadeAvaliativa.objects.filter(
+            matricula=OuterRef('pk'), tipo=tipo, titulo=titulo,
+        ))
+        for indice, (tipo, titulo, _) in enumerate(ATIVIDADES_PADRAO)
+    }
+    linhas = Matricula.objects.filter(pk__in=matricula_ids).annotate(**anotacoes) \
+        .values_list('pk', *anotacoes.keys())
+    existentes = {linha[0]: linha[1:] for linha in linhas}
+
+    faltantes = []
+    for matricula_id in matricula_ids:
+        if matricula_id not in existentes:
+            continue
+        for (tipo, titulo, descricao), existe in zip(ATIVIDADES_PADRAO, existentes[matricula_id]):
+            if not existe:
+                faltantes.append((matricula_id, tipo, titulo, descricao))
+    return faltantes
+
+
+def criar_atividades_faltantes(faltantes, batch_size=None):
+    AtividadeAvaliativa.objects.bulk_create([
+        AtividadeAvaliativa(
+            matricula_id=matricula_id,
+            tipo=tipo,
+            titulo=titulo,
+            descricao=descricao,
+            data_entrega=None,
+            entregue=False,
+        )
+        for matricula_id, tipo, titulo, descricao in faltantes
+    ], batch_size=batch_size)
+
+
+def calcular_notas(matricula_ids, using=DEFAULT_DB_ALIAS):
+    """Calcula (nota1, nota2, nota3) de cada matrícula com um número constante de consultas.
+
+    As notas são somadas em Python, na ordenação padrão do modelo, para que o
+    resultado seja idêntico ao do cálculo feito matrícula a matrícula (a soma
+    em ponto flutuante depende da ordem das parcelas)."""
+    linhas = AtividadeAvaliativa.objects.using(using).filter(
+        Q(tipo='P', titulo__in=['Prova 1', 'Prova 2']) | Q(tipo='A', nota__isnull=False),
+        matricula_id__in=matricula_ids,
+    ).values_list('matricula_id', 'tipo', 'titulo', 'nota')
+
+    provas, atividades = {}, {}
+    for matricula_id, tipo, titulo, nota in linhas:
+        if tipo == 'P':
+            # A prova mais recente prevalece, como no .first() do script original
+            provas.setdefault((matricula_id, titulo), nota)
+        else:
+            atividades.setdefault(matricula_id, []).append(float(nota))
+
+    notas = {}
+    for matricula_id in Matricula.objects.using(using).filter(pk__in=matricula_ids).values_list('pk', flat=True):
+        prova1 = provas.get((matricula_id, 'Prova 1'))
+        prova2 = provas.get((matricula_id, 'Prova 2'))
+        nota1 = float(prova1) if prova1 is not None else 0.0
+        nota2 = float(prova2) if prova2 is not None else 0.0
+        if matricula_id in atividades:
+            nota3 = round(sum(atividades[matricula_id]) / len(atividades[matricula_id]), 2)
+        else:
+            nota3 = 0.0
+        notas[matricula_id] = (nota1, nota2, nota3)
+    return notas
+
+
+def gravar_avaliacoes(notas, batch_size=None, using=DEFAULT_DB_ALIAS):
+    """Atualiza ou cria a Avaliacao de cada matrícula em `notas` usando
+    bulk_update/bulk_create. Retorna as avaliações indexadas por matrícula."""
+    avaliacoes = {}
+    for avaliacao in Avaliacao.objects.using(using).filter(matricula_id__in=notas.keys()):
+        avaliacoes[avaliacao.matricula_id] = avaliacao
+
+    novas, existentes = [], []
+    for matricula_id, (nota1, nota2, nota3) in notas.items():
+        avaliacao = avaliacoes.get(matricula_id)
+        if avaliacao is None:
+            avaliacao = Avaliacao(matricula_id=matricula_id)
+            avaliacoes[matricula_id] = avaliacao
+            novas.append(avaliacao)
+        else:
+            existentes.append(avaliacao)
+        avaliacao.nota1, avaliacao.nota2, avaliacao.nota3 = nota1, nota2, nota3
+
+    with transaction.atomic(using=using):
+        Avaliacao.objects.using(using).bulk_update(existentes, ['nota1', 'nota2', 'nota3'], batch_size=batch_size)
+        Avaliacao.objects.using(using).bulk_create(novas, batch_size=batch_size)
+    return avaliacoes
+
+
+def sincronizar_matriculas(matricula_ids, batch_size=None, dry_run=False):
+    """Cria as atividades padrão ausentes das matrículas e recalcula as suas
+    avaliações, em uma transação. Retorna (faltantes, notas); com dry_run
+    apenas calcula, sem gravar."""
+    # O lote já recalcula todas as suas avaliações; as marcações feitas pelo
+    # bulk_create das atividades seriam redundantes
+    with suspender_recalculo(), transaction.atomic():
+        faltantes = atividades_faltantes(matricula_ids)
+        if not dry_run:
+            criar_atividades_faltantes(faltantes, batch_size=batch_size)
+
+        # Atividades recém-criadas não têm nota, então não alteram o cálculo
+        notas = calcular_notas(matricula_ids)
+        if not dry_run:
+            gravar_avaliacoes(notas, batch_size=batch_size)
+    return faltantes, notas
+
+
+def recalcular_resultados(filtro, using=DEFAULT_DB_ALIAS):
+    """Recalcula media e situacao das avaliações que atendem a `filtro` com a
+    regra atual do curso de cada uma, em uma passada vetorizada, e grava apenas
+    as que mudaram. Retorna a quantidade de avaliações alteradas."""
+    numeros = {campo: Cast(campo, FloatField()) for campo in ('nota1', 'nota2', 'nota3', 'media')}
+    linhas = list(
+        Avaliacao.objects.using(using).filter(filtro).order_by('pk')
+        .annotate(**{f'{campo}_numero': expressao for campo, expressao in numeros.items()})
+        .values_list('pk', 'nota1_numero', 'nota2_numero', 'nota3_numero', 'media_numero', 'situacao', 'matricula__curso_id')
+    )
+    if not linhas:
+        return 0
+    regras = Curso.regras_por_id({linha[6] for linha in linhas}, using=using)
+    medias, situacoes = motor_notas.calcular_regras(
+        [linha[1:4] for linha in linhas], [regras[linha[6]] for linha in linhas],
+    )
+    medias_atuais = np.array([linha[4] for linha in linhas], dtype=np.float64)
+    situacoes_atuais = np.array([motor_notas.SITUACOES.index(linha[5]) for linha in linhas])
+    alteradas = []
+    for indice in np.flatnonzero((medias != medias_atuais) | (situacoes != situacoes_atuais)):
+        avaliacao = Avaliacao(
+            pk=linhas[indice][0],
+            media=motor_notas.como_decimal(medias[indice]),
+            situacao=motor_notas.SITUACOES[situacoes[indice]],
+        )
+        # Situação anterior conhecida: o painel aplica a diferença sem recontar
+        avaliacao._valores_do_banco = {'situacao': linhas[indice][5]}
+        alteradas.append(avaliacao)
+    Avaliacao.objects.using(using).atualizar_linhas(alteradas, ['media', 'situacao'])
+    return len(alteradas)
+
+
+def recalcular_avaliacoes(matricula_ids, batch_size=None, using=DEFAULT_DB_ALIAS):
+    """Recalcula apenas as avaliações das matrículas informadas."""
+    return gravar_avaliacoes(calcular_notas(list(matricula_ids), using=using), batch_size=batch_size, using=using)
+
+
+_estado = threading.local()
+
+
+@contextmanager
+def suspender_recalculo():
+    """Ignora as marcações feitas dentro do bloco (para rotinas que já recalculam tudo)."""
+    anterior = getattr(_estado, 'suspenso', False)
+    _estado.suspenso = True
+    try:
+        yield
+    finally:
+        _estado.suspenso = anterior
+
+
+def marcar_para_recalculo(matricula_ids, using=DEFAULT_DB_ALIAS, batch_size=1000):
+    """Marca matrículas cujas avaliações precisam ser recalculadas.
+
+    Todas as marcações de uma mesma transação são acumuladas e recalculadas em
+    uma única passada, via transaction.on_commit. Fora de um bloco atômico o
+    recálculo acontece imediatamente."""
+    if getattr(_estado, 'suspenso', False):
+        return
+    matricula_ids = {pk for pk in matricula_ids if pk is not None}
+    if not matricula_ids:
+        return
+
+    pendentes = getattr(_estado, 'pendentes', None)
+    if pendentes is None:
+        pendentes = _estado.pendentes = {}
+    conexao = transaction.get_connection(using)
+    recalcular = pendentes.get(using)
+    # Se a transação foi desfeita, o Django já descartou o callback agendado
+    agendado = recalcular is not None and any(func is recalcular for _, func, _ in conexao.run_on_commit)
+    if not agendado:
+        recalcular = _novo_recalculo(pendentes, using, batch_size)
+        pendentes[using] = recalcular
+    recalcular.matricula_ids.update(matricula_ids)
+    if not agendado:
+        transaction.on_commit(recalcular, using=using)
+
+
+def _novo_recalculo(pendentes, using, batch_size):
+    def recalcular():
+        if pendentes.get(using) is recalcular:
+            del pendentes[using]
+        ids = sorted(recalcular.matricula_ids)
+        for inicio in range(0, len(ids), batch_size):
+            recalcular_avaliacoes(ids[inicio:inicio + batch_size], batch_size=batch_size, using=using)
+
+    recalcular.matricula_ids = set()
+    return recalcular
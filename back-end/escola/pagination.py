@@ -0,0 +1,111 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class PaginacaoCursor(CursorPagination):
+    """Paginação por cursor (keyset) sobre uma chave indexada.
+
+    Cada página é buscada com WHERE chave > posição, então páginas profundas custam
+    o mesmo que a primeira. A chave é o atributo `ordering` da view ('id' por padrão)
+    ou, com OrderingFilter, a ordenação pedida em ?ordering=, sempre com o id como
+    desempate. ?paginacao=false devolve a lista completa, sem paginação.
+    """
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    desativar_query_param = 'paginacao'
+
+    @property
+    def max_page_size(self):
+        return getattr(settings, 'PAGINACAO_MAX_PAGE_SIZE', 1000)
+
+    def desativada(self, request):
+        return request.query_params.get(self.desativar_query_param, '').lower() in ('false', '0', 'nao', 'não')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        consulta = None if self.desativada(request) else self.consulta_da_pagina(queryset, request, view)
+        return None if consulta is None else self.montar_pagina(list(consulta))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Como paginate_queryset, com a página lida pelo ORM assíncrono."""
+        consulta = None if self.desativada(request) else self.consulta_da_pagina(queryset, request, view)
+        return None if consulta is None else self.montar_pagina([obj async for obj in consulta])
+
+    # paginate_queryset do CursorPagination dividido em duas partes, antes e
+    # depois da consulta, para que ela possa ser feita de forma síncrona ou não
+
+    def consulta_da_pagina(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            order = self.ordering[0]
+            is_reversed = order.startswith('-')
+            order_attr = order.lstrip('-')
+
+            if self.cursor.reverse != is_reversed:
+                kwargs = {order_attr + '__lt': current_position}
+            else:
+                kwargs = {order_attr + '__gt': current_position}
+
+            queryset = queryset.filter(**kwargs)
+
+        self._posicao = (offset, reverse, current_position)
+        # Um item a mais indica se existe uma próxima página
+        return queryset[offset:offset + self.page_size + 1]
+
+    def montar_pagina(self, results):
+        (offset, reverse, current_position) = self._posicao
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        if view is not None and getattr(view, 'ordering', None):
+            self.ordering = view.ordering
+        ordering = super().get_ordering(request, queryset, view)
+        ordering = (ordering,) if isinstance(ordering, str) else tuple(ordering)
+        if not {'id', '-id', 'pk', '-pk'} & set(ordering):
+            # Desempate estável para chaves que se repetem (ex.: media)
+            ordering += ('-id',) if ordering[0].startswith('-') else ('id',)
+        return ordering
@@ -0,0 +1,142 @@
+"""
+Contadores do painel mantidos incrementalmente.
+
+Cada contador é a soma de um valor (0 ou 1) por linha de um modelo. Toda
+gravação aplica a diferença entre o valor novo e o anterior de cada linha com
+um UPDATE ... SET valor = valor + n na mesma transação, de modo que o painel
+lê os totais sem contar as tabelas. O valor anterior vem dos campos_rastreados
+que EscolaModel guarda ao carregar a instância do banco; quando ele não é
+conhecido (QuerySet.update, instância não carregada do banco) o contador é
+recontado. O comando reconciliar_painel recalcula tudo do zero.
+"""
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F, Q
+
+from escola.models import Aluno, Curso, Matricula, Avaliacao, AtividadeAvaliativa, ContadorPainel
+
+DESCONHECIDO = object()
+
+
+class Contador:
+    """Conta as linhas de `modelo`; com `campo`, apenas aquelas em que
+    `contar(valor do campo)` é verdadeiro (o mesmo critério de `filtro`)."""
+
+    def __init__(self, modelo, campo=None, contar=None, filtro=None):
+        self.modelo = modelo
+        self.campo = campo
+        self.contar = contar
+        self.filtro = filtro or Q()
+
+    def valor(self, valores):
+        if self.campo is None:
+            return 1
+        valor = valores.get(self.campo, DESCONHECIDO)
+        return DESCONHECIDO if valor is DESCONHECIDO else int(self.contar(valor))
+
+    def recontar(self, using):
+        return self.modelo.objects.using(using).filter(self.filtro).count()
+
+
+CONTADORES = {
+    'alunos': Contador(Aluno),
+    'cursos': Contador(Curso),
+    'matriculas': Contador(Matricula),
+    'atividades_pendentes': Contador(
+        AtividadeAvaliativa, campo='entregue', contar=lambda entregue: not entregue, filtro=Q(entregue=False),
+    ),
+    # Avaliacao é única por matrícula: é o número de matrículas em Prova Final ou Reprovado
+    'matriculas_em_risco': Contador(
+        Avaliacao, campo='situacao', contar=lambda situacao: situacao != 'Aprovado', filtro=~Q(situacao='Aprovado'),
+    ),
+}
+
+
+def contadores_do_modelo(modelo):
+    return {chave: contador for chave, contador in CONTADORES.items() if contador.modelo is modelo}
+
+
+def valores_atuais(instancia):
+    # Campos adiados (.only/.defer) ficam de fora em vez de gerar uma consulta
+    return {campo: instancia.__dict__[campo] for campo in instancia.campos_rastreados if campo in instancia.__dict__}
+
+
+def reconciliar(chaves=None, using=DEFAULT_DB_ALIAS):
+    """Reconta os contadores informados (todos, por padrão) e retorna os valores."""
+    valores = {}
+    with transaction.atomic(using=using):
+        for chave in chaves or CONTADORES:
+            valores[chave] = CONTADORES[chave].recontar(using)
+            ContadorPainel.objects.using(using).update_or_create(chave=chave, defaults={'valor': valores[chave]})
+    return valores
+
+
+def somar(chave, delta, using=DEFAULT_DB_ALIAS):
+    if delta is DESCONHECIDO:
+        reconciliar([chave], using=using)
+    elif delta:
+        alterados = ContadorPainel.objects.using(using).filter(chave=chave).update(valor=F('valor') + delta)
+        if not alterados:
+            reconciliar([chave], using=using)
+
+
+def _diferenca(contador, novos, antigos):
+    """Soma de valor(novo) - valor(antigo); None em `antigos` é uma linha que não existia."""
+    total = 0
+    for valores_novos, valores_antigos in zip(novos, antigos):
+        novo = contador.valor(valores_novos) if valores_novos is not None else 0
+        antigo = contador.valor(valores_antigos) if valores_antigos is not None else 0
+        if novo is DESCONHECIDO or antigo is DESCONHECIDO:
+            return DESCONHECIDO
+        total += novo - antigo
+    return total
+
+
+def registrar_gravacao(instancia, criado, using):
+    novos = valores_atuais(instancia)
+    antigos = None if criado else getattr(instancia, '_valores_do_banco', None)
+    for chave, contador in contadores_do_modelo(type(instancia)).items():
+        if not criado and antigos is None:
+            delta = 0 if contador.campo is None else DESCONHECIDO
+        else:
+            delta = _diferenca(contador, [novos], [antigos])
+        somar(chave, delta, using=using)
+    instancia._valores_do_banco = novos
+
+
+def registrar_exclusao(instancia, using):
+    antigos = getattr(instancia, '_valores_do_banco', None)
+    if antigos is None:
+        antigos = valores_atuais(instancia)
+    for chave, contador in contadores_do_modelo(type(instancia)).items():
+        somar(chave, _diferenca(contador, [None], [antigos]), using=using)
+
+
+def registrar_lote(modelo, objs, campos, using):
+    """Aplica uma gravação em lote (ver o sinal lote_gravado)."""
+    for chave, contador in contadores_do_modelo(modelo).items():
+        if campos is None:
+            novos = [valores_atuais(obj) for obj in objs]
+            delta = _diferenca(contador, novos, [None] * len(objs))
+        elif contador.campo is None or contador.campo not in campos:
+            continue
+        elif objs is None:
+            delta = DESCONHECIDO
+        else:
+            novos = [valores_atuais(obj) for obj in objs]
+            antigos = [getattr(obj, '_valores_do_banco', None) or {} for obj in objs]
+            delta = _diferenca(contador, novos, antigos)
+        somar(chave, delta, using=using)
+    if objs is not None:
+        for obj in objs:
+            obj._valores_do_banco = valores_atuais(obj)
+
+
+def valores(using=None):
+    """Lê os contadores do painel (sem `using`, do banco escolhido pelo
+    roteador, que pode ser uma réplica); os ausentes são reconstruídos no principal."""
+    atuais = dict(ContadorPainel.objects.using(using).values_list('chave', 'valor'))
+    faltantes = [chave for chave in CONTADORES if chave not in atuais]
+    if faltantes:
+        atuais.update(reconciliar(faltantes, using=using or DEFAULT_DB_ALIAS))
+    return {chave: atuais[chave] for chave in CONTADORES}
@@ -0,0 +1,198 @@
+"""
+Perfil de cada requisição, para saber para onde foi o tempo de uma requisição
+lenta: banco, autenticação, serializers ou renderização.
+
+Com PERFIL_REQUISICOES ativo, PerfilMiddleware mede por requisição:
+- sql: quantidade e tempo das consultas, em todas as conexões
+- auth: autenticação do DRF (perform_authentication, onde o JWT é validado)
+- serializer: validação (is_valid) e serialização (.data) dos serializers
+- render: renderização da resposta (rendered_content)
+- total: a requisição inteira, a partir deste middleware
+e os devolve no cabeçalho Server-Timing, exibido pelo DevTools do navegador.
+As etapas se sobrepõem: uma consulta feita durante a serialização conta em sql
+e em serializer. O corpo das respostas em streaming (exportações) é gerado
+depois do middleware e não entra nos tempos.
+
+Requisições que levam PERFIL_LIMITE_LENTA_MS ou mais geram um registro JSON
+no logger escola.perfil, com as PERFIL_TOP_SQL consultas que mais tomaram tempo.
+
+Desativado (o padrão), o middleware se retira da cadeia ao ser carregado
+(MiddlewareNotUsed) e nada é instrumentado.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.response import SimpleTemplateResponse
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer, ListSerializer, Serializer
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+ETAPAS = ('auth', 'serializer', 'render')
+
+# Perfil da requisição em andamento; também visível nas threads do sync_to_async
+_perfil_atual = contextvars.ContextVar('perfil_atual', default=None)
+_instrumentado = False
+_sql_instrumentado = False
+
+
+class Perfil:
+    def __init__(self):
+        self.consultas = 0
+        self.tempo_sql = 0.0
+        self.por_sql = {}
+        self.tempos = dict.fromkeys(ETAPAS, 0.0)
+        # Etapas em andamento: um serializer aninhado não é contado de novo
+        self.ativas = set()
+
+    def registrar_sql(self, sql, duracao):
+        self.consultas += 1
+        self.tempo_sql += duracao
+        vezes, tempo = self.por_sql.get(sql, (0, 0.0))
+        self.por_sql[sql] = (vezes + 1, tempo + duracao)
+
+    def top_sql(self, quantidade):
+        """As `quantidade` consultas (pelo texto, sem os parâmetros) que somaram mais tempo."""
+        maiores = sorted(self.por_sql.items(), key=lambda item: item[1][1], reverse=True)[:quantidade]
+        return [{'sql': sql, 'vezes': vezes, 'tempo_ms': round(tempo * 1000, 2)} for sql, (vezes, tempo) in maiores]
+
+
+def _executar(execute, sql, params, many, context):
+    perfil = _perfil_atual.get()
+    if perfil is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        perfil.registrar_sql(sql, time.perf_counter() - inicio)
+
+
+def _instalar_na_conexao(connection, **kwargs):
+    if _executar not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_executar)
+
+
+def _cronometrar(etapa, funcao):
+    @functools.wraps(funcao)
+    def cronometrada(*args, **kwargs):
+        perfil = _perfil_atual.get()
+        if perfil is None or etapa in perfil.ativas:
+            return funcao(*args, **kwargs)
+        perfil.ativas.add(etapa)
+        inicio = time.perf_counter()
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            perfil.tempos[etapa] += time.perf_counter() - inicio
+            perfil.ativas.discard(etapa)
+    return cronometrada
+
+
+def instrumentar_sql():
+    """Instala, uma única vez, a medição das consultas em todas as conexões."""
+    global _sql_instrumentado
+    if _sql_instrumentado:
+        return
+    _sql_instrumentado = True
+    connection_created.connect(_instalar_na_conexao, dispatch_uid='escola.perfil')
+    for connection in connections.all(initialized_only=True):
+        _instalar_na_conexao(connection)
+
+
+def instrumentar():
+    """Instala, uma única vez, a medição das consultas e das etapas do DRF.
+    Fora de uma requisição perfilada, cada ponto instrumentado só consulta o
+    ContextVar e segue."""
+    global _instrumentado
+    instrumentar_sql()
+    if _instrumentado:
+        return
+    _instrumentado = True
+
+    APIView.perform_authentication = _cronometrar('auth', APIView.perform_authentication)
+    for classe in (BaseSerializer, Serializer, ListSerializer):
+        if 'is_valid' in vars(classe):
+            classe.is_valid = _cronometrar('serializer', classe.is_valid)
+        if 'data' in vars(classe):
+            classe.data = property(_cronometrar('serializer', vars(classe)['data'].fget))
+    for classe in (SimpleTemplateResponse, Response):
+        classe.rendered_content = property(_cronometrar('render', vars(classe)['rendered_content'].fget))
+
+
+@contextmanager
+def perfilar():
+    """Perfil da requisição em andamento: um novo ou, se um middleware anterior
+    já abriu um (o de escola/metricas.py), o mesmo."""
+    perfil = _perfil_atual.get()
+    if perfil is not None:
+        yield perfil
+        return
+    perfil = Perfil()
+    token = _perfil_atual.set(perfil)
+    try:
+        yield perfil
+    finally:
+        _perfil_atual.reset(token)
+
+
+class PerfilMiddleware:
+    """Deve estar no começo de MIDDLEWARE, para que total inclua os demais."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERFIL_REQUISICOES', False):
+            raise MiddlewareNotUsed
+        instrumentar()
+        self.get_response = get_response
+        self.assincrono = iscoroutinefunction(get_response)
+        if self.assincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.assincrono:
+            return self.__acall__(request)
+        inicio = time.perf_counter()
+        with perfilar() as perfil:
+            response = self.get_response(request)
+        return self.concluir(request, response, perfil, time.perf_counter() - inicio)
+
+    async def __acall__(self, request):
+        inicio = time.perf_counter()
+        with perfilar() as perfil:
+            response = await self.get_response(request)
+        return self.concluir(request, response, perfil, time.perf_counter() - inicio)
+
+    def concluir(self, request, response, perfil, total):
+        metricas = [f'sql;dur={perfil.tempo_sql * 1000:.2f};desc="{perfil.consultas} consultas"']
+        metricas += [f'{etapa};dur={perfil.tempos[etapa] * 1000:.2f}' for etapa in ETAPAS]
+        metricas.append(f'total;dur={total * 1000:.2f}')
+        if response.has_header('Server-Timing'):
+            metricas.insert(0, response['Server-Timing'])
+        response['Server-Timing'] = ', '.join(metricas)
+
+        if total * 1000 >= getattr(settings, 'PERFIL_LIMITE_LENTA_MS', 500):
+            logger.warning(json.dumps({
+                'evento': 'requisicao_lenta',
+                'metodo': request.method,
+                'caminho': request.path,
+                'rota': request.resolver_match.route if request.resolver_match else None,
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 2),
+                'sql': {'consultas': perfil.consultas, 'tempo_ms': round(perfil.tempo_sql * 1000, 2)},
+                **{f'{etapa}_ms': round(perfil.tempos[etapa] * 1000, 2) for etapa in ETAPAS},
+                'top_sql': perfil.top_sql(getattr(settings, 'PERFIL_TOP_SQL', 5)),
+            }, ensure_ascii=False))
+        return response
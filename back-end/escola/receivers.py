@@ -0,0 +1,119 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from escola import busca, cache, miniaturas, painel
+from escola.models import Aluno, Curso, Matricula, Avaliacao, AtividadeAvaliativa
+from escola.notas import marcar_para_recalculo, recalcular_resultados
+from escola.signals import lote_gravado
+
+
+@receiver(post_save, sender=AtividadeAvaliativa)
+@receiver(post_delete, sender=AtividadeAvaliativa)
+def atividade_alterada(sender, instance, using, **kwargs):
+    marcar_para_recalculo([instance.matricula_id], using=using)
+
+
+@receiver(lote_gravado, sender=AtividadeAvaliativa)
+def atividades_alteradas_em_lote(sender, objs, pks, using=DEFAULT_DB_ALIAS, **kwargs):
+    if objs is not None:
+        matricula_ids = {obj.matricula_id for obj in objs}
+    else:
+        matricula_ids = set(sender.objects.using(using).filter(pk__in=pks).values_list('matricula_id', flat=True))
+    marcar_para_recalculo(matricula_ids, using=using)
+
+
+# Campos que, alterados, mudam a regra de cálculo das avaliações e o filtro
+# das avaliações afetadas
+REGRA_AVALIACOES = {
+    Curso: (set(Curso.CAMPOS_REGRA), lambda pks: Q(matricula__curso_id__in=pks)),
+    Matricula: ({'curso', 'curso_id'}, lambda pks: Q(matricula_id__in=pks)),
+}
+
+
+@receiver(pre_save, sender=Curso)
+@receiver(pre_save, sender=Matricula)
+def verificar_regra(sender, instance, **kwargs):
+    if instance._state.adding:
+        instance._regra_alterada = False
+        return
+    originais = getattr(instance, '_valores_do_banco', None)
+    instance._regra_alterada = originais is None or any(
+        originais.get(campo) != instance.__dict__.get(campo) for campo in sender.campos_rastreados
+    )
+
+
+@receiver(post_save, sender=Curso)
+@receiver(post_save, sender=Matricula)
+def regra_alterada(sender, instance, using, **kwargs):
+    if getattr(instance, '_regra_alterada', False):
+        recalcular_resultados(REGRA_AVALIACOES[sender][1]([instance.pk]), using=using)
+
+
+@receiver(lote_gravado, sender=Curso)
+@receiver(lote_gravado, sender=Matricula)
+def regras_alteradas_em_lote(sender, pks, campos, using=DEFAULT_DB_ALIAS, **kwargs):
+    campos_regra, filtro = REGRA_AVALIACOES[sender]
+    if campos is not None and campos_regra & set(campos):
+        recalcular_resultados(filtro(pks), using=using)
+
+
+def modelo_alterado(sender, using=None, **kwargs):
+    cache.invalidar(sender, using=using or DEFAULT_DB_ALIAS)
+
+
+for modelo in (Aluno, Curso, Matricula, Avaliacao, AtividadeAvaliativa):
+    post_save.connect(modelo_alterado, sender=modelo, dispatch_uid=f'cache_{modelo.__name__}_post_save')
+    post_delete.connect(modelo_alterado, sender=modelo, dispatch_uid=f'cache_{modelo.__name__}_post_delete')
+    lote_gravado.connect(modelo_alterado, sender=modelo, dispatch_uid=f'cache_{modelo.__name__}_lote')
+
+
+def contar_gravacao(sender, instance, created, using, **kwargs):
+    painel.registrar_gravacao(instance, created, using)
+
+
+def contar_exclusao(sender, instance, using, **kwargs):
+    painel.registrar_exclusao(instance, using)
+
+
+def contar_lote(sender, objs, campos, using=DEFAULT_DB_ALIAS, **kwargs):
+    painel.registrar_lote(sender, objs, campos, using)
+
+
+for modelo in {contador.modelo for contador in painel.CONTADORES.values()}:
+    post_save.connect(contar_gravacao, sender=modelo, dispatch_uid=f'painel_{modelo.__name__}_post_save')
+    post_delete.connect(contar_exclusao, sender=modelo, dispatch_uid=f'painel_{modelo.__name__}_post_delete')
+    lote_gravado.connect(contar_lote, sender=modelo, dispatch_uid=f'painel_{modelo.__name__}_lote')
+
+
+@receiver(post_save, sender=Aluno)
+def indexar_aluno(sender, instance, using, update_fields=None, **kwargs):
+    if update_fields is None or set(update_fields) & set(busca.CAMPOS):
+        busca.indexar([instance], using=using)
+
+
+@receiver(post_delete, sender=Aluno)
+def remover_aluno_da_busca(sender, instance, using, **kwargs):
+    busca.remover([instance.pk], using=using)
+
+
+@receiver(lote_gravado, sender=Aluno)
+def indexar_alunos_em_lote(sender, objs, pks, campos, using=DEFAULT_DB_ALIAS, **kwargs):
+    if campos is None:
+        busca.indexar(objs, using=using)
+    elif set(campos) & set(busca.CAMPOS):
+        # bulk_update pode receber instâncias parciais: o índice relê as linhas
+        busca.reindexar(pks, using=using)
+
+
+@receiver(pre_save, sender=Aluno)
+def verificar_foto(sender, instance, **kwargs):
+    anterior = (getattr(instance, '_valores_do_banco', None) or {}).get('foto')
+    instance._foto_alterada = bool(instance.foto) and instance.foto.name != getattr(anterior, 'name', anterior)
+
+
+@receiver(post_save, sender=Aluno)
+def gerar_miniaturas(sender, instance, using, **kwargs):
+    if getattr(instance, '_foto_alterada', False):
+        miniaturas.agendar(instance.foto.name, storage=instance.foto.storage, using=using)
@@ -0,0 +1,73 @@
+"""
+Relatório estatístico por curso calculado inteiramente no banco.
+
+Uma única consulta agrupada por curso (curso -> matrícula -> avaliação, que é
+no máximo uma por matrícula) devolve as contagens por período, as médias das
+notas, a quantidade por situação e o histograma das médias através de
+agregações condicionais. Em Python só é montado o dicionário de cada curso.
+"""
+
+from django.db.models import Avg, Count, FloatField, Q
+
+from escola.models import Curso, Matricula, Avaliacao
+
+# Faixas do histograma das médias: [0, 1), [1, 2), ..., [9, 10]
+FAIXAS_HISTOGRAMA = [(inicio, inicio + 1) for inicio in range(10)]
+
+
+def _faixa(inicio, fim):
+    filtro = Q(matricula__avaliacao__media__gte=inicio)
+    if fim < 10:
+        filtro &= Q(matricula__avaliacao__media__lt=fim)
+    return Count('matricula__avaliacao', filter=filtro)
+
+
+def _agregacoes():
+    agregacoes = {
+        'total_matriculas': Count('matricula'),
+        'total_avaliacoes': Count('matricula__avaliacao'),
+    }
+    for periodo, _ in Matricula.PERIODO:
+        agregacoes[f'periodo_{periodo}'] = Count('matricula', filter=Q(matricula__periodo=periodo))
+    for campo in ('nota1', 'nota2', 'nota3', 'media'):
+        agregacoes[f'media_{campo}'] = Avg(f'matricula__avaliacao__{campo}', output_field=FloatField())
+    for indice, (situacao, _) in enumerate(Avaliacao.SITUACAO):
+        agregacoes[f'situacao_{indice}'] = Count('matricula__avaliacao', filter=Q(matricula__avaliacao__situacao=situacao))
+    for indice, (inicio, fim) in enumerate(FAIXAS_HISTOGRAMA):
+        agregacoes[f'faixa_{indice}'] = _faixa(inicio, fim)
+    return agregacoes
+
+
+def _arredondar(valor):
+    return None if valor is None else round(valor, 2)
+
+
+def _montar(linha):
+    return {
+        'curso': {
+            'id': linha['pk'],
+            'codigo_curso': linha['codigo_curso'],
+            'descricao': linha['descricao'],
+            'nivel': linha['nivel'],
+        },
+        'matriculas': {
+            'total': linha['total_matriculas'],
+            'por_periodo': {periodo: linha[f'periodo_{periodo}'] for periodo, _ in Matricula.PERIODO},
+        },
+        'avaliacoes': linha['total_avaliacoes'],
+        'medias': {campo: _arredondar(linha[f'media_{campo}']) for campo in ('nota1', 'nota2', 'nota3', 'media')},
+        'situacoes': {situacao: linha[f'situacao_{indice}'] for indice, (situacao, _) in enumerate(Avaliacao.SITUACAO)},
+        'histograma': [
+            {'inicio': inicio, 'fim': fim, 'total': linha[f'faixa_{indice}']}
+            for indice, (inicio, fim) in enumerate(FAIXAS_HISTOGRAMA)
+        ],
+    }
+
+
+def relatorio_cursos(curso_id=None):
+    """Retorna o relatório de todos os cursos, ou apenas do curso informado."""
+    queryset = Curso.objects.order_by('pk')
+    if curso_id is not None:
+        queryset = queryset.filter(pk=curso_id)
+    linhas = queryset.values('pk', 'codigo_curso', 'descricao', 'nivel').annotate(**_agregacoes())
+    return [_montar(linha) for linha in linhas]
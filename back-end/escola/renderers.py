@@ -0,0 +1,79 @@
+"""
+Renderers da API mais rápidos que o JSONRenderer do DRF.
+
+- JSONRapidoRenderer codifica com orjson e produz os mesmos bytes que o
+  JSONRenderer: UTF-8 sem escapes, separadores compactos e \\u2028/\\u2029
+  escapados. Tudo o que o orjson não codifica nativamente passa pelo
+  JSONEncoder do DRF: Decimal vira float, e datas e horas usam o mesmo
+  isoformat. A exceção são floats em notação científica, escritos como 1e16
+  em vez de 1e+16 (o mesmo valor). Saída indentada (Accept: application/json;
+  indent=4 e a API navegável), valores fora do alcance do orjson, como
+  inteiros com mais de 64 bits, e NaN ou infinito (que o orjson escreveria
+  como null e o JSONRenderer recusa) usam o JSONRenderer.
+- MessagePackRenderer responde a Accept: application/msgpack (ver
+  REST_FRAMEWORK em setup/settings.py). Os valores são os mesmos da resposta
+  em JSON.
+"""
+
+import math
+from decimal import Decimal
+
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+OPCOES_ORJSON = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+_codificador = JSONEncoder()
+
+
+def converter(obj):
+    """Converte o que não é nativo do orjson/msgpack como o JSONEncoder do DRF."""
+    return _codificador.default(obj)
+
+
+def tem_float_nao_finito(data):
+    pilha = [data]
+    while pilha:
+        valor = pilha.pop()
+        if isinstance(valor, dict):
+            pilha.extend(valor.values())
+        elif isinstance(valor, (list, tuple)):
+            pilha.extend(valor)
+        elif isinstance(valor, float) and not math.isfinite(valor):
+            return True
+        elif isinstance(valor, Decimal) and not valor.is_finite():
+            return True
+    return False
+
+
+class JSONRapidoRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=converter, option=OPCOES_ORJSON)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # O orjson escreve NaN e infinito como null; só então vale percorrer os dados
+        if b'null' in ret and tem_float_nao_finito(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=converter, use_bin_type=True, datetime=False)
@@ -0,0 +1,177 @@
+"""
+Leituras da API nas réplicas do banco.
+
+Com réplicas configuradas (REPLICAS, a partir de ESCOLA_REPLICAS em
+setup/settings.py), ReplicasMiddleware marca as requisições GET, HEAD e
+OPTIONS para lerem de uma réplica, sorteada por requisição para que a contagem
+e a página de uma listagem venham do mesmo banco. RoteadorReplicas direciona as
+leituras do ORM conforme essa marca. Relatórios, simulações e exportações são
+GETs e também vão para a réplica; o streaming das exportações continua marcado
+enquanto o corpo é gerado, depois do middleware. Gravações e as demais
+requisições usam sempre o banco principal (default). Depois da primeira
+gravação de uma requisição de leitura, o restante dela também lê do principal.
+Fora das requisições (comandos, scripts), `with ler_da_replica():` faz o mesmo.
+
+Leitura das próprias gravações: depois de um POST, PUT, PATCH ou DELETE bem
+sucedido, o mesmo cliente (cabeçalho Authorization, sessão ou IP) lê do
+principal por REPLICAS_JANELA segundos, o atraso tolerado da replicação. As
+respostas lidas de uma réplica dentro dessa janela após uma gravação nos seus
+modelos não entram no cache de respostas (escola/cache.py): o cache e o ETag
+ficariam com a versão nova e os dados antigos. Os instantes das gravações
+ficam no cache padrão; com vários workers, é preciso o Redis (REDIS_URL).
+"""
+
+import contextvars
+import hashlib
+import random
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+from django.http import FileResponse
+
+METODOS_LEITURA = ('GET', 'HEAD', 'OPTIONS')
+PREFIXO = 'escola:replicas'
+
+
+class Leitura:
+    """Banco das leituras da requisição em andamento; passa a ser o principal
+    (alias None) na primeira gravação."""
+
+    def __init__(self, alias):
+        self.alias = alias
+
+
+_leitura_atual = contextvars.ContextVar('leitura_atual', default=None)
+
+
+def replicas():
+    return list(getattr(settings, 'REPLICAS', []))
+
+
+def janela():
+    return getattr(settings, 'REPLICAS_JANELA', 5)
+
+
+@contextmanager
+def ler_da_replica(alias=None):
+    """Leituras do bloco na réplica `alias` ou em uma sorteada; sem réplicas, no principal."""
+    disponiveis = replicas()
+    leitura = Leitura(alias or (random.choice(disponiveis) if disponiveis else None))
+    token = _leitura_atual.set(leitura)
+    try:
+        yield leitura
+    finally:
+        _leitura_atual.reset(token)
+
+
+class RoteadorReplicas:
+    def db_for_read(self, model, **hints):
+        leitura = _leitura_atual.get()
+        return leitura.alias if leitura is not None else None
+
+    def db_for_write(self, model, **hints):
+        leitura = _leitura_atual.get()
+        if leitura is not None:
+            leitura.alias = None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Os mesmos dados: um objeto lido da réplica pode ser relacionado a um do principal
+        bancos = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in bancos and obj2._state.db in bancos:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # As réplicas recebem o esquema pela replicação
+        return False if db in replicas() else None
+
+
+def _chave_cliente(request):
+    identificacao = (
+        request.META.get('HTTP_AUTHORIZATION')
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        or request.META.get('REMOTE_ADDR', '')
+    )
+    return f'{PREFIXO}:cliente:' + hashlib.sha1(identificacao.encode()).hexdigest()
+
+
+def _chave_modelo(modelo):
+    return f'{PREFIXO}:gravacao:{modelo._meta.label_lower}'
+
+
+def registrar_gravacao(modelo):
+    """Chamado pelo escola.cache.invalidar a cada gravação em `modelo`."""
+    if replicas():
+        cache.set(_chave_modelo(modelo), True, timeout=janela())
+
+
+def _lendo_da_replica():
+    leitura = _leitura_atual.get()
+    return leitura is not None and leitura.alias is not None
+
+
+def pode_guardar_em_cache(modelos):
+    """False se a requisição lê de uma réplica que pode ainda não ter recebido
+    uma gravação recente em algum dos modelos."""
+    return not _lendo_da_replica() or not cache.get_many([_chave_modelo(modelo) for modelo in modelos])
+
+
+async def apode_guardar_em_cache(modelos):
+    return not _lendo_da_replica() or not await cache.aget_many([_chave_modelo(modelo) for modelo in modelos])
+
+
+def _na_replica(conteudo, alias):
+    with ler_da_replica(alias):
+        yield from conteudo
+
+
+class ReplicasMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replicas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.assincrono = iscoroutinefunction(get_response)
+        if self.assincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.assincrono:
+            return self.__acall__(request)
+        if request.method in METODOS_LEITURA:
+            if cache.get(_chave_cliente(request)):
+                return self.get_response(request)
+            with ler_da_replica() as leitura:
+                response = self.get_response(request)
+            return self.manter_no_streaming(response, leitura)
+        response = self.get_response(request)
+        if response.status_code < 400:
+            cache.set(_chave_cliente(request), True, timeout=janela())
+        return response
+
+    async def __acall__(self, request):
+        if request.method in METODOS_LEITURA:
+            if await cache.aget(_chave_cliente(request)):
+                return await self.get_response(request)
+            with ler_da_replica() as leitura:
+                response = await self.get_response(request)
+            return self.manter_no_streaming(response, leitura)
+        response = await self.get_response(request)
+        if response.status_code < 400:
+            await cache.aset(_chave_cliente(request), True, timeout=janela())
+        return response
+
+    def manter_no_streaming(self, response, leitura):
+        # Arquivos (as fotos de escola/midia.py) não consultam o banco
+        if isinstance(response, FileResponse) or leitura.alias is None:
+            return response
+        if response.streaming and not response.is_async:
+            response.streaming_content = _na_replica(response.streaming_content, leitura.alias)
+        return response
@@ -1,20 +1,59 @@
 from rest_framework import serializers
-from escola.models import Aluno, Curso, Matricula, Avaliacao, AtividadeAvaliativa
+from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
+from escola.models import Aluno, Curso, Matricula, Avaliacao, AtividadeAvaliativa, Tarefa
+from escola.lote import RelacionadoPreCarregado
+from escola.campos import CamposDinamicosMixin
+from escola import miniaturas, tarefas
 
-class AlunoSerializer(serializers.ModelSerializer):
+class MiniaturasFotoMixin(serializers.Serializer):
+    """URLs das miniaturas da foto: {variante: {formato: url}}"""
+    foto_miniaturas = serializers.SerializerMethodField()
+    campos_necessarios = {'foto_miniaturas': ['foto']}
+
+    def get_foto_miniaturas(self, obj):
+        return miniaturas.urls(obj.foto, self.context.get('request'))
+
+class AlunoSerializer(CamposDinamicosMixin, MiniaturasFotoMixin, serializers.ModelSerializer):
     class Meta:
         model = Aluno
-        fields = ['id', 'nome', 'rg', 'cpf', 'data_nascimento', 'foto']
+        fields = ['id', 'nome', 'rg', 'cpf', 'data_nascimento', 'foto', 'foto_miniaturas']
+
+def validar_pesos(pesos):
+    if sum(pesos) <= 0:
+        raise serializers.ValidationError('A soma dos pesos das notas deve ser maior que zero.')
+
+def validar_limites(nota_aprovacao, nota_prova_final):
+    if nota_prova_final > nota_aprovacao:
+        raise serializers.ValidationError('A nota de prova final não pode ser maior que a nota de aprovação.')
 
-class CursoSerializer(serializers.ModelSerializer):
+class CursoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Curso
         fields = '__all__'
+        extra_kwargs = {
+            'nota_aprovacao': {'min_value': 0, 'max_value': 10},
+            'nota_prova_final': {'min_value': 0, 'max_value': 10},
+        }
+
+    def validate(self, data):
+        regra = {}
+        for campo in Curso.CAMPOS_REGRA:
+            padrao = getattr(self.instance, campo, Curso._meta.get_field(campo).default)
+            regra[campo] = data.get(campo, padrao)
+        validar_pesos([regra['peso_nota1'], regra['peso_nota2'], regra['peso_nota3']])
+        validar_limites(regra['nota_aprovacao'], regra['nota_prova_final'])
+        return data
+
+class MatriculaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    serializer_related_field = RelacionadoPreCarregado
+    expansoes = {'aluno': AlunoSerializer, 'curso': CursoSerializer}
 
-class MatriculaSerializer(serializers.ModelSerializer):
     class Meta:
         model = Matricula
         exclude = []
+        validators = [
+            UniqueTogetherValidator(queryset=Matricula.objects.all(), fields=['aluno', 'curso']),
+        ]
 
 class ListaMatriculasAlunoSerializer(serializers.ModelSerializer):
     curso = serializers.ReadOnlyField(source='curso.descricao')
@@ -31,22 +70,74 @@ class ListaAlunosMatriculadosSerializer(serializers.ModelSerializer):
         model = Matricula
         fields = ['aluno_nome']
 
-class AlunoSerializerV2(serializers.ModelSerializer):
+class AlunoSerializerV2(CamposDinamicosMixin, MiniaturasFotoMixin, serializers.ModelSerializer):
     class Meta:
         model = Aluno
-        fields = ['id', 'nome','celular', 'rg', 'cpf', 'data_nascimento', 'foto']
+        fields = ['id', 'nome','celular', 'rg', 'cpf', 'data_nascimento', 'foto', 'foto_miniaturas']
 
-class AvaliacaoSerializer(serializers.ModelSerializer):
-    media = serializers.ReadOnlyField()
-    situacao = serializers.ReadOnlyField()
+class AvaliacaoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    media = serializers.FloatField(read_only=True)
+    situacao = serializers.CharField(read_only=True)
+    expansoes = {'matricula': MatriculaSerializer}
     
     class Meta:
         model = Avaliacao
         fields = ['id', 'matricula', 'nota1', 'nota2', 'nota3', 'media', 'situacao', 'data_criacao']
+        extra_kwargs = {
+            'matricula': {'validators': [UniqueValidator(queryset=Avaliacao.objects.all())]},
+        }
 
-class AtividadeAvaliativaSerializer(serializers.ModelSerializer):
+class AtividadeAvaliativaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    serializer_related_field = RelacionadoPreCarregado
     tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
+    expansoes = {'matricula': MatriculaSerializer}
+    campos_necessarios = {'tipo_display': ['tipo']}
     
     class Meta:
         model = AtividadeAvaliativa
-        fields = ['id', 'matricula', 'tipo', 'tipo_display', 'titulo', 'descricao', 'nota', 'data_entrega', 'entregue', 'data_criacao']
\ No newline at end of file
+        fields = ['id', 'matricula', 'tipo', 'tipo_display', 'titulo', 'descricao', 'nota', 'data_entrega', 'entregue', 'data_criacao']
+
+class SimulacaoNotasSerializer(serializers.Serializer):
+    """Parâmetros da simulação; os omitidos seguem a regra de cada curso"""
+    peso_nota1 = serializers.IntegerField(min_value=0, max_value=100, required=False)
+    peso_nota2 = serializers.IntegerField(min_value=0, max_value=100, required=False)
+    peso_nota3 = serializers.IntegerField(min_value=0, max_value=100, required=False)
+    nota_aprovacao = serializers.DecimalField(max_digits=3, decimal_places=1, min_value=0, max_value=10, required=False)
+    nota_prova_final = serializers.DecimalField(max_digits=3, decimal_places=1, min_value=0, max_value=10, required=False)
+
+    def validate(self, data):
+        pesos = [data.pop(campo, None) for campo in ('peso_nota1', 'peso_nota2', 'peso_nota3')]
+        if any(peso is not None for peso in pesos):
+            if None in pesos:
+                raise serializers.ValidationError('Informe os três pesos (peso_nota1, peso_nota2 e peso_nota3).')
+            validar_pesos(pesos)
+            data['pesos'] = pesos
+        if 'nota_aprovacao' in data and 'nota_prova_final' in data:
+            validar_limites(data['nota_aprovacao'], data['nota_prova_final'])
+        return data
+
+class TarefaSerializer(serializers.ModelSerializer):
+    """Tarefa de manutenção com o progresso (percentual, itens por segundo e tempo restante estimado)"""
+    situacao_display = serializers.CharField(source='get_situacao_display', read_only=True)
+    percentual = serializers.FloatField(read_only=True)
+    itens_por_segundo = serializers.FloatField(read_only=True)
+    segundos_restantes = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Tarefa
+        fields = [
+            'id', 'tipo', 'parametros', 'situacao', 'situacao_display', 'total', 'processados', 'percentual',
+            'itens_por_segundo', 'segundos_restantes', 'duracao', 'resultado', 'erro', 'criada_em', 'iniciada_em',
+            'atualizada_em', 'concluida_em',
+        ]
+        read_only_fields = [
+            'situacao', 'total', 'processados', 'duracao', 'resultado', 'erro', 'criada_em', 'iniciada_em',
+            'atualizada_em', 'concluida_em',
+        ]
+
+    def validate(self, data):
+        data['parametros'] = tarefas.validar_parametros(data['tipo'], data.get('parametros'))
+        return data
+
+    def create(self, validated_data):
+        return tarefas.enfileirar(validated_data['tipo'], validated_data['parametros'])
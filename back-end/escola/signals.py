@@ -0,0 +1,10 @@
+from django.dispatch import Signal
+
+# Enviado pelas operações em lote dos QuerySets da escola (bulk_create,
+# inserir_linhas, bulk_update, atualizar_linhas e update), que não disparam
+# post_save. Argumentos:
+#   objs: instâncias gravadas (None em QuerySet.update)
+#   pks: conjunto de chaves primárias afetadas (vazio em inserir_linhas)
+#   campos: campos alterados (None em bulk_create e inserir_linhas)
+#   using: alias do banco em que a gravação foi feita
+lote_gravado = Signal()
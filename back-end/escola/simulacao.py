@@ -0,0 +1,68 @@
+"""
+Simulação de regras de notas ("e se?") sem gravar nada.
+
+As notas e a regra atual do curso de cada avaliação são lidas em uma consulta,
+já convertidas para números no SQL, e vão direto para arrays do NumPy. A regra
+simulada substitui apenas os valores informados; o restante continua vindo do
+curso de cada avaliação. O resultado compara as situações gravadas com as
+simuladas.
+"""
+
+import numpy as np
+from django.db.models import Case, FloatField, IntegerField, Value, When
+from django.db.models.functions import Cast
+
+from escola import motor_notas
+from escola.models import Avaliacao, Curso
+
+COLUNAS_NOTAS = ('nota1', 'nota2', 'nota3')
+COLUNAS_PESOS = ('peso_nota1', 'peso_nota2', 'peso_nota3')
+
+
+def carregar(curso_id=None):
+    """Retorna um array (n, 9): notas (3), pesos (3), aprovação, prova final e
+    o índice em SITUACOES da situação gravada."""
+    queryset = Avaliacao.objects.all()
+    if curso_id is not None:
+        queryset = queryset.filter(matricula__curso_id=curso_id)
+    anotacoes = {f'sim_{campo}': Cast(campo, FloatField()) for campo in COLUNAS_NOTAS}
+    anotacoes.update({
+        f'sim_{campo}': Cast(f'matricula__curso__{campo}', FloatField()) for campo in Curso.CAMPOS_REGRA
+    })
+    anotacoes['sim_situacao'] = Case(
+        *(When(situacao=situacao, then=Value(indice)) for indice, situacao in enumerate(motor_notas.SITUACOES)),
+        default=Value(len(motor_notas.SITUACOES) - 1),
+        output_field=IntegerField(),
+    )
+    linhas = queryset.annotate(**anotacoes).values_list(*anotacoes.keys())
+    return np.array(list(linhas), dtype=np.float64).reshape(-1, len(anotacoes))
+
+
+def simular(curso_id=None, pesos=None, nota_aprovacao=None, nota_prova_final=None):
+    """Compara as situações gravadas com as obtidas pela regra simulada."""
+    dados = carregar(curso_id)
+    notas = dados[:, 0:3]
+    pesos_simulados = dados[:, 3:6] if pesos is None else np.asarray(pesos, dtype=np.float64)
+    aprovacao = dados[:, 6] if nota_aprovacao is None else float(nota_aprovacao)
+    final = dados[:, 7] if nota_prova_final is None else float(nota_prova_final)
+    atuais = dados[:, 8].astype(np.int64)
+
+    medias, simuladas = motor_notas.calcular(notas, pesos_simulados, aprovacao, final)
+    quantidade = len(motor_notas.SITUACOES)
+    transicoes = np.bincount(atuais * quantidade + simuladas, minlength=quantidade * quantidade).reshape(quantidade, quantidade)
+
+    atual = motor_notas.contar_situacoes(atuais)
+    simulado = motor_notas.contar_situacoes(simuladas)
+    return {
+        'total': len(dados),
+        'atual': atual,
+        'simulado': simulado,
+        'diferenca': {situacao: simulado[situacao] - atual[situacao] for situacao in motor_notas.SITUACOES},
+        'media_simulada': round(float(medias.mean()), 2) if len(dados) else None,
+        'mudancas': [
+            {'de': de, 'para': para, 'total': int(transicoes[i, j])}
+            for i, de in enumerate(motor_notas.SITUACOES)
+            for j, para in enumerate(motor_notas.SITUACOES)
+            if i != j and transicoes[i, j]
+        ],
+    }
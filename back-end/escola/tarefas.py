@@ -0,0 +1,237 @@
+"""
+Tarefas de manutenção em segundo plano, sem broker externo.
+
+Uma tarefa é uma linha de escola.models.Tarefa, enfileirada pela API
+(POST /jobs/) ou pelo comando executar_tarefa. O comando trabalhador_tarefas
+roda em um ou mais processos; cada um reserva uma tarefa pendente com um
+UPDATE condicional e percorre os itens da tarefa em lotes, em ordem de pk.
+O progresso (processados e a posição, o pk do último item) é gravado na mesma
+transação de cada lote: uma tarefa interrompida recomeça do último lote
+confirmado. Tarefas em execução sem progresso há TAREFAS_TEMPO_LIMITE
+segundos são consideradas abandonadas e podem ser reservadas de novo.
+
+Com REDIS_URL definida, enfileirar avisa os trabalhadores por uma lista do
+Redis; sem ela, eles consultam o banco a cada intervalo.
+
+As tarefas disponíveis ficam em escola/manutencao.py.
+"""
+
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from escola.models import Tarefa
+
+logger = logging.getLogger(__name__)
+
+CHAVE_AVISOS = 'escola:tarefas:avisos'
+
+TIPOS = {}
+
+
+def registrar(definicao):
+    """Decorador das classes de tarefa, que as torna disponíveis pelo `tipo`."""
+    TIPOS[definicao.tipo] = definicao
+    return definicao
+
+
+class TarefaInterrompida(Exception):
+    """A tarefa foi cancelada ou reservada por outro trabalhador."""
+
+
+class DefinicaoTarefa:
+    """Base das tarefas. Os itens são os pks de consulta(), processados em
+    lotes de `tamanho_lote` por processar(pks), cada lote em uma transação.
+    processar deve poder ser repetido para o mesmo lote: um lote interrompido
+    antes do commit é processado de novo na retomada."""
+    tipo = None
+    descricao = ''
+    tamanho_lote = 1000
+
+    class Parametros(serializers.Serializer):
+        pass
+
+    def __init__(self, parametros):
+        self.parametros = parametros
+
+    def preparar(self):
+        """Executado uma única vez, antes do primeiro lote."""
+
+    def consulta(self):
+        raise NotImplementedError
+
+    def processar(self, pks):
+        raise NotImplementedError
+
+    def resumo(self):
+        """Resultado gravado ao concluir (ou None)."""
+        return None
+
+
+def validar_parametros(tipo, parametros):
+    if tipo not in TIPOS:
+        raise serializers.ValidationError({'tipo': f"Tipo de tarefa desconhecido. Opções: {', '.join(sorted(TIPOS))}."})
+    serializer = TIPOS[tipo].Parametros(data=parametros or {})
+    if not serializer.is_valid():
+        raise serializers.ValidationError({'parametros': serializer.errors})
+    # .data traz datas e demais valores já na forma gravada no JSONField
+    return dict(serializer.data)
+
+
+def enfileirar(tipo, parametros=None):
+    """Cria a tarefa pendente e avisa os trabalhadores após o commit."""
+    tarefa = Tarefa.objects.create(tipo=tipo, parametros=validar_parametros(tipo, parametros))
+    transaction.on_commit(avisar)
+    return tarefa
+
+
+def cancelar(tarefa):
+    """Cancela uma tarefa pendente ou em execução; o trabalhador para no lote
+    seguinte, desfazendo o lote em andamento. Retorna False se ela já terminou."""
+    alteradas = Tarefa.objects.filter(pk=tarefa.pk).exclude(situacao__in=Tarefa.FINALIZADAS).update(
+        situacao='cancelada', concluida_em=timezone.now(), atualizada_em=timezone.now(),
+    )
+    tarefa.refresh_from_db()
+    return alteradas == 1
+
+
+def identificador():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def reservar(trabalhador, pk=None):
+    """Reserva a próxima tarefa pendente (ou abandonada) para o trabalhador,
+    ou a tarefa `pk`. O UPDATE só acontece se a tarefa ainda estiver como foi
+    lida, então dois trabalhadores nunca reservam a mesma tarefa."""
+    limite = timezone.now() - timedelta(seconds=getattr(settings, 'TAREFAS_TEMPO_LIMITE', 300))
+    candidatas = Tarefa.objects.filter(
+        Q(situacao='pendente') | Q(situacao='executando', atualizada_em__lt=limite)
+    ).order_by('criada_em', 'pk')
+    if pk is not None:
+        candidatas = candidatas.filter(pk=pk)
+    for tarefa in candidatas[:10]:
+        agora = timezone.now()
+        reservada = Tarefa.objects.filter(
+            pk=tarefa.pk, situacao=tarefa.situacao, atualizada_em=tarefa.atualizada_em,
+        ).update(situacao='executando', trabalhador=trabalhador, iniciada_em=tarefa.iniciada_em or agora, atualizada_em=agora)
+        if reservada:
+            tarefa.refresh_from_db()
+            return tarefa
+    return None
+
+
+def _gravar_progresso(tarefa, trabalhador, **campos):
+    agora = timezone.now()
+    gravadas = Tarefa.objects.filter(pk=tarefa.pk, situacao='executando', trabalhador=trabalhador).update(
+        atualizada_em=agora, **campos,
+    )
+    if not gravadas:
+        raise TarefaInterrompida(tarefa.pk)
+    for campo, valor in campos.items():
+        setattr(tarefa, campo, valor)
+    tarefa.atualizada_em = agora
+
+
+def executar(tarefa, trabalhador, progresso=None):
+    """Executa (ou retoma) uma tarefa reservada por `trabalhador` até o fim.
+    `progresso`, se informado, é chamado com a tarefa após cada lote."""
+    definicao = TIPOS[tarefa.tipo](tarefa.parametros)
+    # A duração inclui o que roda após o commit de cada lote (como o recálculo
+    # das avaliações), somado na gravação seguinte
+    relogio = time.perf_counter()
+
+    def duracao():
+        nonlocal relogio
+        agora, anterior = time.perf_counter(), relogio
+        relogio = agora
+        return tarefa.duracao + agora - anterior
+
+    try:
+        if tarefa.posicao is None:
+            with transaction.atomic():
+                definicao.preparar()
+                _gravar_progresso(tarefa, trabalhador, total=definicao.consulta().count(), posicao=0)
+
+        while True:
+            pks = list(
+                definicao.consulta().filter(pk__gt=tarefa.posicao).order_by('pk')
+                .values_list('pk', flat=True)[:definicao.tamanho_lote]
+            )
+            if not pks:
+                break
+            with transaction.atomic():
+                definicao.processar(pks)
+                _gravar_progresso(
+                    tarefa, trabalhador, posicao=pks[-1], processados=tarefa.processados + len(pks),
+                    duracao=duracao(),
+                )
+            if progresso is not None:
+                progresso(tarefa)
+
+        _gravar_progresso(
+            tarefa, trabalhador, situacao='concluida', concluida_em=timezone.now(), resultado=definicao.resumo(),
+            duracao=duracao(),
+        )
+    except TarefaInterrompida:
+        tarefa.refresh_from_db()
+        logger.info('Tarefa %s interrompida (%s)', tarefa.pk, tarefa.get_situacao_display())
+    except Exception:
+        logger.exception('Tarefa %s falhou', tarefa.pk)
+        Tarefa.objects.filter(pk=tarefa.pk, situacao='executando', trabalhador=trabalhador).update(
+            situacao='falhou', erro=traceback.format_exc(), concluida_em=timezone.now(), atualizada_em=timezone.now(),
+        )
+        tarefa.refresh_from_db()
+    return tarefa
+
+
+def _redis():
+    if not getattr(settings, 'REDIS_URL', None):
+        return None
+    from django_redis import get_redis_connection
+    return get_redis_connection('default')
+
+
+def avisar():
+    try:
+        conexao = _redis()
+        if conexao is not None:
+            conexao.lpush(CHAVE_AVISOS, 1)
+    except Exception:
+        # O aviso só adianta a consulta; sem ele a tarefa sai no próximo intervalo
+        logger.warning('Não foi possível avisar os trabalhadores pelo Redis', exc_info=True)
+
+
+def esperar(intervalo):
+    try:
+        conexao = _redis()
+        if conexao is not None:
+            conexao.brpop(CHAVE_AVISOS, timeout=max(1, int(intervalo)))
+            return
+    except Exception:
+        logger.warning('Não foi possível aguardar avisos pelo Redis', exc_info=True)
+    time.sleep(intervalo)
+
+
+def trabalhar(intervalo=None, uma_vez=False, progresso=None):
+    """Laço de um trabalhador: executa as tarefas disponíveis e aguarda novas.
+    Com uma_vez, retorna quando não houver mais tarefas."""
+    intervalo = getattr(settings, 'TAREFAS_INTERVALO', 2) if intervalo is None else intervalo
+    trabalhador = identificador()
+    while True:
+        close_old_connections()
+        tarefa = reservar(trabalhador)
+        if tarefa is not None:
+            executar(tarefa, trabalhador, progresso)
+        elif uma_vez:
+            return
+        else:
+            esperar(intervalo)
@@ -0,0 +1,72 @@
+import asyncio
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from escola.models import Aluno, Curso, Matricula
+from setup.urls import rotas_assincronas
+
+# As rotas assíncronas só são registradas no ASGI; os testes usam este módulo como urlconf
+urlpatterns = rotas_assincronas
+
+class LeiturasAssincronasTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.curso = Curso.objects.create(codigo_curso='CTT1', descricao='Curso teste 1', nivel='B')
+        for indice in range(3):
+            aluno = Aluno.objects.create(nome='Aluno {}'.format(indice), rg='123456789', cpf='1234567890{}'.format(indice), data_nascimento='2000-01-01')
+            Matricula.objects.create(aluno=aluno, curso=self.curso, periodo='M')
+        self.aluno = aluno
+
+    def get_assincrono(self, url, **headers):
+        async def get():
+            return await self.async_client.get(url, headers=headers)
+        with override_settings(ROOT_URLCONF=__name__):
+            return async_to_sync(get)()
+
+    def test_rotas_assincronas_sao_corrotinas(self):
+        """Teste para verificar que as listagens do ASGI são atendidas por views assíncronas"""
+        for rota in rotas_assincronas:
+            self.assertTrue(asyncio.iscoroutinefunction(rota.callback))
+
+    def test_requisicao_get_assincrona_igual_a_sincrona(self):
+        """Teste para verificar que as listagens assíncronas respondem o mesmo que as síncronas"""
+        urls = [
+            '/alunos/?page_size=2',
+            '/alunos/?search=aluno&fields=id,nome',
+            '/cursos/',
+            '/matriculas/?paginacao=false',
+            '/alunos/{}/matriculas/'.format(self.aluno.id),
+            '/cursos/{}/matriculas/'.format(self.curso.id),
+        ]
+        for url in urls:
+            response = self.get_assincrono(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+            cache.clear()
+            self.assertEqual(response.content, self.client.get(url).content, url)
+        proxima = self.get_assincrono('/alunos/?page_size=2').json()['next']
+        response = self.get_assincrono(proxima)
+        self.assertEqual(response.json()['results'][0]['nome'], 'Aluno 2')
+
+    def test_requisicao_get_assincrona_com_cache_e_etag(self):
+        """Teste para verificar o cache, o ETag e o 304 nas leituras assíncronas"""
+        response = self.get_assincrono('/cursos/')
+        etag = response['ETag']
+        self.assertEqual(self.get_assincrono('/cursos/', if_none_match=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get('/cursos/')['ETag'], etag)
+        self.client.patch('/cursos/{}/'.format(self.curso.id), data={'descricao': 'Curso renomeado'})
+        response = self.get_assincrono('/cursos/', if_none_match=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['results'][0]['descricao'], 'Curso renomeado')
+
+    def test_requisicao_post_na_rota_assincrona(self):
+        """Teste para verificar que as gravações nas rotas assíncronas usam a view síncrona"""
+        dados = {'codigo_curso': 'CTT2', 'descricao': 'Curso teste 2', 'nivel': 'A'}
+        async def post():
+            return await self.async_client.post('/cursos/', dados, content_type='application/json')
+        with override_settings(ROOT_URLCONF=__name__):
+            response = async_to_sync(post)()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Curso.objects.filter(codigo_curso='CTT2').exists())
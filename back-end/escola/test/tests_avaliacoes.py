@@ -0,0 +1,94 @@
+from rest_framework.test import APITestCase
+from escola.models import Aluno, Curso, Matricula, Avaliacao
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+class AvaliacaoTestCase(APITestCase):
+
+    def setUp(self):
+        self.list_url = reverse('Avaliacoes-list')
+        aluno = Aluno.objects.create(nome='Aluno teste', rg='123456789', cpf='12345678901', data_nascimento='2000-01-01')
+        matriculas = [
+            Matricula.objects.create(
+                aluno=aluno,
+                curso=Curso.objects.create(codigo_curso='CTT{}'.format(indice), descricao='Curso teste {}'.format(indice), nivel='B'),
+                periodo='M',
+            )
+            for indice in range(3)
+        ]
+        self.matricula = matriculas[0]
+        self.aprovado = Avaliacao.objects.create(matricula=matriculas[0], nota1=9, nota2=8, nota3=7)
+        self.final_baixa = Avaliacao.objects.create(matricula=matriculas[1], nota1=5, nota2=5, nota3=5)
+        self.final_alta = Avaliacao.objects.create(matricula=matriculas[2], nota1=6, nota2=6, nota3=8)
+
+    def test_media_e_situacao_gravadas_no_save(self):
+        """Teste para verificar que media e situacao são persistidas ao salvar"""
+        self.aprovado.refresh_from_db()
+        self.assertEqual(float(self.aprovado.media), 8.2)
+        self.assertEqual(self.aprovado.situacao, 'Aprovado')
+        self.aprovado.nota1 = 0
+        self.aprovado.save(update_fields=['nota1'])
+        self.aprovado.refresh_from_db()
+        self.assertEqual(float(self.aprovado.media), 4.6)
+        self.assertEqual(self.aprovado.situacao, 'Prova Final')
+
+    def test_save_usa_o_curso_ja_carregado(self):
+        """Teste para verificar que o save não consulta matrícula e curso quando já estão carregados"""
+        avaliacao = Avaliacao.objects.select_related('matricula__curso').get(pk=self.aprovado.pk)
+        avaliacao.nota1 = 0
+        with CaptureQueriesContext(connection) as consultas:
+            avaliacao.save(update_fields=['nota1'])
+        selects = [consulta['sql'] for consulta in consultas if consulta['sql'].startswith('SELECT')]
+        self.assertFalse([sql for sql in selects if '"escola_matricula"' in sql or '"escola_curso"' in sql])
+        self.assertEqual(avaliacao.situacao, 'Prova Final')
+
+    def test_media_e_situacao_atualizadas_no_bulk_update(self):
+        """Teste para verificar que bulk_update recalcula media e situacao"""
+        self.final_baixa.nota1 = self.final_baixa.nota2 = self.final_baixa.nota3 = 10
+        Avaliacao.objects.bulk_update([self.final_baixa], ['nota1', 'nota2', 'nota3'])
+        self.final_baixa.refresh_from_db()
+        self.assertEqual(float(self.final_baixa.media), 10.0)
+        self.assertEqual(self.final_baixa.situacao, 'Aprovado')
+
+    def test_requisicao_get_filtrando_por_situacao_e_ordenando_por_media(self):
+        """Teste para verificar o filtro ?situacao= com ?ordering=-media"""
+        response = self.client.get(self.list_url, {'situacao': 'Prova Final', 'ordering': '-media'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        resultados = response.data['results']
+        self.assertEqual([item['id'] for item in resultados], [self.final_alta.id, self.final_baixa.id])
+        self.assertEqual(resultados[0]['media'], 6.4)
+        self.assertEqual(resultados[0]['situacao'], 'Prova Final')
+
+    def test_requisicao_post_para_matricula_que_ja_tem_avaliacao(self):
+        """Teste para verificar que cada matrícula tem no máximo uma avaliação"""
+        data = {'matricula': self.matricula.id, 'nota1': 5, 'nota2': 5, 'nota3': 5}
+        response = self.client.post(self.list_url, data=data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('matricula', response.data)
+        self.assertEqual(Avaliacao.objects.filter(matricula=self.matricula).count(), 1)
+
+    def test_media_e_situacao_seguem_a_regra_do_curso(self):
+        """Teste para verificar que alterar a regra do curso recalcula as suas avaliações"""
+        curso = self.matricula.curso
+        response = self.client.patch('/cursos/{}/'.format(curso.id), data={'peso_nota1': 1, 'peso_nota2': 0, 'peso_nota3': 0})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.aprovado.refresh_from_db()
+        self.assertEqual(float(self.aprovado.media), 9.0)
+        self.final_baixa.refresh_from_db()
+        self.assertEqual(float(self.final_baixa.media), 5.0)
+
+        Avaliacao.objects.filter(pk=self.aprovado.pk).update(nota1=4)
+        self.aprovado.refresh_from_db()
+        self.aprovado.save()
+        self.assertEqual(float(self.aprovado.media), 4.0)
+        self.assertEqual(self.aprovado.situacao, 'Reprovado')
+
+    def test_requisicao_patch_com_regra_invalida(self):
+        """Teste para verificar a validação dos pesos e limites do curso"""
+        url = '/cursos/{}/'.format(self.matricula.curso.id)
+        response = self.client.patch(url, data={'peso_nota1': 0, 'peso_nota2': 0, 'peso_nota3': 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.patch(url, data={'nota_prova_final': '8.0'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,71 @@
+import shutil
+import tempfile
+from datetime import date
+from io import StringIO
+from unittest import mock
+from django.test import override_settings
+from rest_framework.test import APITestCase
+import benchmark_endpoints
+from escola import dados_sinteticos, notas
+
+MEDIA_TESTE = tempfile.mkdtemp()
+
+@override_settings(MEDIA_ROOT=MEDIA_TESTE)
+class BenchmarkEndpointsTestCase(APITestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_TESTE, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        dados_sinteticos.gerar_dados(20, areas=2, semente=5, data_base=date(2026, 1, 10))
+
+    def test_todas_as_rotas_tem_um_caso(self):
+        """Teste para verificar que cada rota de setup/urls.py é exercitada pelo benchmark"""
+        casos = benchmark_endpoints.casos(benchmark_endpoints.preparar_amostra())
+        self.assertEqual(benchmark_endpoints.rotas_sem_caso(casos), [])
+
+    def test_casos_respondem_com_o_status_esperado(self):
+        """Teste para verificar latências, consultas, bytes e status de todos os casos, sem alterar a base"""
+        from escola.models import Aluno, Matricula
+        alunos, matriculas = Aluno.objects.count(), Matricula.objects.count()
+        resultado = benchmark_endpoints.medir_conjunto(repeticoes=2, saida=StringIO())
+        self.assertEqual(resultado['rotas_sem_caso'], [])
+        for nome, medicao in resultado['endpoints'].items():
+            self.assertEqual(medicao['erros'], [], nome)
+            self.assertEqual(medicao['requisicoes'], 2, nome)
+            self.assertLessEqual(medicao['p50_ms'], medicao['p99_ms'], nome)
+            if not nome.startswith('DELETE'):
+                self.assertGreater(medicao['bytes'], 0, nome)
+        self.assertGreater(resultado['endpoints']['GET /alunos/']['consultas'], 0)
+        self.assertEqual((Aluno.objects.count(), Matricula.objects.count()), (alunos, matriculas))
+
+    def test_gravacoes_medem_os_callbacks_do_commit(self):
+        """Teste para verificar que o recálculo agendado para o commit roda dentro da medição e é desfeito"""
+        from escola.models import AtividadeAvaliativa, Avaliacao
+        amostra = benchmark_endpoints.preparar_amostra()
+        atividade = amostra['atividade']
+        caso = benchmark_endpoints.Caso('patch', f'/atividades/{atividade.pk}/', {'nota': '1.00', 'entregue': True})
+        avaliacoes = list(Avaliacao.objects.order_by('pk').values_list('pk', 'nota1', 'nota2', 'nota3'))
+        self.client.force_authenticate(amostra['usuario'])
+        with mock.patch('escola.notas.recalcular_avaliacoes', wraps=notas.recalcular_avaliacoes) as recalculo:
+            medicao = benchmark_endpoints.medir(self.client, caso, repeticoes=1)
+        self.assertEqual(medicao['erros'], [])
+        recalculo.assert_called_once()
+        self.assertEqual(set(recalculo.call_args.args[0]), {atividade.matricula_id})
+        self.assertEqual(AtividadeAvaliativa.objects.get(pk=atividade.pk).nota, atividade.nota)
+        self.assertEqual(list(Avaliacao.objects.order_by('pk').values_list('pk', 'nota1', 'nota2', 'nota3')), avaliacoes)
+
+    def test_comparar_aponta_as_regressoes(self):
+        """Teste para verificar que comparar aponta latência, consultas e tamanho acima da tolerância"""
+        def resultado(p95, consultas, varridas, tamanho):
+            medicao = {'p95_ms': p95, 'consultas': consultas, 'linhas_varridas': varridas, 'bytes': tamanho, 'erros': []}
+            return {'conjuntos': {'1000': {'endpoints': {'GET /alunos/': medicao}}}}
+
+        base = resultado(10.0, 3, 100, 5000)
+        self.assertEqual(benchmark_endpoints.comparar(base, resultado(11.5, 3, 110, 5500)), [])
+        regressoes = benchmark_endpoints.comparar(base, resultado(20.0, 4, 1000, 9000))
+        self.assertEqual([metrica for _, _, metrica, _, _ in regressoes], ['p95_ms', 'consultas', 'linhas_varridas', 'bytes'])
+        # Pequenas diferenças absolutas de latência são ruído
+        self.assertEqual(benchmark_endpoints.comparar(resultado(0.5, 3, 0, 10), resultado(1.2, 3, 0, 10)), [])
@@ -0,0 +1,73 @@
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from rest_framework import status
+from rest_framework.test import APITestCase
+from escola.busca import TABELA
+from escola.models import Aluno
+
+class BuscaAlunosTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.jose = Aluno.objects.create(nome='José Álvares', rg='123456789', cpf='12345678901', data_nascimento='2000-01-01', celular='11987654321')
+        self.joana = Aluno.objects.create(nome='Joana Conceição', rg='123456789', cpf='98765432100', data_nascimento='2000-01-01', celular='21912345678')
+
+    def buscar(self, termo):
+        response = self.client.get('/alunos/', {'search': termo, 'paginacao': 'false'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [aluno['nome'] for aluno in response.data]
+
+    def test_requisicao_get_busca_sem_acentos_e_por_prefixo(self):
+        """Teste para verificar a busca por prefixos do nome, ignorando acentos e maiúsculas"""
+        self.assertEqual(self.buscar('jose'), ['José Álvares'])
+        self.assertEqual(self.buscar('ALV JOS'), ['José Álvares'])
+        self.assertEqual(self.buscar('conceicao'), ['Joana Conceição'])
+        self.assertEqual(sorted(self.buscar('jo')), ['Joana Conceição', 'José Álvares'])
+        self.assertEqual(self.buscar('maria'), [])
+        self.assertEqual(len(self.buscar('')), 2)
+
+    def test_requisicao_get_busca_por_cpf_e_celular(self):
+        """Teste para verificar a busca por prefixo do cpf (com ou sem máscara) e do celular"""
+        self.assertEqual(self.buscar('123.456'), ['José Álvares'])
+        self.assertEqual(self.buscar('987654321-00'), ['Joana Conceição'])
+        self.assertEqual(self.buscar('(21) 9123'), ['Joana Conceição'])
+
+    def test_indice_acompanha_as_gravacoes(self):
+        """Teste para verificar o índice após alterar, excluir, criar em lote e QuerySet.update"""
+        self.client.patch('/alunos/{}/'.format(self.jose.id), data={'nome': 'Júlio Álvares'})
+        self.assertEqual(self.buscar('jose'), [])
+        self.assertEqual(self.buscar('julio'), ['Júlio Álvares'])
+
+        self.client.delete('/alunos/{}/'.format(self.joana.id))
+        self.assertEqual(self.buscar('joana'), [])
+
+        Aluno.objects.bulk_create([
+            Aluno(nome='Ângela Ramos', rg='123456789', cpf='11122233344', data_nascimento='2000-01-01'),
+            Aluno(nome='Érico Lima', rg='123456789', cpf='55566677788', data_nascimento='2000-01-01'),
+        ])
+        self.assertEqual(self.buscar('angela'), ['Ângela Ramos'])
+
+        Aluno.objects.filter(nome='Érico Lima').update(nome='Otávio Lima')
+        self.assertEqual(self.buscar('otavio'), ['Otávio Lima'])
+        self.assertEqual(self.buscar('erico'), [])
+
+    def test_admin_usa_o_indice_de_busca(self):
+        """Teste para verificar a busca na listagem de alunos do admin"""
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@escola.com', 'senha'))
+        response = self.client.get('/controle-geral/escola/aluno/', {'q': 'alvares'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.context['cl'].result_list), [self.jose])
+
+    def test_comando_reindexar_busca(self):
+        """Teste para verificar que o comando reconstrói o índice"""
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM {}'.format(TABELA))
+        self.assertEqual(self.buscar('jose'), [])
+        cache.clear()
+        saida = StringIO()
+        call_command('reindexar_busca', stdout=saida)
+        self.assertIn('2 alunos indexados', saida.getvalue())
+        self.assertEqual(self.buscar('jose'), ['José Álvares'])
@@ -0,0 +1,135 @@
+from unittest import mock
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from escola.models import Aluno, Curso, Matricula, AtividadeAvaliativa
+
+# Um processo só: o cache local faz o papel do compartilhado (Redis)
+@override_settings(CACHE_COMPARTILHADO=True)
+class CacheRespostasTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.curso = Curso.objects.create(codigo_curso='CTT1', descricao='Curso teste 1', nivel='B')
+        self.aluno = Aluno.objects.create(nome='Aluno teste', rg='123456789', cpf='12345678901', data_nascimento='2000-01-01')
+        self.matricula = Matricula.objects.create(aluno=self.aluno, curso=self.curso, periodo='M')
+
+    def get_sem_consultas(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(consultas)
+
+    def test_segunda_leitura_vem_do_cache(self):
+        """Teste para verificar que a segunda leitura não consulta o banco"""
+        self.client.get('/cursos/')
+        response, consultas = self.get_sem_consultas('/cursos/')
+        self.assertEqual(consultas, 0)
+        self.assertEqual(response.data['results'][0]['descricao'], 'Curso teste 1')
+
+    def test_gravacao_invalida_as_respostas_dependentes(self):
+        """Teste para verificar que uma gravação em Curso invalida cursos/ e alunos/<pk>/matriculas/"""
+        url_matriculas = '/alunos/{}/matriculas/'.format(self.aluno.id)
+        self.client.get('/cursos/')
+        self.client.get(url_matriculas)
+        self.client.patch('/cursos/{}/'.format(self.curso.id), data={'descricao': 'Curso renomeado'})
+
+        response, consultas = self.get_sem_consultas('/cursos/')
+        self.assertGreater(consultas, 0)
+        self.assertEqual(response.data['results'][0]['descricao'], 'Curso renomeado')
+        response, _ = self.get_sem_consultas(url_matriculas)
+        self.assertEqual(response.data[0]['curso'], 'Curso renomeado')
+
+    def test_gravacao_nao_invalida_respostas_independentes(self):
+        """Teste para verificar que gravações em outros modelos mantêm a entrada do cache"""
+        self.client.get('/cursos/')
+        AtividadeAvaliativa.objects.create(matricula=self.matricula, tipo='A', titulo='Atividade 1')
+        AtividadeAvaliativa.objects.bulk_create([AtividadeAvaliativa(matricula=self.matricula, titulo='Atividade 2')])
+        _, consultas = self.get_sem_consultas('/cursos/')
+        self.assertEqual(consultas, 0)
+
+    def test_gravacao_em_lote_invalida(self):
+        """Teste para verificar que bulk_create invalida as respostas do modelo"""
+        self.client.get('/alunos/')
+        Aluno.objects.bulk_create([Aluno(nome='Aluno novo', rg='1', cpf='2', data_nascimento='2001-01-01')])
+        response, _ = self.get_sem_consultas('/alunos/')
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_requisicao_get_estatisticas(self):
+        """Teste para verificar os contadores de acertos e falhas"""
+        self.client.get('/cursos/')
+        self.client.get('/cursos/')
+        response = self.client.get('/cache/estatisticas/')
+        self.assertEqual(response.data, {'acertos': 1, 'falhas': 1, 'taxa_acerto': 0.5})
+
+    def test_requisicao_get_com_etag_devolve_304_sem_consultas(self):
+        """Teste para verificar o 304 de um If-None-Match atual, sem consultar o banco"""
+        url = '/alunos/{}/'.format(self.aluno.id)
+        etag = self.client.get(url)['ETag']
+        self.assertIn('no-cache', self.client.get(url)['Cache-Control'])
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(consultas), 0)
+        self.assertEqual(response.content, b'')
+        # Nem o cache de respostas é lido: apenas a primeira leitura (falha) e a segunda (acerto)
+        estatisticas = self.client.get('/cache/estatisticas/').data
+        self.assertEqual(estatisticas['acertos'] + estatisticas['falhas'], 2)
+
+    def test_etag_muda_com_gravacoes_e_parametros(self):
+        """Teste para verificar que o ETag acompanha as gravações dos modelos da resposta e os parâmetros"""
+        etag = self.client.get('/matriculas/')['ETag']
+        self.assertNotEqual(self.client.get('/matriculas/?page_size=1')['ETag'], etag)
+        self.assertNotEqual(self.client.get('/matriculas/', HTTP_ACCEPT='text/html')['ETag'], etag)
+
+        AtividadeAvaliativa.objects.create(matricula=self.matricula, tipo='A', titulo='Atividade 1')
+        self.assertEqual(self.client.get('/matriculas/', HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Matricula.objects.filter(pk=self.matricula.pk).update(periodo='N')
+        response = self.client.get('/matriculas/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['periodo'], 'N')
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_validade_das_respostas_sem_cache_compartilhado(self):
+        """Teste para verificar que, sem cache compartilhado, as respostas ficam apenas CACHE_API_TIMEOUT_LOCAL segundos"""
+        for compartilhado, validade in ((True, 300), (False, 20)):
+            cache.clear()
+            with override_settings(CACHE_COMPARTILHADO=compartilhado, CACHE_API_TIMEOUT=300, CACHE_API_TIMEOUT_LOCAL=20):
+                with mock.patch.object(cache, 'set', wraps=cache.set) as gravar:
+                    self.client.get('/cursos/')
+            timeouts = [chamada.kwargs.get('timeout') for chamada in gravar.call_args_list if chamada.args[0].startswith('escola:resposta:')]
+            self.assertEqual(timeouts, [validade])
+
+@override_settings(CACHE_COMPARTILHADO=False)
+class CacheLocalTestCase(APITestCase):
+    """Sem cache compartilhado, cada worker tem o seu cache; as versões vêm do banco"""
+
+    def setUp(self):
+        cache.clear()
+        self.curso = Curso.objects.create(codigo_curso='CTT1', descricao='Curso teste 1', nivel='B')
+
+    def test_gravacao_em_outro_worker_invalida_respostas_e_etag(self):
+        """Teste para verificar que uma gravação feita por outro worker, com outro cache local, invalida a resposta e o ETag deste"""
+        etag = self.client.get('/cursos/')['ETag']
+        self.assertEqual(self.client.get('/cursos/', HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        with mock.patch('escola.cache.cache', LocMemCache('outro_worker', {})):
+            self.client.patch('/cursos/{}/'.format(self.curso.id), data={'descricao': 'Curso renomeado'})
+
+        response = self.client.get('/cursos/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['descricao'], 'Curso renomeado')
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_requisicao_get_com_etag_consulta_apenas_a_versao(self):
+        """Teste para verificar que o 304 consulta só a versão dos modelos no banco"""
+        etag = self.client.get('/cursos/')['ETag']
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get('/cursos/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(consultas), 1)
+        self.assertIn('escola_versaomodelo', consultas[0]['sql'])
@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from escola.models import Aluno, Curso, Matricula, Avaliacao, AtividadeAvaliativa
+
+@override_settings(CACHE_COMPARTILHADO=True)
+class CamposDinamicosTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.curso = Curso.objects.create(codigo_curso='CTT1', descricao='Curso teste 1', nivel='B')
+        for indice in range(3):
+            aluno = Aluno.objects.create(nome='Aluno {}'.format(indice), rg='123456789', cpf='1234567890{}'.format(indice), data_nascimento='2000-01-01')
+            matricula = Matricula.objects.create(aluno=aluno, curso=self.curso, periodo='M')
+            AtividadeAvaliativa.objects.create(matricula=matricula, tipo='P', titulo='Prova 1', nota=8)
+            Avaliacao.objects.create(matricula=matricula, nota1=8)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, consultas
+
+    def test_requisicao_get_com_fields_carrega_apenas_as_colunas_pedidas(self):
+        """Teste para verificar que ?fields= limita a resposta e as colunas do SELECT"""
+        response, consultas = self.get('/alunos/?fields=id,nome')
+        self.assertEqual(response.data['results'][0], {'id': 1, 'nome': 'Aluno 0'})
+        self.assertNotIn('"cpf"', consultas[0]['sql'])
+
+        response, consultas = self.get('/atividades/?fields=id,tipo_display')
+        self.assertEqual(response.data['results'][0]['tipo_display'], 'Prova')
+        self.assertEqual(len(consultas), 1)
+
+    def test_requisicao_get_com_expand_usa_join(self):
+        """Teste para verificar que ?expand= inclui os objetos relacionados em uma única consulta"""
+        response, consultas = self.get('/matriculas/?expand=aluno,curso&fields=id,aluno.nome,curso.descricao')
+        self.assertEqual(len(consultas), 1)
+        self.assertIn('JOIN', consultas[0]['sql'])
+        self.assertEqual(response.data['results'][0], {'id': 1, 'aluno': {'nome': 'Aluno 0'}, 'curso': {'descricao': 'Curso teste 1'}})
+
+        response, consultas = self.get('/avaliacoes/?expand=matricula.aluno')
+        self.assertEqual(len(consultas), 1)
+        self.assertEqual(response.data['results'][0]['matricula']['aluno']['nome'], 'Aluno 2')
+        self.assertEqual(response.data['results'][0]['matricula']['curso'], self.curso.id)
+
+    def test_requisicao_get_com_campos_invalidos(self):
+        """Teste para verificar o erro 400 para campos ou expansões inexistentes"""
+        response = self.client.get('/alunos/?fields=id,senha')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
+        response = self.client.get('/cursos/?expand=aluno')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('expand', response.data)
+
+    def test_expand_acompanha_gravacoes_dos_modelos_expandidos(self):
+        """Teste para verificar que o cache de uma resposta expandida é invalidado pelo modelo relacionado"""
+        url = '/matriculas/?expand=aluno&fields=id,aluno.nome'
+        self.get(url)
+        Aluno.objects.filter(nome='Aluno 0').update(nome='Aluno renomeado')
+        response, _ = self.get(url)
+        self.assertEqual(response.data['results'][0]['aluno']['nome'], 'Aluno renomeado')
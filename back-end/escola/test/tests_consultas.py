@@ -0,0 +1,66 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from escola.models import Aluno, Curso, Matricula, Avaliacao, AtividadeAvaliativa
+
+class QuantidadeDeConsultasTestCase(APITestCase):
+    """Verifica que as listagens fazem um número constante de consultas, independente da quantidade de linhas"""
+
+    def setUp(self):
+        cache.clear()
+        self.curso = Curso.objects.create(codigo_curso='CTT1', descricao='Curso teste 1', nivel='B')
+        self.aluno = Aluno.objects.create(nome='Aluno fixo', rg='123456789', cpf='12345678901', data_nascimento='2000-01-01')
+        self.admin = User.objects.create_superuser('admin', 'admin@escola.com', 'senha-admin')
+        self.total = 0
+
+    def popular(self, quantidade):
+        """Cria linhas até o total informado em todas as tabelas da escola"""
+        for indice in range(self.total, quantidade):
+            aluno = Aluno.objects.create(
+                nome='Aluno {}'.format(indice), rg='123456789', cpf='12345678901', data_nascimento='2000-01-01'
+            )
+            curso = Curso.objects.create(codigo_curso='C{}'.format(indice), descricao='Curso {}'.format(indice), nivel='B')
+            Matricula.objects.create(aluno=self.aluno, curso=curso, periodo='M')
+            matricula = Matricula.objects.create(aluno=aluno, curso=self.curso, periodo='N')
+            Avaliacao.objects.create(matricula=matricula, nota1=7, nota2=8, nota3=9)
+            AtividadeAvaliativa.objects.create(matricula=matricula, tipo='P', titulo='Prova 1', nota=7)
+        self.total = quantidade
+
+    def contar_consultas(self, url, admin=False):
+        if admin:
+            self.client.force_login(self.admin)
+        cache.clear()
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(consultas)
+
+    def verificar_constante(self, url, admin=False):
+        self.popular(3)
+        consultas_poucas_linhas = self.contar_consultas(url, admin)
+        self.popular(15)
+        consultas_muitas_linhas = self.contar_consultas(url, admin)
+        self.assertEqual(consultas_poucas_linhas, consultas_muitas_linhas, url)
+
+    def test_listagens_da_api(self):
+        """Teste para verificar as listagens da API"""
+        for url in ['/alunos/', '/alunos/?version=v2', '/cursos/', '/matriculas/', '/avaliacoes/', '/atividades/']:
+            with self.subTest(url=url):
+                self.verificar_constante(url)
+
+    def test_listagem_das_matriculas_de_um_aluno(self):
+        """Teste para verificar a listagem alunos/<pk>/matriculas/"""
+        self.verificar_constante('/alunos/{}/matriculas/'.format(self.aluno.id))
+
+    def test_listagem_dos_alunos_de_um_curso(self):
+        """Teste para verificar a listagem cursos/<pk>/matriculas/"""
+        self.verificar_constante('/cursos/{}/matriculas/'.format(self.curso.id))
+
+    def test_listagens_do_admin(self):
+        """Teste para verificar as listagens do admin"""
+        for modelo in ['aluno', 'curso', 'matricula', 'avaliacao', 'atividadeavaliativa']:
+            with self.subTest(modelo=modelo):
+                self.verificar_constante('/controle-geral/escola/{}/'.format(modelo), admin=True)
@@ -0,0 +1,68 @@
+from datetime import date
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+from validate_docbr import CPF
+from escola import busca, dados_sinteticos, painel
+from escola.models import Aluno, Curso, Matricula, AtividadeAvaliativa, Avaliacao
+from escola.notas import ATIVIDADES_PADRAO, atividades_faltantes, recalcular_avaliacoes
+
+class DadosSinteticosTestCase(APITestCase):
+
+    def gerar(self, **opcoes):
+        opcoes = dict({'alunos': 30, 'areas': 2, 'semente': 5, 'data_base': date(2026, 1, 10), 'stdout': StringIO()}, **opcoes)
+        call_command('gerar_dados', **opcoes)
+
+    def retrato(self):
+        aluno, curso = 'matricula__aluno__cpf', 'matricula__curso__codigo_curso'
+        return (
+            list(Curso.objects.order_by('codigo_curso').values_list('codigo_curso', 'descricao', 'nivel')),
+            list(Aluno.objects.order_by('cpf').values_list('nome', 'rg', 'cpf', 'data_nascimento', 'celular')),
+            list(Matricula.objects.order_by('aluno__cpf', 'curso__codigo_curso').values_list('aluno__cpf', 'curso__codigo_curso', 'periodo')),
+            list(AtividadeAvaliativa.objects.order_by(aluno, curso, 'titulo').values_list(aluno, curso, 'titulo', 'nota', 'data_entrega', 'entregue')),
+            list(Avaliacao.objects.order_by(aluno, curso).values_list(aluno, curso, 'nota1', 'nota2', 'nota3', 'media', 'situacao')),
+        )
+
+    def test_comando_gerar_dados_cria_uma_base_consistente(self):
+        """Teste para verificar cursos, alunos, atividades padrão, avaliações, painel e busca da base gerada"""
+        self.gerar()
+        self.assertEqual(Curso.objects.count(), 6)
+        self.assertEqual(Aluno.objects.count(), 30)
+        cpfs = list(Aluno.objects.values_list('cpf', flat=True))
+        self.assertEqual(len(set(cpfs)), 30)
+        self.assertTrue(all(CPF().validate(cpf) for cpf in cpfs))
+        for aluno in Aluno.objects.all():
+            self.assertIn(aluno.matricula_set.count(), (1, 2, 3))
+
+        matriculas = list(Matricula.objects.values_list('pk', flat=True))
+        self.assertEqual(AtividadeAvaliativa.objects.count(), len(matriculas) * len(ATIVIDADES_PADRAO))
+        self.assertEqual(atividades_faltantes(matriculas), [])
+        # As avaliações gravadas são as que o recálculo a partir das atividades produziria
+        retrato = self.retrato()
+        recalcular_avaliacoes(matriculas)
+        self.assertEqual(self.retrato(), retrato)
+        self.assertEqual(Avaliacao.objects.count(), len(matriculas))
+
+        self.assertEqual(painel.valores(), painel.reconciliar())
+        aluno = Aluno.objects.first()
+        self.assertIn(aluno, busca.filtrar(Aluno.objects.all(), aluno.cpf))
+
+    def test_mesma_semente_gera_os_mesmos_dados(self):
+        """Teste para verificar que a base depende da semente e não da quantidade de processos"""
+        with mock.patch.object(dados_sinteticos, 'ALUNOS_POR_BLOCO', 8):
+            self.gerar()
+            retrato = self.retrato()
+            self.gerar(limpar=True, processos=2)
+            self.assertEqual(self.retrato(), retrato)
+            self.gerar(limpar=True, semente=6)
+            self.assertNotEqual(self.retrato()[1], retrato[1])
+
+    def test_comando_gerar_dados_continua_a_numeracao(self):
+        """Teste para verificar que uma segunda execução reaproveita os cursos e não repete CPFs, mesmo após exclusões"""
+        self.gerar(alunos=10)
+        Aluno.objects.filter(pk__in=Aluno.objects.order_by('pk').values('pk')[:2]).delete()
+        self.gerar(alunos=10)
+        self.assertEqual(Curso.objects.count(), 6)
+        self.assertEqual(Aluno.objects.count(), 18)
+        self.assertEqual(len(set(Aluno.objects.values_list('cpf', flat=True))), 18)
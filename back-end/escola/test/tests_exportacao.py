@@ -0,0 +1,50 @@
+import json
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from escola.models import Aluno, Curso, Matricula, Avaliacao, AtividadeAvaliativa
+
+class ExportacaoTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        curso = Curso.objects.create(codigo_curso='CTT1', descricao='Curso teste 1', nivel='B')
+        for indice in range(3):
+            aluno = Aluno.objects.create(
+                nome='Aluno {}'.format(indice), rg='123456789', cpf='12345678901', data_nascimento='2000-01-01'
+            )
+            matricula = Matricula.objects.create(aluno=aluno, curso=curso, periodo='M')
+            Avaliacao.objects.create(matricula=matricula, nota1=9, nota2=8, nota3=7)
+            AtividadeAvaliativa.objects.create(matricula=matricula, tipo='P', titulo='Prova 1', nota=9)
+
+    def baixar(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            conteudo = b''.join(response.streaming_content).decode()
+        return conteudo, len(consultas)
+
+    def test_requisicao_get_exporta_csv_com_nomes_relacionados(self):
+        """Teste para verificar a exportação CSV de avaliações com nomes vindos do JOIN"""
+        conteudo, consultas = self.baixar('/exportar/avaliacoes/')
+        linhas = conteudo.splitlines()
+        self.assertEqual(linhas[0], 'id,matricula,aluno_nome,curso_descricao,nota1,nota2,nota3,media,situacao,data_criacao')
+        self.assertEqual(len(linhas), 4)
+        self.assertIn(',Aluno 0,Curso teste 1,9.0,8.0,7.0,8.2,Aprovado,', linhas[1])
+        self.assertEqual(consultas, 1)
+
+    def test_requisicao_get_exporta_ndjson(self):
+        """Teste para verificar a exportação NDJSON de atividades"""
+        conteudo, consultas = self.baixar('/exportar/atividades/?formato=ndjson')
+        registros = [json.loads(linha) for linha in conteudo.splitlines()]
+        self.assertEqual(len(registros), 3)
+        self.assertEqual(registros[0]['aluno_nome'], 'Aluno 0')
+        self.assertEqual(registros[0]['curso_descricao'], 'Curso teste 1')
+        self.assertEqual(consultas, 1)
+
+    def test_requisicao_get_recurso_inexistente(self):
+        """Teste para verificar recurso ou formato inválidos"""
+        self.assertEqual(self.client.get('/exportar/professores/').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get('/exportar/alunos/?formato=xls').status_code, status.HTTP_404_NOT_FOUND)
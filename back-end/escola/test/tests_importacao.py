@@ -0,0 +1,53 @@
+import json
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework import status
+from rest_framework.test import APITestCase
+from validate_docbr import CPF
+from escola.models import Aluno
+
+class ImportacaoAlunosTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        cpf = CPF()
+        self.cpf_cadastrado, self.cpf_novo, self.cpf_outro = cpf.generate(), cpf.generate(), cpf.generate()
+        Aluno.objects.create(nome='Aluno antigo', rg='123456789', cpf=self.cpf_cadastrado, data_nascimento='2000-01-01')
+
+    def enviar(self, nome, conteudo):
+        arquivo = SimpleUploadedFile(nome, conteudo.encode())
+        return self.client.post('/importar/alunos/', data={'arquivo': arquivo}, format='multipart')
+
+    def test_requisicao_post_importa_csv(self):
+        """Teste para verificar a importação CSV com aceitos e rejeitados"""
+        conteudo = '\n'.join([
+            'nome,rg,cpf,data_nascimento,celular',
+            'José Álvares,123456789,{},2001-02-03,11999998888'.format(CPF().mask(self.cpf_novo)),
+            'Aluno repetido,123456789,{},2001-02-03,'.format(self.cpf_novo),
+            'Aluno cadastrado,123456789,{},2001-02-03,'.format(self.cpf_cadastrado),
+            'Aluno cpf inválido,123456789,12345678900,2001-02-03,',
+            'Aluno sem data,123456789,{},,'.format(self.cpf_outro),
+        ])
+        response = self.enviar('alunos.csv', conteudo)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['aceitos'], 1)
+        self.assertEqual(response.data['rejeitados'], 4)
+        self.assertEqual([erro['linha'] for erro in response.data['erros']], [2, 3, 4, 5])
+        self.assertTrue(Aluno.objects.filter(cpf=self.cpf_novo, nome='José Álvares').exists())
+
+    def test_requisicao_post_importa_ndjson(self):
+        """Teste para verificar a importação NDJSON"""
+        registros = [
+            {'nome': 'Aluno 1', 'rg': '1', 'cpf': self.cpf_novo, 'data_nascimento': '2001-01-01'},
+            {'nome': 'Aluno 2', 'rg': '2', 'cpf': self.cpf_outro, 'data_nascimento': '2002-02-02'},
+        ]
+        conteudo = '\n'.join(json.dumps(registro) for registro in registros) + '\nnão é json\n'
+        response = self.enviar('alunos.ndjson', conteudo)
+        self.assertEqual(response.data['aceitos'], 2)
+        self.assertEqual(response.data['rejeitados'], 1)
+        self.assertEqual(Aluno.objects.count(), 3)
+
+    def test_requisicao_post_sem_arquivo_ou_formato_invalido(self):
+        """Teste para verificar os erros de envio"""
+        self.assertEqual(self.client.post('/importar/alunos/').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.enviar('alunos.xls', 'x').status_code, status.HTTP_400_BAD_REQUEST)
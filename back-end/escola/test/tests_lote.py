@@ -0,0 +1,104 @@
+import time
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from escola.models import Aluno, Curso, Matricula, AtividadeAvaliativa
+
+@override_settings(CACHE_COMPARTILHADO=True)
+class GravacaoEmLoteTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.curso = Curso.objects.create(codigo_curso='CTT1', descricao='Curso teste 1', nivel='B')
+        self.aluno = Aluno.objects.create(nome='Aluno teste', rg='123456789', cpf='12345678901', data_nascimento='2000-01-01')
+        self.matricula = Matricula.objects.create(aluno=self.aluno, curso=self.curso, periodo='M')
+
+    def test_requisicao_post_cria_matriculas_em_lote(self):
+        """Teste para verificar a criação de matrículas em lote"""
+        cursos = [
+            Curso.objects.create(codigo_curso='CTT{}'.format(indice), descricao='Curso teste {}'.format(indice), nivel='B')
+            for indice in range(2, 5)
+        ]
+        data = [{'aluno': self.aluno.id, 'curso': curso.id, 'periodo': periodo} for curso, periodo in zip(cursos, 'MVN')]
+        response = self.client.post('/matriculas/lote/', data=data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(Matricula.objects.count(), 4)
+
+    def test_requisicao_post_com_matriculas_repetidas(self):
+        """Teste para verificar que o lote rejeita matrículas repetidas no banco ou no próprio lote"""
+        outro_curso = Curso.objects.create(codigo_curso='CTT2', descricao='Curso teste 2', nivel='B')
+        data = [
+            {'aluno': self.aluno.id, 'curso': outro_curso.id, 'periodo': 'M'},
+            {'aluno': self.aluno.id, 'curso': self.curso.id, 'periodo': 'V'},
+            {'aluno': self.aluno.id, 'curso': outro_curso.id, 'periodo': 'N'},
+        ]
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.post('/matriculas/lote/', data=data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([erro['indice'] for erro in response.data['erros']], [1, 2])
+        self.assertIn('non_field_errors', response.data['erros'][0]['erros'])
+        self.assertEqual(Matricula.objects.count(), 1)
+        self.assertLess(len(consultas), 5)
+
+    def test_requisicao_patch_com_curso_ja_matriculado(self):
+        """Teste para verificar a unicidade no PATCH em lote sem recusar a própria matrícula"""
+        outro_curso = Curso.objects.create(codigo_curso='CTT2', descricao='Curso teste 2', nivel='B')
+        outra = Matricula.objects.create(aluno=self.aluno, curso=outro_curso, periodo='N')
+        data = [{'id': self.matricula.id, 'curso': self.curso.id, 'periodo': 'V'}, {'id': outra.id, 'curso': self.curso.id}]
+        response = self.client.patch('/matriculas/lote/', data=data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([erro['indice'] for erro in response.data['erros']], [1])
+
+        response = self.client.patch('/matriculas/lote/', data=data[:1], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Matricula.objects.get(pk=self.matricula.id).periodo, 'V')
+
+    def test_requisicao_post_com_erros_nao_grava_nada(self):
+        """Teste para verificar que um item inválido impede a gravação e o erro indica o índice"""
+        data = [
+            {'matricula': self.matricula.id, 'titulo': 'Atividade 1', 'nota': '8.50'},
+            {'matricula': 999, 'titulo': 'Atividade 2'},
+            {'matricula': self.matricula.id, 'tipo': 'X', 'titulo': 'Atividade 3'},
+        ]
+        response = self.client.post('/atividades/lote/', data=data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([erro['indice'] for erro in response.data['erros']], [1, 2])
+        self.assertIn('matricula', response.data['erros'][0]['erros'])
+        self.assertIn('tipo', response.data['erros'][1]['erros'])
+        self.assertFalse(AtividadeAvaliativa.objects.exists())
+
+    def test_requisicao_patch_atualiza_notas_em_lote(self):
+        """Teste para verificar a atualização parcial em lote"""
+        atividades = AtividadeAvaliativa.objects.bulk_create([
+            AtividadeAvaliativa(matricula=self.matricula, tipo='A', titulo='Atividade {}'.format(indice))
+            for indice in range(3)
+        ])
+        data = [{'id': atividade.id, 'nota': '9.00', 'entregue': True} for atividade in atividades]
+        data.append({'id': 999, 'nota': '1.00'})
+        response = self.client.patch('/atividades/lote/', data=data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['erros'][0]['indice'], 3)
+
+        response = self.client.patch('/atividades/lote/', data=data[:3], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AtividadeAvaliativa.objects.filter(nota=9, entregue=True).count(), 3)
+
+    def test_requisicao_post_com_mil_itens(self):
+        """Teste para verificar que um lote de 1000 atividades usa poucas consultas e menos de um segundo"""
+        data = [
+            {'matricula': self.matricula.id, 'tipo': 'A', 'titulo': 'Atividade {}'.format(indice), 'nota': '7.50'}
+            for indice in range(1000)
+        ]
+        inicio = time.perf_counter()
+        with CaptureQueriesContext(connection) as consultas, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/atividades/lote/', data=data, format='json')
+        duracao = time.perf_counter() - inicio
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(AtividadeAvaliativa.objects.count(), 1000)
+        self.assertLess(len(consultas), 25)
+        self.assertLess(duracao, 1)
+        self.assertEqual(float(self.matricula.avaliacao_set.get().nota3), 7.5)
@@ -0,0 +1,100 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework.throttling import AnonRateThrottle
+from escola import metricas
+from escola.models import Aluno
+
+def amostras(texto):
+    """Linhas do formato texto do Prometheus como {'nome{rotulos}': valor}"""
+    resultado = {}
+    for linha in texto.splitlines():
+        if linha and not linha.startswith('#'):
+            serie, valor = linha.rsplit(' ', 1)
+            resultado[serie] = float(valor)
+    return resultado
+
+class MetricasTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.diretorio, ignore_errors=True)
+        configuracao = override_settings(METRICAS_DIRETORIO=self.diretorio, METRICAS_FAIXAS=(0.1, 1.0, 10.0))
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        # Cada teste começa com os valores do processo zerados
+        metricas._registro = None
+        self.aluno = Aluno.objects.create(nome='Aluno teste', rg='123456789', cpf='12345678901', data_nascimento='2000-01-01')
+
+    def test_requisicoes_por_rota_metodo_e_status(self):
+        """Teste para verificar contagens, histograma de duração e consultas agrupados pela rota, e não pelo caminho"""
+        self.client.get('/alunos/')
+        self.client.get('/alunos/{}/'.format(self.aluno.pk))
+        self.client.get('/alunos/{}/'.format(self.aluno.pk))
+        self.client.get('/alunos/999999/')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], metricas.CONTENT_TYPE)
+        valores = amostras(response.content.decode())
+
+        detalhe = 'metodo="GET",rota="alunos/<pk>/",status="200"'
+        self.assertEqual(valores['escola_requisicoes_total{%s}' % detalhe], 2)
+        self.assertEqual(valores['escola_requisicoes_total{metodo="GET",rota="alunos/<pk>/",status="404"}'], 1)
+        self.assertEqual(valores['escola_requisicoes_total{metodo="GET",rota="alunos/",status="200"}'], 1)
+        self.assertEqual(valores['escola_requisicao_duracao_segundos_count{%s}' % detalhe], 2)
+        self.assertEqual(valores['escola_requisicao_duracao_segundos_bucket{%s,le="+Inf"}' % detalhe], 2)
+        self.assertLessEqual(valores['escola_requisicao_duracao_segundos_bucket{%s,le="0.1"}' % detalhe], 2)
+        self.assertGreater(valores['escola_requisicao_duracao_segundos_sum{%s}' % detalhe], 0)
+        self.assertGreater(valores['escola_consultas_sql_total{metodo="GET",rota="alunos/<pk>/"}'], 0)
+        self.assertEqual(valores['escola_metricas_processos'], 1)
+
+    def test_acessos_ao_cache_e_taxa_de_acerto(self):
+        """Teste para verificar os acertos e falhas do cache de respostas e a taxa de acerto"""
+        for _ in range(4):
+            self.client.get('/cursos/')
+        valores = amostras(self.client.get('/metrics').content.decode())
+        self.assertEqual(valores['escola_cache_acessos_total{resultado="falha"}'], 1)
+        self.assertEqual(valores['escola_cache_acessos_total{resultado="acerto"}'], 3)
+        self.assertEqual(valores['escola_cache_taxa_acerto'], 0.75)
+
+    def test_rejeicoes_do_throttling(self):
+        """Teste para verificar a contagem das requisições recusadas pelo throttling"""
+        with mock.patch.object(AnonRateThrottle, 'THROTTLE_RATES', {'anon': '1/day'}):
+            self.client.get('/dashboard/')
+            self.assertEqual(self.client.get('/dashboard/').status_code, 429)
+        valores = amostras(self.client.get('/metrics').content.decode())
+        self.assertEqual(valores['escola_throttle_rejeicoes_total{rota="dashboard/"}'], 1)
+
+    def test_soma_os_arquivos_de_todos_os_processos(self):
+        """Teste para verificar que /metrics soma os valores gravados pelos outros workers"""
+        self.client.get('/alunos/')
+        outro = {
+            'faixas': [0.1, 1.0, 10.0],
+            'contadores': [['escola_requisicoes_total', [['metodo', 'GET'], ['rota', 'alunos/'], ['status', '200']], 5]],
+            'histogramas': [['escola_requisicao_duracao_segundos', [['metodo', 'GET'], ['rota', 'alunos/'], ['status', '200']], [3, 1, 1, 0, 2.5]]],
+        }
+        with open(os.path.join(self.diretorio, 'metricas_1_outro.json'), 'w') as arquivo:
+            json.dump(outro, arquivo)
+        valores = amostras(self.client.get('/metrics').content.decode())
+        serie = 'metodo="GET",rota="alunos/",status="200"'
+        self.assertEqual(valores['escola_requisicoes_total{%s}' % serie], 6)
+        self.assertEqual(valores['escola_requisicao_duracao_segundos_count{%s}' % serie], 6)
+        # A requisição deste processo cai em uma das faixas até 10 s; as do outro, em 0.1, 1.0 e 10.0
+        self.assertGreaterEqual(valores['escola_requisicao_duracao_segundos_bucket{%s,le="1.0"}' % serie], 4)
+        self.assertEqual(valores['escola_requisicao_duracao_segundos_bucket{%s,le="10.0"}' % serie], 6)
+        self.assertEqual(valores['escola_requisicao_duracao_segundos_bucket{%s,le="+Inf"}' % serie], 6)
+        self.assertEqual(valores['escola_metricas_processos'], 2)
+
+    def test_desativadas_sem_diretorio(self):
+        """Teste para verificar que, sem METRICAS_DIRETORIO, o middleware não é carregado e /metrics responde 404"""
+        with override_settings(METRICAS_DIRETORIO=None):
+            with self.assertRaises(MiddlewareNotUsed):
+                metricas.MetricasMiddleware(lambda request: None)
+            self.assertEqual(self.client.get('/metrics').status_code, 404)
@@ -0,0 +1,94 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+from escola import miniaturas
+from escola.models import Aluno
+
+MEDIA_TESTE = tempfile.mkdtemp()
+
+def imagem_png(largura=800, altura=600):
+    conteudo = BytesIO()
+    Image.new('RGB', (largura, altura), (200, 30, 30)).save(conteudo, format='PNG')
+    return SimpleUploadedFile('foto.png', conteudo.getvalue(), content_type='image/png')
+
+@override_settings(MEDIA_ROOT=MEDIA_TESTE, MINIATURAS_EM_SEGUNDO_PLANO=False, SERVIR_MIDIA=True)
+class MiniaturasTestCase(APITestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_TESTE, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+
+    def enviar_foto(self):
+        data = {'nome': 'Aluno com foto', 'rg': '123456789', 'cpf': '12345678901', 'data_nascimento': '2000-01-01', 'foto': imagem_png()}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/alunos/', data=data, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response
+
+    def test_upload_gera_miniaturas_de_tamanho_fixo(self):
+        """Teste para verificar que o upload gera as variantes e o serializer expõe as URLs"""
+        response = self.enviar_foto()
+        aluno = Aluno.objects.get(pk=response.data['id'])
+        for variante, tamanho in miniaturas.VARIANTES.items():
+            for formato in miniaturas.FORMATOS:
+                with aluno.foto.storage.open(miniaturas.caminho(aluno.foto.name, variante, formato)) as arquivo:
+                    imagem = Image.open(arquivo)
+                    self.assertEqual(imagem.size, tamanho)
+                    self.assertEqual(imagem.format, formato.upper())
+                self.assertTrue(response.data['foto_miniaturas'][variante][formato].endswith(
+                    miniaturas.caminho(aluno.foto.name, variante, formato)
+                ))
+
+    def test_requisicao_get_midia_com_etag_e_cache(self):
+        """Teste para verificar ETag, Cache-Control e o 304 das miniaturas"""
+        response = self.enviar_foto()
+        url = response.data['foto_miniaturas']['pequena']['webp']
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertFalse(response['ETag'].startswith('W/'))
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_miniatura_ainda_nao_gerada_redireciona_para_a_original(self):
+        """Teste para verificar o redirecionamento, sem gerar a miniatura, enquanto ela não existe"""
+        aluno = Aluno.objects.get(pk=self.enviar_foto().data['id'])
+        caminho = miniaturas.caminho(aluno.foto.name, 'media', 'jpeg')
+        aluno.foto.storage.delete(caminho)
+        with mock.patch.object(miniaturas, 'agendar') as agendar:
+            for _ in range(3):
+                response = self.client.get('/media/' + caminho)
+        agendar.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(response['Location'], '/media/' + aluno.foto.name)
+        self.assertIn('no-store', response['Cache-Control'])
+        self.assertEqual(self.client.get('/media/nao-existe.png').status_code, status.HTTP_404_NOT_FOUND)
+
+        saida = StringIO()
+        call_command('gerar_miniaturas', stdout=saida)
+        self.assertIn('geradas para 1 fotos', saida.getvalue())
+        self.assertTrue(aluno.foto.storage.exists(caminho))
+        # As existentes, servidas como imutáveis, não são regravadas
+        self.assertEqual(miniaturas.gerar(aluno.foto.name, storage=aluno.foto.storage), [])
+
+    def test_midia_nao_servida_pelo_django_em_producao(self):
+        """Teste para verificar que, sem SERVIR_MIDIA, a rota de mídia responde 404"""
+        url = self.enviar_foto().data['foto_miniaturas']['pequena']['webp']
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        with override_settings(SERVIR_MIDIA=False):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
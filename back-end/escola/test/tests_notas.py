@@ -0,0 +1,130 @@
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APITestCase
+from escola.models import Aluno, Curso, Matricula, Avaliacao, AtividadeAvaliativa
+from escola.notas import recalcular_avaliacoes
+from escola.receivers import atividades_alteradas_em_lote
+
+class SyncGradesTestCase(TestCase):
+
+    def setUp(self):
+        self.curso = Curso.objects.create(codigo_curso='CTT1', descricao='Curso teste 1', nivel='B')
+        self.outro_curso = Curso.objects.create(codigo_curso='CTT2', descricao='Curso teste 2', nivel='A')
+        aluno = Aluno.objects.create(nome='Aluno teste', rg='123456789', cpf='12345678901', data_nascimento='2000-01-01')
+        self.matricula = Matricula.objects.create(aluno=aluno, curso=self.curso, periodo='M')
+        self.outra_matricula = Matricula.objects.create(aluno=aluno, curso=self.outro_curso, periodo='N')
+        AtividadeAvaliativa.objects.create(matricula=self.matricula, tipo='P', titulo='Prova 1', nota=8)
+        AtividadeAvaliativa.objects.create(matricula=self.matricula, tipo='A', titulo='Atividade 1', nota=6)
+        AtividadeAvaliativa.objects.create(matricula=self.matricula, tipo='A', titulo='Atividade 2', nota=9)
+
+    def executar(self, *args):
+        saida = StringIO()
+        call_command('sync_grades', *args, stdout=saida)
+        return saida.getvalue()
+
+    def test_cria_atividades_faltantes_e_avaliacao(self):
+        """Teste para verificar a criação das atividades padrão e o cálculo da avaliação"""
+        saida = self.executar('--batch-size', '1')
+        self.assertEqual(self.matricula.atividades.count(), 7)
+        self.assertEqual(self.outra_matricula.atividades.count(), 7)
+        avaliacao = Avaliacao.objects.get(matricula=self.matricula)
+        self.assertEqual((float(avaliacao.nota1), float(avaliacao.nota2), float(avaliacao.nota3)), (8.0, 0.0, 7.5))
+        self.assertIn('[+] Criada Prova 2 para matrícula {}'.format(self.matricula.id), saida)
+        self.assertIn('[✓] Matrícula {}: n1=8.0 n2=0.0 n3=7.5 média=4.7 situação=Prova Final'.format(self.matricula.id), saida)
+        self.assertIn('Concluído. Matrículas processadas: 2', saida)
+
+    def test_execucao_repetida_nao_duplica(self):
+        """Teste para verificar que uma segunda execução apenas atualiza as avaliações"""
+        self.executar()
+        saida = self.executar()
+        self.assertNotIn('[+]', saida)
+        self.assertEqual(AtividadeAvaliativa.objects.count(), 14)
+        self.assertEqual(Avaliacao.objects.count(), 2)
+
+    def test_filtro_por_curso(self):
+        """Teste para verificar a opção --curso"""
+        self.executar('--curso', str(self.outro_curso.id))
+        self.assertEqual(self.matricula.atividades.count(), 3)
+        self.assertEqual(self.outra_matricula.atividades.count(), 7)
+
+    def test_dry_run_nao_grava(self):
+        """Teste para verificar que --dry-run não altera o banco"""
+        saida = self.executar('--dry-run')
+        self.assertEqual(AtividadeAvaliativa.objects.count(), 3)
+        self.assertFalse(Avaliacao.objects.exists())
+        self.assertIn('situação=Prova Final', saida)
+
+class RecalculoIncrementalTestCase(APITestCase):
+
+    def setUp(self):
+        curso = Curso.objects.create(codigo_curso='CTT1', descricao='Curso teste 1', nivel='B')
+        aluno = Aluno.objects.create(nome='Aluno teste', rg='123456789', cpf='12345678901', data_nascimento='2000-01-01')
+        outro_curso = Curso.objects.create(codigo_curso='CTT2', descricao='Curso teste 2', nivel='B')
+        self.matricula = Matricula.objects.create(aluno=aluno, curso=curso, periodo='M')
+        self.outra_matricula = Matricula.objects.create(aluno=aluno, curso=outro_curso, periodo='N')
+
+    def test_requisicao_post_recalcula_apenas_a_matricula_alterada(self):
+        """Teste para verificar que criar uma atividade pela API recalcula só a sua matrícula"""
+        data = {'matricula': self.matricula.id, 'tipo': 'P', 'titulo': 'Prova 1', 'nota': '9.00'}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/atividades/', data=data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        avaliacao = Avaliacao.objects.get(matricula=self.matricula)
+        self.assertEqual(float(avaliacao.nota1), 9.0)
+        self.assertFalse(Avaliacao.objects.filter(matricula=self.outra_matricula).exists())
+
+    def test_alteracoes_na_mesma_transacao_sao_recalculadas_uma_vez(self):
+        """Teste para verificar que as marcações de uma transação são agrupadas em um único recálculo"""
+        with mock.patch('escola.notas.recalcular_avaliacoes', wraps=recalcular_avaliacoes) as recalculo, \
+                self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                prova = AtividadeAvaliativa.objects.create(matricula=self.matricula, tipo='P', titulo='Prova 1', nota=5)
+                prova.nota = 7
+                prova.save()
+                AtividadeAvaliativa.objects.bulk_create([
+                    AtividadeAvaliativa(matricula=self.outra_matricula, tipo='A', titulo='Atividade 1', nota=8),
+                    AtividadeAvaliativa(matricula=self.outra_matricula, tipo='A', titulo='Atividade 2', nota=6),
+                ])
+        recalculo.assert_called_once()
+        self.assertEqual(set(recalculo.call_args.args[0]), {self.matricula.id, self.outra_matricula.id})
+        self.assertEqual(recalculo.call_args.kwargs['using'], 'default')
+        self.assertEqual(float(Avaliacao.objects.get(matricula=self.matricula).nota1), 7.0)
+        self.assertEqual(float(Avaliacao.objects.get(matricula=self.outra_matricula).nota3), 7.0)
+
+    def test_update_e_delete_recalculam(self):
+        """Teste para verificar o recálculo após QuerySet.update() e delete()"""
+        with self.captureOnCommitCallbacks(execute=True):
+            AtividadeAvaliativa.objects.create(matricula=self.matricula, tipo='P', titulo='Prova 2', nota=5)
+        with self.captureOnCommitCallbacks(execute=True):
+            AtividadeAvaliativa.objects.filter(matricula=self.matricula).update(nota=10)
+        self.assertEqual(float(Avaliacao.objects.get(matricula=self.matricula).nota2), 10.0)
+        with self.captureOnCommitCallbacks(execute=True):
+            AtividadeAvaliativa.objects.filter(matricula=self.matricula).delete()
+        self.assertEqual(float(Avaliacao.objects.get(matricula=self.matricula).nota2), 0.0)
+
+    def test_transacao_desfeita_nao_recalcula(self):
+        """Teste para verificar que marcações de uma transação desfeita são descartadas"""
+        with mock.patch('escola.notas.recalcular_avaliacoes', wraps=recalcular_avaliacoes) as recalculo:
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        AtividadeAvaliativa.objects.create(matricula=self.matricula, tipo='P', titulo='Prova 1', nota=5)
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+            recalculo.assert_not_called()
+            with self.captureOnCommitCallbacks(execute=True):
+                AtividadeAvaliativa.objects.create(matricula=self.outra_matricula, tipo='P', titulo='Prova 1', nota=5)
+            recalculo.assert_called_once()
+        self.assertFalse(Avaliacao.objects.filter(matricula=self.matricula).exists())
+
+    def test_lote_gravado_em_outro_banco_e_recalculado_nele(self):
+        """Teste para verificar que o recálculo de um lote é agendado no banco em que ele foi gravado"""
+        atividade = AtividadeAvaliativa(matricula=self.matricula, tipo='P', titulo='Prova 1', nota=5)
+        with mock.patch('escola.receivers.marcar_para_recalculo') as marcar:
+            atividades_alteradas_em_lote(AtividadeAvaliativa, objs=[atividade], pks=None, campos=None, using='replica')
+        marcar.assert_called_once_with({self.matricula.id}, using='replica')
@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from escola.models import Aluno, Curso, Matricula, AtividadeAvaliativa
+
+class PaginacaoCursorTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        curso = Curso.objects.create(codigo_curso='CTT1', descricao='Curso teste 1', nivel='B')
+        aluno = Aluno.objects.create(nome='Aluno teste', rg='123456789', cpf='12345678901', data_nascimento='2000-01-01')
+        matricula = Matricula.objects.create(aluno=aluno, curso=curso, periodo='M')
+        AtividadeAvaliativa.objects.bulk_create([
+            AtividadeAvaliativa(matricula=matricula, tipo='A', titulo='Atividade {}'.format(indice))
+            for indice in range(25)
+        ])
+
+    def percorrer(self, url):
+        ids, consultas_por_pagina = [], []
+        while url:
+            with CaptureQueriesContext(connection) as consultas:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            consultas_por_pagina.append(len(consultas))
+            ids += [item['id'] for item in response.data['results']]
+            url = response.data['next']
+        return ids, consultas_por_pagina
+
+    def test_requisicao_get_percorre_todas_as_paginas(self):
+        """Teste para verificar que os cursores percorrem a lista inteira, sem repetições, em ordem decrescente"""
+        ids, consultas_por_pagina = self.percorrer('/atividades/?page_size=10')
+        esperados = list(AtividadeAvaliativa.objects.order_by('-id').values_list('id', flat=True))
+        self.assertEqual(ids, esperados)
+        self.assertEqual(len(consultas_por_pagina), 3)
+        self.assertEqual(len(set(consultas_por_pagina)), 1)
+
+    def test_requisicao_get_respeita_tamanho_maximo(self):
+        """Teste para verificar o limite de ?page_size="""
+        with self.settings(PAGINACAO_MAX_PAGE_SIZE=5):
+            response = self.client.get('/atividades/?page_size=50')
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_requisicao_get_sem_paginacao(self):
+        """Teste para verificar o formato antigo, sem paginação, com ?paginacao=false"""
+        response = self.client.get('/atividades/?paginacao=false')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 25)
+
+    def test_requisicao_get_listas_aninhadas_sem_paginacao(self):
+        """Teste para verificar que as matrículas de um aluno e os alunos de um curso continuam como lista simples"""
+        matricula = Matricula.objects.get()
+        for url in ['/alunos/{}/matriculas/'.format(matricula.aluno_id), '/cursos/{}/matriculas/'.format(matricula.curso_id)]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIsInstance(response.data, list, url)
+            self.assertEqual(len(response.data), 1, url)
@@ -0,0 +1,85 @@
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from escola.models import Aluno, Curso, Matricula, Avaliacao, AtividadeAvaliativa, ContadorPainel
+from escola.painel import CONTADORES
+
+class PainelTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.curso = Curso.objects.create(codigo_curso='CTT1', descricao='Curso teste 1', nivel='B')
+        self.aluno = Aluno.objects.create(nome='Aluno teste', rg='123456789', cpf='12345678901', data_nascimento='2000-01-01')
+        self.matricula = Matricula.objects.create(aluno=self.aluno, curso=self.curso, periodo='M')
+
+    def assertContadoresCorretos(self):
+        esperados = {chave: contador.recontar('default') for chave, contador in CONTADORES.items()}
+        self.assertEqual(dict(ContadorPainel.objects.values_list('chave', 'valor')), esperados)
+
+    def test_requisicao_get_dashboard_le_apenas_os_contadores(self):
+        """Teste para verificar que o /dashboard/ lê os totais em uma consulta"""
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get('/dashboard/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(consultas), 1)
+        self.assertEqual(response.data['alunos'], 1)
+        self.assertEqual(response.data['cursos'], 1)
+        self.assertEqual(response.data['matriculas'], 1)
+
+    def test_contadores_acompanham_gravacoes_pela_api(self):
+        """Teste para verificar os contadores após criar, alterar e excluir pela API"""
+        response = self.client.post('/atividades/', data={'matricula': self.matricula.id, 'tipo': 'A', 'titulo': 'Atividade 1'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertContadoresCorretos()
+        self.assertEqual(ContadorPainel.objects.get(chave='atividades_pendentes').valor, 1)
+
+        self.client.patch('/atividades/{}/'.format(response.data['id']), data={'entregue': True, 'nota': '9.00'})
+        self.assertEqual(ContadorPainel.objects.get(chave='atividades_pendentes').valor, 0)
+        self.assertContadoresCorretos()
+
+        self.client.delete('/alunos/{}/'.format(self.aluno.id))
+        self.assertContadoresCorretos()
+        self.assertEqual(ContadorPainel.objects.get(chave='matriculas').valor, 0)
+
+    def test_contadores_acompanham_gravacoes_em_lote(self):
+        """Teste para verificar os contadores após bulk_create, bulk_update e QuerySet.update"""
+        data = [{'matricula': self.matricula.id, 'tipo': 'A', 'titulo': 'Atividade {}'.format(indice)} for indice in range(5)]
+        response = self.client.post('/atividades/lote/', data=data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertContadoresCorretos()
+
+        data = [{'id': item['id'], 'entregue': True, 'nota': '2.00'} for item in response.data[:3]]
+        self.client.patch('/atividades/lote/', data=data, format='json')
+        self.assertEqual(ContadorPainel.objects.get(chave='atividades_pendentes').valor, 2)
+        self.assertContadoresCorretos()
+
+        AtividadeAvaliativa.objects.filter(entregue=False).update(entregue=True)
+        self.assertEqual(ContadorPainel.objects.get(chave='atividades_pendentes').valor, 0)
+
+        Avaliacao.objects.create(matricula=self.matricula)
+        self.assertEqual(ContadorPainel.objects.get(chave='matriculas_em_risco').valor, 1)
+        Avaliacao.objects.filter(matricula=self.matricula).update(situacao='Aprovado')
+        self.assertEqual(ContadorPainel.objects.get(chave='matriculas_em_risco').valor, 0)
+        self.assertContadoresCorretos()
+
+    def test_contadores_acompanham_exclusao_em_cascata(self):
+        """Teste para verificar os contadores ao excluir um curso com matrículas, atividades e avaliação"""
+        with self.captureOnCommitCallbacks(execute=True):
+            AtividadeAvaliativa.objects.create(matricula=self.matricula, tipo='P', titulo='Prova 1', nota=3)
+        self.assertEqual(ContadorPainel.objects.get(chave='matriculas_em_risco').valor, 1)
+        self.curso.delete()
+        self.assertContadoresCorretos()
+        self.assertEqual(ContadorPainel.objects.get(chave='matriculas_em_risco').valor, 0)
+
+    def test_comando_reconciliar_painel(self):
+        """Teste para verificar que o comando reconstrói contadores divergentes ou ausentes"""
+        ContadorPainel.objects.filter(chave='alunos').update(valor=42)
+        ContadorPainel.objects.filter(chave='cursos').delete()
+        saida = StringIO()
+        call_command('reconciliar_painel', stdout=saida)
+        self.assertContadoresCorretos()
+        self.assertIn('[!] alunos: 1 (antes 42, diferença -41)', saida.getvalue())
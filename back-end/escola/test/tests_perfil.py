@@ -0,0 +1,72 @@
+import json
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from escola.models import Aluno
+from escola.perfil import PerfilMiddleware
+
+def metricas(response):
+    """Server-Timing como {nome: (duração, descrição)}"""
+    resultado = {}
+    for metrica in response['Server-Timing'].split(', '):
+        nome, *partes = metrica.split(';')
+        partes = dict(parte.split('=', 1) for parte in partes)
+        resultado[nome] = (float(partes['dur']), partes.get('desc', '').strip('"'))
+    return resultado
+
+@override_settings(PERFIL_REQUISICOES=True)
+class PerfilTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        for indice in range(3):
+            Aluno.objects.create(nome='Aluno {}'.format(indice), rg='123456789', cpf='1234567890{}'.format(indice), data_nascimento='2000-01-01')
+
+    def test_cabecalho_server_timing_com_as_etapas(self):
+        """Teste para verificar que a resposta traz sql, auth, serializer, render e total no Server-Timing"""
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get('/alunos/')
+        tempos = metricas(response)
+        self.assertEqual(list(tempos), ['sql', 'auth', 'serializer', 'render', 'total'])
+        self.assertEqual(tempos['sql'][1], '{} consultas'.format(len(consultas.captured_queries)))
+        self.assertGreater(tempos['serializer'][0], 0)
+        self.assertGreater(tempos['render'][0], 0)
+        for nome in ('sql', 'serializer', 'render'):
+            self.assertLessEqual(tempos[nome][0], tempos['total'][0])
+
+    def test_cabecalho_server_timing_no_asgi(self):
+        """Teste para verificar que o middleware também mede as requisições atendidas pelo handler assíncrono"""
+        async def get():
+            return await self.async_client.get('/alunos/')
+        response = async_to_sync(get)()
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(metricas(response)['sql'][1], '0 consultas')
+
+    @override_settings(PERFIL_LIMITE_LENTA_MS=0, PERFIL_TOP_SQL=2)
+    def test_requisicao_lenta_gera_registro_com_as_consultas(self):
+        """Teste para verificar o registro JSON das requisições acima do limite, com as consultas mais demoradas"""
+        with self.assertLogs('escola.perfil', 'WARNING') as registros:
+            self.client.patch('/alunos/{}/'.format(Aluno.objects.first().pk), {'nome': 'Outro nome'})
+        registro = json.loads(registros.records[0].getMessage())
+        self.assertEqual(registro['evento'], 'requisicao_lenta')
+        self.assertEqual((registro['metodo'], registro['rota'], registro['status']), ('PATCH', '^alunos/(?P<pk>[^/.]+)/$', 200))
+        self.assertGreater(registro['sql']['consultas'], 0)
+        self.assertEqual(len(registro['top_sql']), 2)
+        tempos = [consulta['tempo_ms'] for consulta in registro['top_sql']]
+        self.assertEqual(tempos, sorted(tempos, reverse=True))
+
+    def test_requisicao_rapida_nao_gera_registro(self):
+        """Teste para verificar que requisições abaixo do limite não são registradas"""
+        with self.assertNoLogs('escola.perfil', 'WARNING'):
+            self.client.get('/cursos/')
+
+    @override_settings(PERFIL_REQUISICOES=False)
+    def test_desativado_o_middleware_sai_da_cadeia(self):
+        """Teste para verificar que, desativado, o middleware não é carregado e não há Server-Timing"""
+        with self.assertRaises(MiddlewareNotUsed):
+            PerfilMiddleware(lambda request: None)
+        self.assertFalse(self.client.get('/alunos/').has_header('Server-Timing'))
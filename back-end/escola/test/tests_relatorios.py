@@ -0,0 +1,53 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from escola.models import Aluno, Curso, Matricula, Avaliacao
+
+@override_settings(CACHE_COMPARTILHADO=True)
+class RelatorioCursoTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.curso = Curso.objects.create(codigo_curso='CTT1', descricao='Curso teste 1', nivel='B')
+        self.curso_vazio = Curso.objects.create(codigo_curso='CTT2', descricao='Curso teste 2', nivel='A')
+        notas = [(9, 8, 7), (5, 5, 5), (2, 3, 1), None]
+        for indice, (periodo, nota) in enumerate(zip('MMVN', notas)):
+            aluno = Aluno.objects.create(
+                nome='Aluno {}'.format(indice), rg='123456789', cpf='12345678901', data_nascimento='2000-01-01'
+            )
+            matricula = Matricula.objects.create(aluno=aluno, curso=self.curso, periodo=periodo)
+            if nota:
+                Avaliacao.objects.create(matricula=matricula, nota1=nota[0], nota2=nota[1], nota3=nota[2])
+
+    def test_requisicao_get_relatorio_de_um_curso(self):
+        """Teste para verificar as estatísticas de um curso calculadas em uma única consulta"""
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get('/cursos/{}/relatorio/'.format(self.curso.id))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(consultas), 1)
+        self.assertEqual(response.data['matriculas'], {'total': 4, 'por_periodo': {'M': 2, 'V': 1, 'N': 1}})
+        self.assertEqual(response.data['avaliacoes'], 3)
+        self.assertEqual(response.data['medias'], {'nota1': 5.33, 'nota2': 5.33, 'nota3': 4.33, 'media': 5.13})
+        self.assertEqual(response.data['situacoes'], {'Aprovado': 1, 'Prova Final': 1, 'Reprovado': 1})
+        histograma = {faixa['inicio']: faixa['total'] for faixa in response.data['histograma']}
+        self.assertEqual(histograma[2], 1)
+        self.assertEqual(histograma[5], 1)
+        self.assertEqual(histograma[8], 1)
+        self.assertEqual(sum(histograma.values()), 3)
+
+    def test_requisicao_get_relatorio_de_todos_os_cursos(self):
+        """Teste para verificar o relatório de todos os cursos, incluindo curso sem matrículas"""
+        response = self.client.get('/cursos/relatorio/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['curso']['id'] for item in response.data], [self.curso.id, self.curso_vazio.id])
+        vazio = response.data[1]
+        self.assertEqual(vazio['matriculas']['total'], 0)
+        self.assertIsNone(vazio['medias']['media'])
+
+    def test_requisicao_get_relatorio_de_curso_inexistente(self):
+        """Teste para verificar o relatório de um curso que não existe"""
+        response = self.client.get('/cursos/999/relatorio/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,69 @@
+import datetime
+import json
+from decimal import Decimal
+import msgpack
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from escola.models import Aluno, Curso, Matricula, Avaliacao
+from escola.renderers import JSONRapidoRenderer
+
+class RenderersTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.curso = Curso.objects.create(codigo_curso='CTT1', descricao='Curso teste 1', nivel='B')
+        self.aluno = Aluno.objects.create(nome='José Conceição', rg='123456789', cpf='12345678901', data_nascimento='2000-01-01')
+        self.matricula = Matricula.objects.create(aluno=self.aluno, curso=self.curso, periodo='M')
+        Avaliacao.objects.create(matricula=self.matricula, nota1=Decimal('7.25'), nota2=Decimal('8.5'), nota3=10)
+
+    def test_json_rapido_gera_os_mesmos_bytes_do_json_renderer(self):
+        """Teste para verificar a saída idêntica para Decimal, datas, textos e valores aninhados"""
+        data = {
+            'decimal': Decimal('7.10'),
+            'inteiro': 10,
+            'real': 7.8,
+            'data': datetime.date(2000, 1, 1),
+            'data_hora': datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            'hora': datetime.time(8, 0),
+            'texto': 'Conceição \u2028 fim',
+            'traducao': gettext_lazy('Aprovado'),
+            'lista': [None, True, (1, 2), {'a': Decimal('0.5')}],
+            1: 'chave numérica',
+        }
+        self.assertEqual(JSONRapidoRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(JSONRapidoRenderer().render(None), b'')
+
+    def test_json_rapido_recusa_nan_e_infinito_como_o_json_renderer(self):
+        """Teste para verificar que NaN e infinito levantam o mesmo erro do JSONRenderer, em vez de virar null"""
+        for valor in (float('nan'), float('inf'), -float('inf'), Decimal('NaN')):
+            data = {'media': None, 'notas': [7.5, valor]}
+            with self.assertRaises(ValueError) as esperado:
+                JSONRenderer().render(data)
+            with self.assertRaisesMessage(ValueError, str(esperado.exception)):
+                JSONRapidoRenderer().render(data)
+
+    def test_json_rapido_escreve_o_mesmo_valor_de_floats_em_notacao_cientifica(self):
+        """Teste para verificar que floats grandes e pequenos só mudam a grafia do expoente"""
+        data = {'grande': 1.5e16, 'pequeno': 1e-05, 'limite': 1.7976931348623157e308}
+        self.assertEqual(JSONRapidoRenderer().render(data), b'{"grande":1.5e16,"pequeno":0.00001,"limite":1.7976931348623157e308}')
+        self.assertEqual(json.loads(JSONRapidoRenderer().render(data)), json.loads(JSONRenderer().render(data)))
+
+    def test_requisicao_get_com_json_rapido(self):
+        """Teste para verificar que as respostas da API são iguais às do JSONRenderer"""
+        for url in ('/avaliacoes/', '/alunos/', '/cursos/relatorio/'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.content, JSONRenderer().render(response.data))
+        response = self.client.get('/avaliacoes/', HTTP_ACCEPT='application/json; indent=2')
+        self.assertIn(b'\n  "next"', response.content)
+
+    def test_requisicao_get_com_accept_msgpack(self):
+        """Teste para verificar a resposta em MessagePack com os mesmos valores do JSON"""
+        response = self.client.get('/avaliacoes/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        json = self.client.get('/avaliacoes/').json()
+        self.assertEqual(msgpack.unpackb(response.content), json)
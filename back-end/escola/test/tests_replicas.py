@@ -0,0 +1,96 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection, connections
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from escola.models import Aluno
+from escola.replicas import ReplicasMiddleware, RoteadorReplicas, ler_da_replica
+
+class ReplicasTestCase(APITestCase):
+    """A réplica é um segundo arquivo SQLite, com o esquema do banco de testes e
+    um aluno que o principal não tem, o que mostra de qual banco veio cada leitura."""
+
+    def setUp(self):
+        cache.clear()
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio, ignore_errors=True)
+        caminho = os.path.join(diretorio, 'replica.sqlite3')
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name, sql FROM sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'")
+            tabelas = cursor.fetchall()
+        # As tabelas internas da busca (FTS5) são criadas junto com a tabela virtual
+        virtuais = [nome for nome, sql in tabelas if sql.startswith('CREATE VIRTUAL TABLE')]
+        esquema = [sql for nome, sql in tabelas if not any(nome.startswith(virtual + '_') for virtual in virtuais)]
+        replica = sqlite3.connect(caminho)
+        for sql in esquema:
+            replica.execute(sql)
+        replica.execute(
+            "INSERT INTO escola_aluno (nome, rg, cpf, data_nascimento, celular, foto) "
+            "VALUES ('Aluno na réplica', '123456789', '98765432100', '2000-01-01', '', '')"
+        )
+        replica.execute("INSERT INTO escola_contadorpainel (chave, valor) VALUES ('alunos', 42)")
+        replica.commit()
+        replica.close()
+
+        connections.settings['replica_teste'] = dict(connection.settings_dict, NAME=caminho)
+        self.addCleanup(connections.settings.pop, 'replica_teste')
+        self.addCleanup(connections.__delitem__, 'replica_teste')
+        self.addCleanup(lambda: connections['replica_teste'].close())
+        configuracao = override_settings(REPLICAS=['replica_teste'], REPLICAS_JANELA=60)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+        Aluno.objects.create(nome='Aluno no principal', rg='123456789', cpf='12345678901', data_nascimento='2000-01-01')
+
+    def nomes(self, cliente, url='/alunos/'):
+        response = cliente.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [aluno['nome'] for aluno in response.data['results']]
+
+    def test_leituras_da_api_vao_para_a_replica(self):
+        """Teste para verificar que GETs da API, inclusive o painel e o streaming da exportação, leem da réplica"""
+        self.assertEqual(self.nomes(self.client), ['Aluno na réplica'])
+        self.assertEqual(self.client.get('/dashboard/').data['alunos'], 42)
+        exportacao = b''.join(self.client.get('/exportar/alunos/').streaming_content).decode()
+        self.assertIn('Aluno na réplica', exportacao)
+        self.assertNotIn('Aluno no principal', exportacao)
+
+    def test_cliente_le_as_proprias_gravacoes(self):
+        """Teste para verificar que, após uma gravação, o mesmo cliente lê do principal e os demais da réplica"""
+        data = {'nome': 'Aluno novo', 'rg': '123456789', 'cpf': '11122233344', 'data_nascimento': '2000-01-01'}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/alunos/', data=data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(sorted(self.nomes(self.client)), ['Aluno no principal', 'Aluno novo'])
+
+        # /alunos/ já está no cache, lida do principal; outra URL é lida da réplica
+        outro = APIClient(REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(self.nomes(outro, '/alunos/?page_size=10'), ['Aluno na réplica'])
+        # Lida da réplica logo após a gravação: não fica no cache nem recebe ETag
+        response = outro.get('/alunos/?page_size=10')
+        self.assertFalse(response.has_header('ETag'))
+        self.assertTrue(self.client.get('/alunos/').has_header('ETag'))
+
+    def test_gravacao_nao_sai_do_principal(self):
+        """Teste para verificar o roteamento das leituras e gravações e que uma gravação volta as leituras ao principal"""
+        self.assertEqual(Aluno.objects.all().db, 'default')
+        with ler_da_replica() as leitura:
+            self.assertEqual(leitura.alias, 'replica_teste')
+            self.assertEqual(Aluno.objects.get().nome, 'Aluno na réplica')
+            aluno = Aluno.objects.create(nome='Gravado', rg='123456789', cpf='55566677788', data_nascimento='2000-01-01')
+            self.assertEqual(aluno._state.db, 'default')
+            self.assertEqual(Aluno.objects.all().db, 'default')
+        self.assertFalse(RoteadorReplicas().allow_migrate('replica_teste', 'escola'))
+        self.assertIsNone(RoteadorReplicas().allow_migrate('default', 'escola'))
+
+    def test_sem_replicas_o_middleware_sai_da_cadeia(self):
+        """Teste para verificar que, sem réplicas, o middleware não é carregado e as leituras ficam no principal"""
+        with override_settings(REPLICAS=[]):
+            with self.assertRaises(MiddlewareNotUsed):
+                ReplicasMiddleware(lambda request: None)
+            self.assertEqual(self.nomes(self.client), ['Aluno no principal'])
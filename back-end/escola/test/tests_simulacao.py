@@ -0,0 +1,49 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from escola.models import Aluno, Curso, Matricula, Avaliacao
+
+@override_settings(CACHE_COMPARTILHADO=True)
+class SimulacaoNotasTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.curso = Curso.objects.create(codigo_curso='CTT1', descricao='Curso teste 1', nivel='B')
+        aluno = Aluno.objects.create(nome='Aluno teste', rg='123456789', cpf='12345678901', data_nascimento='2000-01-01')
+        notas = [(9, 8, 7), (5, 5, 5), (8, 8, 0)]
+        for indice, (nota1, nota2, nota3) in enumerate(notas):
+            curso = Curso.objects.create(codigo_curso='CTX{}'.format(indice), descricao='Curso extra', nivel='B') if indice else self.curso
+            matricula = Matricula.objects.create(aluno=aluno, curso=curso, periodo='M')
+            Avaliacao.objects.create(matricula=matricula, nota1=nota1, nota2=nota2, nota3=nota3)
+
+    def test_requisicao_get_simulacao_sem_gravar(self):
+        """Teste para verificar a simulação com outros pesos sem alterar as avaliações"""
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get('/cursos/simulacao/', {'peso_nota1': 1, 'peso_nota2': 1, 'peso_nota3': 0})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(consultas), 1)
+        self.assertEqual(response.data['total'], 3)
+        self.assertEqual(response.data['atual'], {'Aprovado': 1, 'Prova Final': 2, 'Reprovado': 0})
+        self.assertEqual(response.data['simulado'], {'Aprovado': 2, 'Prova Final': 1, 'Reprovado': 0})
+        self.assertEqual(response.data['mudancas'], [{'de': 'Prova Final', 'para': 'Aprovado', 'total': 1}])
+        self.assertEqual(Avaliacao.objects.filter(situacao='Aprovado').count(), 1)
+
+    def test_requisicao_get_simulacao_de_um_curso_com_limites(self):
+        """Teste para verificar a simulação de um curso mantendo os pesos e mudando a aprovação"""
+        response = self.client.get('/cursos/{}/simulacao/'.format(self.curso.id), {'nota_aprovacao': '8.5'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total'], 1)
+        self.assertEqual(response.data['simulado']['Prova Final'], 1)
+        self.assertEqual(response.data['diferenca']['Aprovado'], -1)
+
+    def test_requisicao_get_simulacao_com_parametros_invalidos(self):
+        """Teste para verificar a validação dos parâmetros da simulação"""
+        response = self.client.get('/cursos/simulacao/', {'peso_nota1': 2})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/cursos/simulacao/', {'nota_aprovacao': '5', 'nota_prova_final': '6'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/cursos/999/simulacao/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,103 @@
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from escola import tarefas
+from escola.manutencao import AtribuirNotas, NOTAS_POR_TIPO, gerador, limitar
+from escola.models import Aluno, Curso, Matricula, AtividadeAvaliativa, Tarefa
+
+class TarefasTestCase(APITestCase):
+
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user('admin', is_staff=True))
+        curso = Curso.objects.create(codigo_curso='CTT1', descricao='Curso teste 1', nivel='B')
+        for indice in range(3):
+            aluno = Aluno.objects.create(nome='Aluno {}'.format(indice), rg='123456789', cpf='1234567890{}'.format(indice), data_nascimento='2000-01-01')
+            matricula = Matricula.objects.create(aluno=aluno, curso=curso, periodo='M')
+            AtividadeAvaliativa.objects.create(matricula=matricula, tipo='P', titulo='Prova 1')
+            AtividadeAvaliativa.objects.create(matricula=matricula, tipo='A', titulo='Atividade 1')
+            AtividadeAvaliativa.objects.create(matricula=matricula, tipo='T', titulo='Trabalho', nota=9)
+
+    def notas_esperadas(self, semente=20260110):
+        esperadas = {}
+        for atividade in AtividadeAvaliativa.objects.filter(tipo__in=NOTAS_POR_TIPO):
+            media, desvio, casas = NOTAS_POR_TIPO[atividade.tipo]
+            esperadas[atividade.pk] = round(limitar(gerador(semente, atividade.pk).gauss(mu=media, sigma=desvio)), casas)
+        return esperadas
+
+    def test_requisicao_post_enfileira_e_get_mostra_o_progresso(self):
+        """Teste para verificar a tarefa enfileirada pela API, executada pelo trabalhador e o progresso em jobs/<id>/"""
+        response = self.client.post('/jobs/', {'tipo': 'atribuir_notas'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['situacao'], 'pendente')
+        self.assertEqual(response.data['parametros'], {'semente': 20260110})
+        url = '/jobs/{}/'.format(response.data['id'])
+        self.assertTrue(response['Location'].endswith(url))
+
+        tarefas.trabalhar(uma_vez=True)
+        response = self.client.get(url)
+        self.assertEqual(response.data['situacao'], 'concluida')
+        self.assertEqual((response.data['processados'], response.data['total'], response.data['percentual']), (6, 6, 100.0))
+        self.assertIsNotNone(response.data['itens_por_segundo'])
+        notas = dict(AtividadeAvaliativa.objects.filter(tipo__in=NOTAS_POR_TIPO).values_list('pk', 'nota'))
+        self.assertEqual({pk: float(nota) for pk, nota in notas.items()}, self.notas_esperadas())
+        self.assertEqual(set(AtividadeAvaliativa.objects.filter(tipo='T').values_list('nota', flat=True)), {9})
+
+    def test_tarefa_interrompida_continua_do_ultimo_lote(self):
+        """Teste para verificar que uma tarefa abandonada é retomada a partir do último lote gravado"""
+        tarefa = tarefas.enfileirar('atribuir_notas', {'semente': 7})
+
+        def interromper(tarefa):
+            raise KeyboardInterrupt
+        with mock.patch.object(AtribuirNotas, 'tamanho_lote', 2):
+            with self.assertRaises(KeyboardInterrupt):
+                tarefas.trabalhar(uma_vez=True, progresso=interromper)
+            tarefa.refresh_from_db()
+            self.assertEqual((tarefa.situacao, tarefa.processados), ('executando', 2))
+
+            # Sem progresso dentro do tempo limite a tarefa ainda pertence ao primeiro trabalhador
+            self.assertIsNone(tarefas.reservar('outro'))
+            Tarefa.objects.filter(pk=tarefa.pk).update(atualizada_em=timezone.now() - timedelta(hours=1))
+            tarefas.trabalhar(uma_vez=True)
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.situacao, tarefa.processados, tarefa.total), ('concluida', 6, 6))
+        notas = dict(AtividadeAvaliativa.objects.filter(tipo__in=NOTAS_POR_TIPO).values_list('pk', 'nota'))
+        self.assertEqual({pk: float(nota) for pk, nota in notas.items()}, self.notas_esperadas(7))
+
+    def test_requisicao_post_com_tipo_ou_parametros_invalidos(self):
+        """Teste para verificar o erro 400 para tarefas desconhecidas ou parâmetros inválidos e o 403 sem ser administrador"""
+        response = self.client.post('/jobs/', {'tipo': 'apagar_tudo'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('tipo', response.data)
+        response = self.client.post('/jobs/', {'tipo': 'sincronizar_notas', 'parametros': {'curso': 'abc'}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('parametros', response.data)
+        self.client.force_authenticate(User.objects.create_user('aluno'))
+        self.assertEqual(self.client.get('/jobs/').status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Tarefa.objects.exists())
+
+    def test_requisicao_post_para_cancelar_tarefa(self):
+        """Teste para verificar o cancelamento de uma tarefa pendente e o 409 para uma tarefa terminada"""
+        tarefa = tarefas.enfileirar('sincronizar_notas')
+        response = self.client.post('/jobs/{}/cancelar/'.format(tarefa.pk))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['situacao'], 'cancelada')
+        tarefas.trabalhar(uma_vez=True)
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.situacao, tarefa.processados), ('cancelada', 0))
+        response = self.client.post('/jobs/{}/cancelar/'.format(tarefa.pk))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_recriar_cursos(self):
+        """Teste para verificar a tarefa recriar_cursos e o resumo gravado ao concluir"""
+        tarefa = tarefas.enfileirar('recriar_cursos', {'semente': 1})
+        tarefas.trabalhar(uma_vez=True)
+        tarefa.refresh_from_db()
+        self.assertEqual(tarefa.situacao, 'concluida', tarefa.erro)
+        self.assertEqual(Curso.objects.count(), 15)
+        self.assertFalse(Curso.objects.filter(codigo_curso='CTT1').exists())
+        for aluno in Aluno.objects.all():
+            self.assertIn(aluno.matricula_set.count(), (1, 2, 3))
+        self.assertEqual(tarefa.resultado['matriculas'], Matricula.objects.count())
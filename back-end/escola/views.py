@@ -1,25 +1,40 @@
 from django import http
+from django.http import Http404, StreamingHttpResponse
 from django.utils import decorators
-from rest_framework import serializers, status, viewsets, generics
+from rest_framework import serializers, status, viewsets, generics, filters, mixins, permissions
+from rest_framework.decorators import action
 from rest_framework import response
-from escola.models import Aluno, Curso, Matricula, Avaliacao, AtividadeAvaliativa
-from escola.serializer import AlunoSerializer, AlunoSerializerV2, CursoSerializer, MatriculaSerializer, ListaMatriculasAlunoSerializer, ListaAlunosMatriculadosSerializer, AvaliacaoSerializer, AtividadeAvaliativaSerializer
+from escola.models import Aluno, Curso, Matricula, Avaliacao, AtividadeAvaliativa, Tarefa
+from escola.serializer import AlunoSerializer, AlunoSerializerV2, CursoSerializer, MatriculaSerializer, ListaMatriculasAlunoSerializer, ListaAlunosMatriculadosSerializer, AvaliacaoSerializer, AtividadeAvaliativaSerializer, SimulacaoNotasSerializer, TarefaSerializer
 from rest_framework.response import Response
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+from rest_framework.views import APIView
+from escola.cache import RespostaEmCacheMixin, estatisticas
+from escola.lote import GravacaoEmLoteMixin
+from escola.exportacao import EXPORTACOES, FORMATOS, exportar
+from escola.importacao import LEITORES, importar_alunos
+from escola.relatorios import relatorio_cursos
+from escola.painel import valores as valores_painel
+from escola.simulacao import simular
+from escola.busca import BuscaAlunos
+from escola.campos import CamposDinamicosViewMixin
+from escola.assincrono import LeituraAssincronaMixin
+from escola import tarefas
 
-class AlunosViewSet(viewsets.ModelViewSet):
-    """Exibindo todos os alunos e alunas"""
+class AlunosViewSet(LeituraAssincronaMixin, CamposDinamicosViewMixin, RespostaEmCacheMixin, viewsets.ModelViewSet):
+    """Exibindo todos os alunos e alunas; ?search= busca por nome (sem acentos), cpf ou celular"""
     queryset = Aluno.objects.all()
+    modelos_cache = (Aluno,)
+    filter_backends = [BuscaAlunos]
     def get_serializer_class(self):
         if self.request.version =='v2':
             return AlunoSerializerV2
         else:
             return AlunoSerializer    
 
-class CursosViewSet(viewsets.ModelViewSet):
+class CursosViewSet(LeituraAssincronaMixin, CamposDinamicosViewMixin, RespostaEmCacheMixin, viewsets.ModelViewSet):
     """Exibindo todos os cursos"""
     queryset = Curso.objects.all()
+    modelos_cache = (Curso,)
     serializer_class = CursoSerializer
     http_method_names = ['get', 'post', 'put', 'patch', 'delete']
     
@@ -33,38 +48,146 @@ class CursosViewSet(viewsets.ModelViewSet):
             return response
 
 
-class MatriculaViewSet(viewsets.ModelViewSet):
-    """Listando todas as matrículas"""
+class MatriculaViewSet(LeituraAssincronaMixin, CamposDinamicosViewMixin, RespostaEmCacheMixin, GravacaoEmLoteMixin, viewsets.ModelViewSet):
+    """Listando todas as matrículas; POST/PATCH em matriculas/lote/ gravam uma lista de uma vez"""
     queryset = Matricula.objects.all()
     serializer_class = MatriculaSerializer
     http_method_names = ['get', 'post', 'put', 'patch', 'delete']
+    modelos_cache = (Matricula,)
 
-    @method_decorator(cache_page(20))
-    def dispatch(self, *args, **kwargs):
-        return super(MatriculaViewSet, self).dispatch(*args, **kwargs)
-
-class ListaMatriculasAluno(generics.ListAPIView):
+class ListaMatriculasAluno(LeituraAssincronaMixin, RespostaEmCacheMixin, generics.ListAPIView):
     """Listando as matrículas de um aluno ou aluna"""
+    modelos_cache = (Matricula, Curso)
+    # Lista curta e completa, sem o envelope da paginação
+    pagination_class = None
     def get_queryset(self):
-        queryset = Matricula.objects.filter(aluno_id=self.kwargs['pk'])
+        queryset = Matricula.objects.filter(aluno_id=self.kwargs['pk']).select_related('curso')
         return queryset
     serializer_class = ListaMatriculasAlunoSerializer
 
-class ListaAlunosMatriculados(generics.ListAPIView):
+class ListaAlunosMatriculados(LeituraAssincronaMixin, RespostaEmCacheMixin, generics.ListAPIView):
     """Listando alunos e alunas matriculados em um curso"""
+    modelos_cache = (Matricula, Aluno)
+    # Lista curta e completa, sem o envelope da paginação
+    pagination_class = None
     def get_queryset(self):
-        queryset = Matricula.objects.filter(curso_id=self.kwargs['pk'])
+        queryset = Matricula.objects.filter(curso_id=self.kwargs['pk']).select_related('aluno')
         return queryset
     serializer_class = ListaAlunosMatriculadosSerializer
 
-class AvaliacaoViewSet(viewsets.ModelViewSet):
-    """CRUD de Avaliações"""
+class AvaliacaoViewSet(CamposDinamicosViewMixin, RespostaEmCacheMixin, viewsets.ModelViewSet):
+    """CRUD de Avaliações, filtráveis por ?situacao= e ordenáveis por ?ordering=media"""
     queryset = Avaliacao.objects.all()
+    modelos_cache = (Avaliacao,)
     serializer_class = AvaliacaoSerializer
     http_method_names = ['get', 'post', 'put', 'patch', 'delete']
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['media', 'data_criacao']
+    ordering = ['-id']
 
-class AtividadeAvaliativaViewSet(viewsets.ModelViewSet):
-    """CRUD de Atividades Avaliativas"""
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        situacao = self.request.query_params.get('situacao')
+        if situacao:
+            queryset = queryset.filter(situacao=situacao)
+        return queryset
+
+class AtividadeAvaliativaViewSet(CamposDinamicosViewMixin, RespostaEmCacheMixin, GravacaoEmLoteMixin, viewsets.ModelViewSet):
+    """CRUD de Atividades Avaliativas; POST/PATCH em atividades/lote/ gravam uma lista de uma vez"""
     queryset = AtividadeAvaliativa.objects.all()
+    modelos_cache = (AtividadeAvaliativa,)
     serializer_class = AtividadeAvaliativaSerializer
-    http_method_names = ['get', 'post', 'put', 'patch', 'delete']
\ No newline at end of file
+    http_method_names = ['get', 'post', 'put', 'patch', 'delete']
+    # Mesma ordem de data_criacao, mas sobre a chave primária indexada
+    ordering = ['-id']
+
+class RelatorioCursos(RespostaEmCacheMixin, APIView):
+    """Relatório de matrículas, médias, situações e histograma de notas de todos os cursos"""
+    modelos_cache = (Curso, Matricula, Avaliacao)
+
+    def get(self, request):
+        return self.resposta_em_cache(request, self.gerar)
+
+    def gerar(self, request):
+        return Response(relatorio_cursos())
+
+class RelatorioCurso(RelatorioCursos):
+    """Relatório de matrículas, médias, situações e histograma de notas de um curso"""
+    def get(self, request, pk):
+        return self.resposta_em_cache(request, self.gerar, pk)
+
+    def gerar(self, request, pk):
+        relatorio = relatorio_cursos(curso_id=pk)
+        if not relatorio:
+            raise Http404
+        return Response(relatorio[0])
+
+class SimulacaoNotas(RespostaEmCacheMixin, APIView):
+    """Simula a situação das avaliações de um curso, ou de todos, com outros pesos
+    (?peso_nota1=&peso_nota2=&peso_nota3=) e limites (?nota_aprovacao=&nota_prova_final=), sem gravar nada"""
+    modelos_cache = (Curso, Matricula, Avaliacao)
+
+    def get(self, request, pk=None):
+        return self.resposta_em_cache(request, self.gerar, pk)
+
+    def gerar(self, request, pk=None):
+        if pk is not None and not Curso.objects.filter(pk=pk).exists():
+            raise Http404
+        parametros = SimulacaoNotasSerializer(data=request.query_params)
+        parametros.is_valid(raise_exception=True)
+        return Response(simular(curso_id=pk, **parametros.validated_data))
+
+class Painel(APIView):
+    """Totais do painel lidos da tabela de contadores, sem contar as tabelas"""
+    def get(self, request):
+        return Response(valores_painel())
+
+class EstatisticasCache(APIView):
+    """Acertos e falhas do cache de respostas da API"""
+    def get(self, request):
+        return Response(estatisticas())
+
+class Exportacao(APIView):
+    """Exportação completa de alunos, matriculas, avaliacoes ou atividades em ?formato=csv (padrão) ou ndjson"""
+    def get(self, request, recurso):
+        formato = request.query_params.get('formato', 'csv')
+        if recurso not in EXPORTACOES or formato not in FORMATOS:
+            raise Http404
+        response = StreamingHttpResponse(exportar(recurso, formato), content_type=FORMATOS[formato])
+        response['Content-Disposition'] = f'attachment; filename="{recurso}.{formato}"'
+        return response
+
+class ImportacaoAlunos(APIView):
+    """Importação de alunos em massa: envie o arquivo CSV ou NDJSON no campo 'arquivo'"""
+    def post(self, request):
+        arquivo = request.FILES.get('arquivo')
+        if arquivo is None:
+            return Response({'detail': "Envie o arquivo no campo 'arquivo'."}, status=status.HTTP_400_BAD_REQUEST)
+        formato = request.data.get('formato') or arquivo.name.rsplit('.', 1)[-1].lower()
+        if formato not in LEITORES:
+            return Response(
+                {'detail': 'Formato inválido; use csv ou ndjson.'}, status=status.HTTP_400_BAD_REQUEST
+            )
+        relatorio = importar_alunos(LEITORES[formato](arquivo))
+        return Response(relatorio, status=status.HTTP_200_OK)
+
+class TarefasViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """Tarefas de manutenção em segundo plano (escola/manutencao.py), executadas pelo comando trabalhador_tarefas.
+    POST com {"tipo", "parametros"} enfileira; jobs/<id>/ mostra o progresso; POST em jobs/<id>/cancelar/ cancela"""
+    queryset = Tarefa.objects.all()
+    serializer_class = TarefaSerializer
+    permission_classes = [permissions.IsAdminUser]
+    ordering = ['-id']
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        response.status_code = status.HTTP_202_ACCEPTED
+        response['Location'] = request.build_absolute_uri(str(response.data['id']) + '/')
+        return response
+
+    @action(detail=True, methods=['post'])
+    def cancelar(self, request, pk=None):
+        tarefa = self.get_object()
+        if not tarefas.cancelar(tarefa):
+            return Response({'detail': 'A tarefa já terminou.'}, status=status.HTTP_409_CONFLICT)
+        return Response(self.get_serializer(tarefa).data)
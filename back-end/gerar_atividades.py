@@ -1,87 +1,24 @@
 import os
 import django
-import random
-from datetime import datetime, timedelta
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'setup.settings')
 django.setup()
 
-from escola.models import Matricula, AtividadeAvaliativa
+from django.core.management import call_command
 
-# Limpar atividades anteriores
-AtividadeAvaliativa.objects.all().delete()
+"""
+Substitui as atividades de todas as matrículas por 2-3 atividades, 1-2 provas
+e 0-1 trabalho com notas e datas de entrega aleatórias.
 
-# Pegar todas as matrículas
-matriculas = Matricula.objects.all()
+Executado como a tarefa em segundo plano 'gerar_atividades' (escola/manutencao.py), em
+lotes e com o progresso gravado: pode ser retomada se interrompida. Para apenas
+enfileirar, use `python manage.py executar_tarefa gerar_atividades --fila` ou POST /jobs/.
+"""
 
-titulos_atividades = [
-    "Lista de Exercícios 1",
-    "Lista de Exercícios 2",
-    "Trabalho Prático",
-    "Projeto Final",
-    "Estudo de Caso"
-]
 
-titulos_provas = [
-    "Prova 1 - Conceitos Básicos",
-    "Prova 2 - Conceitos Intermediários",
-    "Prova Final"
-]
+def main():
+	call_command('executar_tarefa', 'gerar_atividades')
 
-titulos_trabalhos = [
-    "Trabalho em Grupo",
-    "Pesquisa Bibliográfica",
-    "Desenvolvimento de Projeto"
-]
 
-for matricula in matriculas:
-    # Gerar 2-3 atividades
-    num_atividades = random.randint(2, 3)
-    for i in range(num_atividades):
-        dias_atras = random.randint(1, 30)
-        data_entrega = datetime.now().date() - timedelta(days=dias_atras)
-        entregue = random.choice([True, True, False])  # 66% chance de ter sido entregue
-        
-        AtividadeAvaliativa.objects.create(
-            matricula=matricula,
-            tipo='A',
-            titulo=random.choice(titulos_atividades),
-            descricao=f"Descrição da atividade para {matricula.aluno.nome}",
-            nota=round(random.uniform(6.0, 10.0), 2) if entregue else None,
-            data_entrega=data_entrega,
-            entregue=entregue
-        )
-    
-    # Gerar 1-2 provas
-    num_provas = random.randint(1, 2)
-    for i in range(num_provas):
-        dias_atras = random.randint(5, 40)
-        data_entrega = datetime.now().date() - timedelta(days=dias_atras)
-        
-        AtividadeAvaliativa.objects.create(
-            matricula=matricula,
-            tipo='P',
-            titulo=random.choice(titulos_provas),
-            descricao=f"Prova aplicada no curso {matricula.curso.descricao}",
-            nota=round(random.uniform(5.0, 10.0), 2),
-            data_entrega=data_entrega,
-            entregue=True
-        )
-    
-    # Gerar 0-1 trabalho
-    if random.choice([True, False]):
-        dias_atras = random.randint(10, 60)
-        data_entrega = datetime.now().date() - timedelta(days=dias_atras)
-        entregue = random.choice([True, False])
-        
-        AtividadeAvaliativa.objects.create(
-            matricula=matricula,
-            tipo='T',
-            titulo=random.choice(titulos_trabalhos),
-            descricao=f"Trabalho para {matricula.aluno.nome}",
-            nota=round(random.uniform(7.0, 10.0), 2) if entregue else None,
-            data_entrega=data_entrega,
-            entregue=entregue
-        )
-
-print(f"✅ {AtividadeAvaliativa.objects.count()} atividades criadas com sucesso!")
+if __name__ == '__main__':
+	main()
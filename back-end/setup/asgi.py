@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'setup.settings')
+# Listagens com o ORM assíncrono (LEITURAS_ASSINCRONAS em setup/settings.py)
+os.environ.setdefault('ESCOLA_LEITURAS_ASSINCRONAS', '1')
 
 application = get_asgi_application()
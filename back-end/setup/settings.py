@@ -46,6 +46,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # No começo da lista: métricas e perfil medem os demais e a escolha da réplica
+    # vale para toda a requisição. Os três saem da cadeia quando desativados
+    'escola.metricas.MetricasMiddleware',
+    'escola.perfil.PerfilMiddleware',
+    'escola.replicas.ReplicasMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     "corsheaders.middleware.CorsMiddleware",
@@ -81,13 +86,37 @@ WSGI_APPLICATION = 'setup.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
 
+# Segundos em que uma conexão com o banco é reaproveitada entre requisições do
+# mesmo worker (0 fecha ao fim de cada uma; None a mantém aberta); conexões
+# reaproveitadas são testadas antes do uso (CONN_HEALTH_CHECKS)
+DB_CONN_MAX_AGE = int(os.environ.get('ESCOLA_DB_CONN_MAX_AGE', '0'))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Réplicas de leitura (escola/replicas.py): ESCOLA_REPLICAS lista, separados por
+# vírgula, os NAME das réplicas, com as demais configurações iguais às do
+# default (no SQLite, os arquivos, relativos a BASE_DIR). Nos testes, espelham o default
+REPLICAS = []
+_nomes = [nome.strip() for nome in os.environ.get('ESCOLA_REPLICAS', '').split(',') if nome.strip()]
+for _indice, _nome in enumerate(_nomes, 1):
+    if 'sqlite3' in DATABASES['default']['ENGINE']:
+        _nome = os.path.join(BASE_DIR, _nome)
+    DATABASES[f'replica{_indice}'] = dict(DATABASES['default'], NAME=_nome, TEST={'MIRROR': 'default'})
+    REPLICAS.append(f'replica{_indice}')
+
+DATABASE_ROUTERS = ['escola.replicas.RoteadorReplicas']
+
+# Segundos após uma gravação em que o mesmo cliente lê do banco principal (o
+# atraso tolerado da replicação)
+REPLICAS_JANELA = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
@@ -128,9 +157,14 @@ USE_TZ = True
 STATIC_URL = '/static/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media_root')
 MEDIA_URL = '/media/'
+# Entrega de MEDIA_ROOT pelo Django (escola/midia.py), só para o desenvolvimento;
+# em produção o servidor web entrega os arquivos (ver INTEGRACAO.md)
+SERVIR_MIDIA = DEBUG
 
 REST_FRAMEWORK = {
     'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.QueryParameterVersioning',
+    'DEFAULT_PAGINATION_CLASS': 'escola.pagination.PaginacaoCursor',
+    'PAGE_SIZE': 100,
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
@@ -143,8 +177,21 @@ REST_FRAMEWORK = {
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/day',
     },
+    # JSON via orjson, com os mesmos bytes do JSONRenderer (ver escola/renderers.py)
+    # e MessagePack com Accept: application/msgpack
+    'DEFAULT_RENDERER_CLASSES': [
+        'escola.renderers.JSONRapidoRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'escola.renderers.MessagePackRenderer',
+    ],
 }
 
+# Maior valor aceito em ?page_size= nas listagens paginadas
+PAGINACAO_MAX_PAGE_SIZE = 1000
+
+# Maior quantidade de itens aceita pelos endpoints de gravação em lote (/lote/)
+LOTE_MAX_ITENS = 5000
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://localhost:5173",
@@ -181,15 +228,63 @@ SIMPLE_JWT = {
     'JTI_CLAIM': 'jti',
 }
 
-# CACHES = {
-#     "default":{
-#         "BACKEND": "django_redis.cache.RedisCache",
-#         "LOCATION": "redis://127.0.0.1:6379/1",
-#         "OPTIONS": {
-#             "CLIENT_CLASS": "django_redis.client.DefaultClient",
-#         }
-#     }
-# }
+# Cache compartilhado entre os workers (Redis) quando REDIS_URL estiver definida;
+# sem ela, cache em memória local do processo (desenvolvimento e testes)
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        "default":{
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            }
+        }
+    }
+else:
+    CACHES = {
+        "default":{
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# O cache é compartilhado entre os workers (Redis)? No cache local de cada
+# processo, uma gravação atendida por outro worker não invalida as respostas
+# guardadas neste
+CACHE_COMPARTILHADO = bool(REDIS_URL)
+
+# Tempo máximo (segundos) de uma resposta no cache; gravações invalidam antes
+# disso. Sem cache compartilhado, CACHE_API_TIMEOUT_LOCAL limita quanto tempo um
+# worker pode servir uma resposta anterior a uma gravação feita em outro
+CACHE_API_TIMEOUT = 300
+CACHE_API_TIMEOUT_LOCAL = 20
+
+# Listagens de alunos, cursos e matrículas atendidas por views assíncronas
+# (escola/assincrono.py). Ativado pelo setup/asgi.py; no WSGI as views são síncronas
+LEITURAS_ASSINCRONAS = os.environ.get('ESCOLA_LEITURAS_ASSINCRONAS', '').lower() in ('1', 'true', 'sim')
+
+# Tarefas em segundo plano (escola/tarefas.py): intervalo (segundos) entre as
+# consultas dos trabalhadores à fila e tempo sem progresso após o qual uma tarefa
+# em execução é considerada abandonada e pode ser retomada por outro trabalhador
+TAREFAS_INTERVALO = 2
+TAREFAS_TEMPO_LIMITE = 300
+
+# Perfil por requisição (escola/perfil.py): tempos de sql, auth, serializer e
+# render no cabeçalho Server-Timing, e um registro no logger escola.perfil, com as
+# PERFIL_TOP_SQL consultas mais demoradas, para requisições de PERFIL_LIMITE_LENTA_MS
+# ou mais. Desativado, o middleware não é carregado
+PERFIL_REQUISICOES = os.environ.get('ESCOLA_PERFIL_REQUISICOES', '').lower() in ('1', 'true', 'sim')
+PERFIL_LIMITE_LENTA_MS = 500
+PERFIL_TOP_SQL = 5
+
+# Métricas do Prometheus em /metrics (escola/metricas.py), ativadas definindo o
+# diretório em que cada worker grava as suas (esvaziado a cada deploy); gravação
+# no máximo a cada METRICAS_INTERVALO segundos. METRICAS_FAIXAS são os limites
+# (segundos) do histograma de duração das requisições
+METRICAS_DIRETORIO = os.environ.get('ESCOLA_METRICAS_DIR')
+METRICAS_INTERVALO = 1
+METRICAS_FAIXAS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
 
 # SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 # SESSION_CACHE_ALIAS = "default"
@@ -1,9 +1,10 @@
 from django.contrib import admin
 from django.urls import path,include
-from escola.views import AlunosViewSet, CursosViewSet, MatriculaViewSet, ListaMatriculasAluno, ListaAlunosMatriculados, AvaliacaoViewSet, AtividadeAvaliativaViewSet
+from escola.views import AlunosViewSet, CursosViewSet, MatriculaViewSet, ListaMatriculasAluno, ListaAlunosMatriculados, AvaliacaoViewSet, AtividadeAvaliativaViewSet, EstatisticasCache, Exportacao, ImportacaoAlunos, RelatorioCursos, RelatorioCurso, Painel, SimulacaoNotas, TarefasViewSet
 from rest_framework import routers
 from django.conf import settings
-from django.conf.urls.static import static
+from escola.midia import servir as servir_midia
+from escola.metricas import exibir as exibir_metricas
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 router = routers.DefaultRouter()
@@ -12,12 +13,39 @@ router.register('cursos', CursosViewSet, basename='Cursos')
 router.register('matriculas', MatriculaViewSet, basename='Matriculas')
 router.register('avaliacoes', AvaliacaoViewSet, basename='Avaliacoes')
 router.register('atividades', AtividadeAvaliativaViewSet, basename='Atividades')
+router.register('jobs', TarefasViewSet, basename='Tarefas')
 
 urlpatterns = [
     path('controle-geral/', admin.site.urls),
+    # Antes das rotas do router, senão 'relatorio' e 'simulacao' seriam tratados como o pk de um curso
+    path('cursos/relatorio/', RelatorioCursos.as_view()),
+    path('cursos/simulacao/', SimulacaoNotas.as_view()),
     path('', include(router.urls) ),
     path('alunos/<int:pk>/matriculas/', ListaMatriculasAluno.as_view()),
     path('cursos/<int:pk>/matriculas/', ListaAlunosMatriculados.as_view()),
+    path('cursos/<int:pk>/relatorio/', RelatorioCurso.as_view()),
+    path('cursos/<int:pk>/simulacao/', SimulacaoNotas.as_view()),
+    path('dashboard/', Painel.as_view()),
+    path('cache/estatisticas/', EstatisticasCache.as_view()),
+    path('exportar/<str:recurso>/', Exportacao.as_view()),
+    path('importar/alunos/', ImportacaoAlunos.as_view()),
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    # Formato texto do Prometheus, somando todos os workers (escola/metricas.py)
+    path('metrics', exibir_metricas),
+    # Fotos e miniaturas com ETag e Cache-Control (escola/midia.py)
+    path(settings.MEDIA_URL.lstrip('/') + '<path:path>', servir_midia),
+]
+
+# No ASGI as listagens são atendidas pelas views assíncronas; vêm antes das rotas
+# do router para terem precedência nos mesmos caminhos
+rotas_assincronas = [
+    path('alunos/', AlunosViewSet.as_view_assincrona({'get': 'list', 'post': 'create'}, basename='Alunos', detail=False)),
+    path('cursos/', CursosViewSet.as_view_assincrona({'get': 'list', 'post': 'create'}, basename='Cursos', detail=False)),
+    path('matriculas/', MatriculaViewSet.as_view_assincrona({'get': 'list', 'post': 'create'}, basename='Matriculas', detail=False)),
+    path('alunos/<int:pk>/matriculas/', ListaMatriculasAluno.as_view_assincrona()),
+    path('cursos/<int:pk>/matriculas/', ListaAlunosMatriculados.as_view_assincrona()),
+]
+
+if settings.LEITURAS_ASSINCRONAS:
+    urlpatterns = rotas_assincronas + urlpatterns
@@ -0,0 +1,154 @@
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'setup.settings')
+django.setup()
+
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from escola.models import Aluno, Curso
+
+"""
+Teste de carga das listagens (alunos, cursos, matrículas e as matrículas por
+aluno e por curso) com muitas conexões simultâneas e clientes lentos, que
+demoram DEMORA segundos entre a linha do pedido e o restante dos cabeçalhos.
+Compara os deploys com um processo cada:
+- ASGI: uvicorn setup.asgi, com as views assíncronas (LEITURAS_ASSINCRONAS)
+- WSGI: gunicorn setup.wsgi com o worker padrão (sync), em que cada conexão
+  ocupa o processo do começo ao fim
+- WSGI: gunicorn setup.wsgi com worker gthread e THREADS threads
+Mostra, para cada quantidade de conexões, as respostas por segundo, a latência
+(p50/p95) e as conexões que falharam ou passaram de TIMEOUT segundos.
+Usa o banco atual (gere dados antes) e um token JWT do usuário teste_carga, já
+que o throttling de anônimos limita a 100 requisições por dia.
+
+Uso: python teste_carga.py [conexoes ...]   (padrão: 50 200 500)
+"""
+
+DURACAO = 10
+DEMORA = 0.5
+BUFFER = 16 * 1024
+DEMORA_LEITURA = 0.05
+TIMEOUT = 10
+THREADS = 8
+PORTA = 8765
+
+SERVIDORES = [
+	('ASGI (uvicorn)', ['uvicorn', 'setup.asgi:application', '--port', str(PORTA), '--workers', '1', '--log-level', 'warning'], {'ESCOLA_LEITURAS_ASSINCRONAS': '1'}),
+	('WSGI (gunicorn sync)', ['gunicorn', 'setup.wsgi:application', '--bind', f'127.0.0.1:{PORTA}', '--workers', '1', '--log-level', 'warning'], {'ESCOLA_LEITURAS_ASSINCRONAS': '0'}),
+	('WSGI (gunicorn gthread)', ['gunicorn', 'setup.wsgi:application', '--bind', f'127.0.0.1:{PORTA}', '--workers', '1', '--worker-class', 'gthread', '--threads', str(THREADS), '--log-level', 'warning'], {'ESCOLA_LEITURAS_ASSINCRONAS': '0'}),
+]
+
+
+def gerar_token():
+	usuario, _ = User.objects.get_or_create(username='teste_carga')
+	return str(RefreshToken.for_user(usuario).access_token)
+
+
+def gerar_urls():
+	alunos = list(Aluno.objects.order_by('id').values_list('id', flat=True)[:1000])
+	cursos = list(Curso.objects.values_list('id', flat=True))
+	# Uma lista por endpoint; cada requisição sorteia o endpoint e depois a URL
+	return [
+		['/alunos/?page_size=500'],
+		['/cursos/'],
+		['/matriculas/?page_size=500'],
+		[f'/alunos/{pk}/matriculas/' for pk in alunos],
+		[f'/cursos/{pk}/matriculas/?page_size=500' for pk in cursos],
+	]
+
+
+def aguardar_porta():
+	limite = time.monotonic() + 30
+	while time.monotonic() < limite:
+		try:
+			socket.create_connection(('127.0.0.1', PORTA), timeout=1).close()
+			return
+		except OSError:
+			time.sleep(0.2)
+	raise RuntimeError(f'servidor não respondeu na porta {PORTA}')
+
+
+async def requisicao(url, token):
+	inicio = time.perf_counter()
+	conexao = socket.socket()
+	# Buffer de recepção pequeno: o servidor só termina de enviar quando o cliente lê
+	conexao.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, BUFFER)
+	conexao.setblocking(False)
+	await asyncio.get_running_loop().sock_connect(conexao, ('127.0.0.1', PORTA))
+	leitor, escritor = await asyncio.open_connection(sock=conexao, limit=BUFFER)
+	try:
+		escritor.write(f'GET {url} HTTP/1.1\r\nHost: localhost\r\n'.encode())
+		await escritor.drain()
+		# Cliente lento: a conexão fica aberta antes do pedido estar completo
+		await asyncio.sleep(DEMORA)
+		escritor.write(f'Authorization: Bearer {token}\r\nAccept: application/json\r\nConnection: close\r\n\r\n'.encode())
+		await escritor.drain()
+		# e lê a resposta aos poucos, como em uma rede lenta
+		partes = []
+		while parte := await leitor.read(BUFFER):
+			partes.append(parte)
+			await asyncio.sleep(DEMORA_LEITURA)
+		resposta = b''.join(partes)
+	finally:
+		escritor.close()
+	status = int(resposta.split(b' ', 2)[1]) if resposta else 0
+	return status, time.perf_counter() - inicio
+
+
+async def cliente(urls, token, fim, latencias, falhas):
+	while time.monotonic() < fim:
+		try:
+			status, duracao = await asyncio.wait_for(requisicao(random.choice(random.choice(urls)), token), TIMEOUT)
+		except (asyncio.TimeoutError, OSError, IndexError, ValueError):
+			falhas.append(1)
+			continue
+		if status == 200:
+			latencias.append(duracao)
+		else:
+			falhas.append(status)
+
+
+async def carga(conexoes, urls, token):
+	latencias, falhas = [], []
+	fim = time.monotonic() + DURACAO
+	inicio = time.perf_counter()
+	await asyncio.gather(*(cliente(urls, token, fim, latencias, falhas) for _ in range(conexoes)))
+	return latencias, falhas, time.perf_counter() - inicio
+
+
+def percentil(valores, p):
+	return valores[min(len(valores) - 1, int(len(valores) * p))] * 1000 if valores else 0.0
+
+
+def main():
+	niveis = [int(valor) for valor in sys.argv[1:]] or [50, 200, 500]
+	token = gerar_token()
+	urls = gerar_urls()
+	if not all(urls):
+		print('Banco sem dados suficientes; gere dados antes de medir.')
+		return
+
+	for nome, comando, ambiente in SERVIDORES:
+		servidor = subprocess.Popen(comando, env=dict(os.environ, **ambiente))
+		try:
+			aguardar_porta()
+			print(f"{nome}")
+			for conexoes in niveis:
+				latencias, falhas, duracao = asyncio.run(carga(conexoes, urls, token))
+				latencias.sort()
+				print(f"  {conexoes:>5} conexões {len(latencias) / duracao:>8.1f} resp/s  p50 {percentil(latencias, 0.5):>7.0f} ms  p95 {percentil(latencias, 0.95):>7.0f} ms  falhas {len(falhas)}")
+		finally:
+			servidor.terminate()
+			servidor.wait()
+
+
+if __name__ == '__main__':
+	main()
@@ -88,6 +88,8 @@ export interface Aluno {
   data_nascimento: string;
   celular: string;
   foto: string | null;
+  // URLs das miniaturas da foto (null sem foto); prefira-as à foto original em listas
+  foto_miniaturas: Record<'pequena' | 'media', Record<'webp' | 'jpeg', string>> | null;
 }
 
 export interface Curso {
@@ -95,6 +97,12 @@ export interface Curso {
   codigo_curso: string;
   descricao: string;
   nivel: 'B' | 'I' | 'A';
+  // Regra de notas do curso (padrão: pesos 4/4/2, aprovação 7.0, prova final 4.0)
+  peso_nota1?: number;
+  peso_nota2?: number;
+  peso_nota3?: number;
+  nota_aprovacao?: string;
+  nota_prova_final?: string;
 }
 
 export interface Matricula {
@@ -120,6 +128,43 @@ export interface Avaliacao {
   data_criacao: string;
 }
 
+export interface RelatorioCurso {
+  curso: Curso;
+  matriculas: {
+    total: number;
+    por_periodo: Record<'M' | 'V' | 'N', number>;
+  };
+  avaliacoes: number;
+  medias: Record<'nota1' | 'nota2' | 'nota3' | 'media', number | null>;
+  situacoes: Record<'Aprovado' | 'Prova Final' | 'Reprovado', number>;
+  histograma: { inicio: number; fim: number; total: number }[];
+}
+
+export interface SimulacaoNotas {
+  total: number;
+  atual: Record<'Aprovado' | 'Prova Final' | 'Reprovado', number>;
+  simulado: Record<'Aprovado' | 'Prova Final' | 'Reprovado', number>;
+  diferenca: Record<'Aprovado' | 'Prova Final' | 'Reprovado', number>;
+  media_simulada: number | null;
+  mudancas: { de: string; para: string; total: number }[];
+}
+
+export interface ParametrosSimulacao {
+  peso_nota1?: number;
+  peso_nota2?: number;
+  peso_nota3?: number;
+  nota_aprovacao?: number;
+  nota_prova_final?: number;
+}
+
+export interface Painel {
+  alunos: number;
+  cursos: number;
+  matriculas: number;
+  atividades_pendentes: number;
+  matriculas_em_risco: number;
+}
+
 export interface AtividadeAvaliativa {
   id: number;
   matricula: number;
@@ -133,15 +178,43 @@ export interface AtividadeAvaliativa {
   data_criacao: string;
 }
 
+export type TipoTarefa = 'sincronizar_notas' | 'gerar_atividades' | 'atribuir_notas' | 'recriar_cursos';
+
+export interface Tarefa {
+  id: number;
+  tipo: TipoTarefa;
+  parametros: Record<string, unknown>;
+  situacao: 'pendente' | 'executando' | 'concluida' | 'falhou' | 'cancelada';
+  situacao_display: string;
+  total: number | null;
+  processados: number;
+  percentual: number;
+  itens_por_segundo: number | null;
+  segundos_restantes: number | null;
+  duracao: number;
+  resultado: Record<string, unknown> | null;
+  erro: string;
+  criada_em: string;
+  iniciada_em: string | null;
+  atualizada_em: string;
+  concluida_em: string | null;
+}
+
 // APIs de Alunos
 export const alunosAPI = {
   // Listar todos os alunos
   listar: async (version?: 'v2'): Promise<Aluno[]> => {
-    const params = version ? { version } : {};
+    const params = version ? { version, paginacao: false } : { paginacao: false };
     const response = await api.get('/alunos/', { params });
     return response.data;
   },
 
+  // Buscar alunos por nome (sem acentos), cpf ou celular, no índice do servidor
+  buscar: async (termo: string, pageSize = 20): Promise<Aluno[]> => {
+    const response = await api.get('/alunos/', { params: { search: termo, page_size: pageSize } });
+    return response.data.results;
+  },
+
   // Obter um aluno específico
   obter: async (id: number): Promise<Aluno> => {
     const response = await api.get(`/alunos/${id}/`);
@@ -149,7 +222,7 @@ export const alunosAPI = {
   },
 
   // Criar um novo aluno
-  criar: async (aluno: Omit<Aluno, 'id'>): Promise<Aluno> => {
+  criar: async (aluno: Omit<Aluno, 'id' | 'foto_miniaturas'>): Promise<Aluno> => {
     const response = await api.post('/alunos/', aluno);
     return response.data;
   },
@@ -190,11 +263,38 @@ export const alunosAPI = {
   },
 };
 
+// Totais do painel, mantidos pelo servidor a cada gravação
+export const painelAPI = {
+  obter: async (): Promise<Painel> => {
+    const response = await api.get('/dashboard/');
+    return response.data;
+  },
+};
+
+// Tarefas de manutenção em segundo plano (apenas administradores)
+export const tarefasAPI = {
+  // Enfileira a tarefa; o progresso é acompanhado por obter()
+  enfileirar: async (tipo: TipoTarefa, parametros: Record<string, unknown> = {}): Promise<Tarefa> => {
+    const response = await api.post('/jobs/', { tipo, parametros });
+    return response.data;
+  },
+
+  obter: async (id: number): Promise<Tarefa> => {
+    const response = await api.get(`/jobs/${id}/`);
+    return response.data;
+  },
+
+  cancelar: async (id: number): Promise<Tarefa> => {
+    const response = await api.post(`/jobs/${id}/cancelar/`);
+    return response.data;
+  },
+};
+
 // APIs de Cursos
 export const cursosAPI = {
   // Listar todos os cursos
   listar: async (): Promise<Curso[]> => {
-    const response = await api.get('/cursos/');
+    const response = await api.get('/cursos/', { params: { paginacao: false } });
     return response.data;
   },
 
@@ -232,13 +332,32 @@ export const cursosAPI = {
     const response = await api.get(`/cursos/${id}/matriculas/`);
     return response.data;
   },
+
+  // Relatório estatístico de um curso, calculado no servidor
+  relatorio: async (id: number): Promise<RelatorioCurso> => {
+    const response = await api.get(`/cursos/${id}/relatorio/`);
+    return response.data;
+  },
+
+  // Relatório estatístico de todos os cursos
+  relatorioGeral: async (): Promise<RelatorioCurso[]> => {
+    const response = await api.get('/cursos/relatorio/');
+    return response.data;
+  },
+
+  // Simula outra regra de notas sem gravar (id omitido: todos os cursos)
+  simulacao: async (parametros: ParametrosSimulacao, id?: number): Promise<SimulacaoNotas> => {
+    const url = id === undefined ? '/cursos/simulacao/' : `/cursos/${id}/simulacao/`;
+    const response = await api.get(url, { params: parametros });
+    return response.data;
+  },
 };
 
 // APIs de Matrículas
 export const matriculasAPI = {
   // Listar todas as matrículas
   listar: async (): Promise<Matricula[]> => {
-    const response = await api.get('/matriculas/');
+    const response = await api.get('/matriculas/', { params: { paginacao: false } });
     return response.data;
   },
 
@@ -276,7 +395,7 @@ export const matriculasAPI = {
 export const avaliacoesAPI = {
   // Listar todas as avaliações
   listar: async (): Promise<Avaliacao[]> => {
-    const response = await api.get('/avaliacoes/');
+    const response = await api.get('/avaliacoes/', { params: { paginacao: false } });
     return response.data;
   },
 
@@ -314,7 +433,7 @@ export const avaliacoesAPI = {
 export const atividadesAPI = {
   // Listar todas as atividades
   listar: async (): Promise<AtividadeAvaliativa[]> => {
-    const response = await api.get('/atividades/');
+    const response = await api.get('/atividades/', { params: { paginacao: false } });
     return response.data;
   },
 
@@ -349,24 +468,30 @@ export const atividadesAPI = {
 }
 
 // Função auxiliar para obter matrículas com informações detalhadas
+// (aluno e curso vêm expandidos na mesma resposta, com apenas os campos usados)
 export const obterMatriculasDetalhadas = async (): Promise<MatriculaDetalhada[]> => {
-  const [matriculas, alunos, cursos] = await Promise.all([
-    matriculasAPI.listar(),
-    alunosAPI.listar(),
-    cursosAPI.listar(),
-  ]);
-
-  return matriculas
-    .map((m) => {
-      const aluno = alunos.find((a) => a.id === m.aluno);
-      const curso = cursos.find((c) => c.id === m.curso);
-      return {
-        ...m,
-        aluno_nome: aluno?.nome,
-        curso_descricao: curso?.descricao,
-      };
-    })
-    .filter((m) => m.curso_descricao); // Filtrar matrículas órfãs (curso deletado)
+  const response = await api.get('/matriculas/', {
+    params: {
+      paginacao: false,
+      expand: 'aluno,curso',
+      fields: 'id,periodo,aluno.id,aluno.nome,curso.id,curso.descricao',
+    },
+  });
+  const matriculas: {
+    id: number;
+    periodo: Matricula['periodo'];
+    aluno: Pick<Aluno, 'id' | 'nome'>;
+    curso: Pick<Curso, 'id' | 'descricao'>;
+  }[] = response.data;
+
+  return matriculas.map((m) => ({
+    id: m.id,
+    periodo: m.periodo,
+    aluno: m.aluno.id,
+    curso: m.curso.id,
+    aluno_nome: m.aluno.nome,
+    curso_descricao: m.curso.descricao,
+  }));
 };
 
 // Mapeamento de níveis